@@ -0,0 +1,100 @@
+"""
+Benchmark des politiques de découpage TTS ("fixed" et "adaptive").
+
+Les réponses types de tests/golden (normalisées comme avant synthèse), plus leur
+concaténation, sont découpées par chaque politique. Le script compte les appels
+TTS et simule leur déroulé : un appel dure `--call-ms` + `--ms-per-char` par
+caractère, `--concurrency` appels en parallèle dans l'ordre des segments, et la
+lecture avance à `--chars-per-second`. Il donne le délai avant le premier son et
+les coupures de lecture (segment pas encore prêt). C'est un modèle, pas une
+mesure contre l'API.
+
+Usage, depuis fast-api/ :
+    python -m bench.segment_sizing_bench
+"""
+
+import argparse
+import heapq
+import json
+from pathlib import Path
+
+from shared.lib.speech_normalizer import speech_normalizer
+from shared.lib.tts import SEGMENT_SIZING_POLICIES, split_text_into_segments
+
+GOLDEN = Path(__file__).parent.parent / "tests" / "golden" / "speech_normalizer.json"
+
+
+def answers() -> list[str]:
+    cases = json.loads(GOLDEN.read_text("utf-8"))
+    texts = [
+        speech_normalizer.normalize(case["input"])
+        for case in cases
+        if "baseline" not in case
+    ]
+    return texts + [" ".join(texts)]
+
+
+def truncated(text: str, length: int) -> str:
+    """Début du texte, coupé au dernier espace avant `length` caractères."""
+    return text if len(text) <= length else text[:length].rsplit(" ", 1)[0]
+
+
+def simulate(segments: list[str], args) -> tuple[float, int]:
+    """Délai (secondes) avant le premier son et nombre de coupures de lecture."""
+    slots = [0.0] * args.concurrency
+    ready = []
+    for segment in segments:
+        start = heapq.heappop(slots)
+        end = start + (args.call_ms + args.ms_per_char * len(segment)) / 1000
+        heapq.heappush(slots, end)
+        ready.append(end)
+    playing_until = ready[0]
+    stalls = 0
+    for segment, ready_at in zip(segments, ready):
+        if ready_at > playing_until:
+            stalls += 1
+            playing_until = ready_at
+        playing_until += len(segment) / args.chars_per_second
+    return ready[0], stalls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--call-ms", type=float, default=250)
+    parser.add_argument("--ms-per-char", type=float, default=4)
+    parser.add_argument("--concurrency", type=int, default=3)
+    parser.add_argument("--chars-per-second", type=float, default=15)
+    args = parser.parse_args()
+
+    texts = answers()
+    print(f"{len(texts) - 1} réponses types + leur concaténation")
+    print(
+        f"{'politique':<10} {'appels':>7} {'1er segment':>12} "
+        f"{'1er son':>9} {'coupures':>9} {'appels (long)':>14}"
+    )
+    for name, sizing in SEGMENT_SIZING_POLICIES.items():
+        results = [split_text_into_segments(text, sizing=sizing) for text in texts]
+        short = results[:-1]
+        simulated = [simulate(segments, args) for segments in short]
+        calls = sum(len(segments) for segments in short)
+        first = sum(len(segments[0]) for segments in short) / len(short)
+        first_audio = sum(delay for delay, _ in simulated) / len(short)
+        stalls = sum(stall for _, stall in simulated)
+        print(
+            f"{name:<10} {calls:>7} {first:>10.0f} c {first_audio * 1000:>6.0f} ms "
+            f"{stalls:>9} {len(results[-1]):>14}"
+        )
+
+    lengths = (100, 150, 250, 400, 800, 1500, 3000)
+    print()
+    print(f"{'caractères':<10} " + " ".join(f"{length:>5}" for length in lengths))
+    for name, sizing in SEGMENT_SIZING_POLICIES.items():
+        calls = [
+            len(split_text_into_segments(truncated(texts[-1], length), sizing=sizing))
+            for length in lengths
+        ]
+        print(f"{name:<10} " + " ".join(f"{count:>5}" for count in calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Microbenchmark du nettoyage markdown avant synthèse (SpeechNormalizer).
+
+Mesure le temps de normalisation de réponses de 1, 10 et 100 Ko construites à
+partir du corpus de tests/golden, puis d'entrées pathologiques pour les anciennes
+regex (longues suites d'espaces, de '[' ou de '<' non fermés).
+
+Usage, depuis fast-api/ :
+    python -m bench.speech_normalizer_bench [--repeat 5]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from shared.lib.speech_normalizer import speech_normalizer
+
+GOLDEN = Path(__file__).parent.parent / "tests" / "golden" / "speech_normalizer.json"
+
+
+def corpus_text(size: int) -> str:
+    answers = [case["input"] for case in json.loads(GOLDEN.read_text("utf-8"))]
+    text = ""
+    while len(text) < size:
+        text += "\n\n".join(answers) + "\n\n"
+    return text[:size]
+
+
+def inputs() -> list[tuple[str, str]]:
+    return [
+        ("1 Ko", corpus_text(1_000)),
+        ("10 Ko", corpus_text(10_000)),
+        ("100 Ko", corpus_text(100_000)),
+        ("20 Ko d'espaces", "a" + " " * 20_000 + "b"),
+        ("20 Ko de '['", "[" * 20_000),
+        ("20 Ko de '<'", "<" * 20_000),
+        ("20 Ko de '**'", "**a" * 6_666),
+        ("20 Ko de '`'", "`a" * 10_000),
+    ]
+
+
+def best_of(text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        speech_normalizer.normalize(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for name, text in inputs():
+        print(f"{name:<18} {best_of(text, args.repeat) * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark des appels Speech-to-Text : ancien chemin (SpeechClient synchrone créé
+à chaque message, appelé depuis la boucle d'événements) contre le pool de
+clients async (recognize).
+
+Un faux servicer Speech grpc.aio tourne dans un process à part et répond après
+`--latency` secondes. Pour chaque chemin, on reconnaît `--messages` messages
+vocaux en parallèle (par vagues de `--concurrency`, comme autant de WebSockets)
+et on mesure la durée totale et le retard de la boucle d'événements : c'est le
+temps pendant lequel les autres connexions du worker ne sont pas servies.
+
+Usage, depuis fast-api/ :
+    python -m bench.stt_client_bench [--messages 16] [--latency 1.0]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import time
+
+import grpc
+from google.cloud import speech
+from google.cloud.speech_v1.services.speech.transports import SpeechGrpcTransport
+
+from bench.tts_client_bench import LoopLagMonitor
+
+# Deux secondes de PCM 16 kHz mono
+AUDIO = b"\x00\x01" * 32_000
+CONFIG = speech.RecognitionConfig(
+    encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+    sample_rate_hertz=16000,
+    language_code="fr-FR",
+)
+
+
+async def _serve(port: int, latency: float, ready):
+    async def recognize(request, context):
+        await asyncio.sleep(latency)
+        alternative = speech.SpeechRecognitionAlternative(transcript="bonjour")
+        return speech.RecognizeResponse(
+            results=[speech.SpeechRecognitionResult(alternatives=[alternative])]
+        )
+
+    server = grpc.aio.server()
+    server.add_generic_rpc_handlers(
+        (
+            grpc.method_handlers_generic_handler(
+                "google.cloud.speech.v1.Speech",
+                {
+                    "Recognize": grpc.unary_unary_rpc_method_handler(
+                        recognize,
+                        request_deserializer=speech.RecognizeRequest.deserialize,
+                        response_serializer=speech.RecognizeResponse.serialize,
+                    )
+                },
+            ),
+        )
+    )
+    server.add_insecure_port(f"127.0.0.1:{port}")
+    await server.start()
+    ready.set()
+    await server.wait_for_termination()
+
+
+def run_fake_server(port: int, latency: float, ready):
+    asyncio.run(_serve(port, latency, ready))
+
+
+async def legacy_message(host: str) -> str:
+    """Chemin d'origine : nouveau client synchrone à chaque message."""
+    client = speech.SpeechClient(
+        transport=SpeechGrpcTransport(channel=grpc.insecure_channel(host))
+    )
+    response = client.recognize(
+        config=CONFIG, audio=speech.RecognitionAudio(content=AUDIO)
+    )
+    client.transport.close()
+    return response.results[0].alternatives[0].transcript
+
+
+async def pooled_message(host: str) -> str:
+    from shared.lib.transcription import recognize
+
+    response = await recognize(CONFIG, speech.RecognitionAudio(content=AUDIO))
+    return response.results[0].alternatives[0].transcript
+
+
+async def measure(name: str, call, host: str, messages: int, concurrency: int):
+    # Préchauffage (création des canaux du pool, import)
+    await call(host)
+    with LoopLagMonitor() as monitor:
+        start = time.perf_counter()
+        for first in range(0, messages, concurrency):
+            batch = range(first, min(first + concurrency, messages))
+            await asyncio.gather(*(call(host) for _ in batch))
+        elapsed = time.perf_counter() - start
+        await asyncio.sleep(0.01)
+    print(f"{name:<8} {elapsed:7.2f} s au total  {monitor.summary()}")
+
+
+async def run(args):
+    host = f"127.0.0.1:{args.port}"
+    os.environ["STT_EMULATOR_HOST"] = host
+    await measure("legacy", legacy_message, host, args.messages, args.concurrency)
+    await measure("pooled", pooled_message, host, args.messages, args.concurrency)
+
+    from shared.lib.transcription import speech_client_pool
+
+    await speech_client_pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=1.0)
+    parser.add_argument("--port", type=int, default=50552)
+    args = parser.parse_args()
+
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(
+        target=run_fake_server, args=(args.port, args.latency, ready), daemon=True
+    )
+    server.start()
+    try:
+        if not ready.wait(10):
+            raise RuntimeError("Fake Speech server did not start")
+        print(
+            f"{args.messages} messages, concurrency {args.concurrency}, "
+            f"server latency {args.latency * 1000:.0f} ms"
+        )
+        asyncio.run(run(args))
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Benchmark des appels Text-to-Speech : ancien chemin (client synchrone créé à
+chaque segment, appelé depuis la boucle d'événements) contre le pool de clients
+async (synthesize_speech).
+
+Un faux servicer TextToSpeech grpc.aio tourne dans un process à part et répond
+après `--latency` secondes. Pour chaque chemin, on synthétise `--segments`
+segments en parallèle (par vagues de `--concurrency`) et on mesure le débit
+(segments/s) et le retard de la boucle d'événements (une tâche qui dort
+LAG_INTERVAL secondes et note de combien elle se réveille en retard).
+
+Usage, depuis fast-api/ :
+    python -m bench.tts_client_bench [--segments 200] [--latency 0.05]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import time
+
+import google.cloud.texttospeech as tts
+import grpc
+from google.cloud.texttospeech_v1.services.text_to_speech.transports import (
+    TextToSpeechGrpcTransport,
+)
+
+LAG_INTERVAL = 0.005
+SEGMENT_TEXT = "Voici un segment de réponse d'une longueur typique. " * 3
+
+
+async def _serve(port: int, latency: float, audio_bytes: int, ready):
+    async def synthesize_speech(request, context):
+        await asyncio.sleep(latency)
+        return tts.SynthesizeSpeechResponse(audio_content=b"\xff" * audio_bytes)
+
+    server = grpc.aio.server()
+    server.add_generic_rpc_handlers(
+        (
+            grpc.method_handlers_generic_handler(
+                "google.cloud.texttospeech.v1.TextToSpeech",
+                {
+                    "SynthesizeSpeech": grpc.unary_unary_rpc_method_handler(
+                        synthesize_speech,
+                        request_deserializer=tts.SynthesizeSpeechRequest.deserialize,
+                        response_serializer=tts.SynthesizeSpeechResponse.serialize,
+                    )
+                },
+            ),
+        )
+    )
+    server.add_insecure_port(f"127.0.0.1:{port}")
+    await server.start()
+    ready.set()
+    await server.wait_for_termination()
+
+
+def run_fake_server(port: int, latency: float, audio_bytes: int, ready):
+    asyncio.run(_serve(port, latency, audio_bytes, ready))
+
+
+class LoopLagMonitor:
+    """Retard de réveil d'une tâche qui dort LAG_INTERVAL secondes en boucle."""
+
+    def __init__(self):
+        self.lags: list[float] = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(LAG_INTERVAL)
+            self.lags.append(time.perf_counter() - start - LAG_INTERVAL)
+
+    def __enter__(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+    def summary(self) -> str:
+        if len(self.lags) < 2:
+            return "lag n/a (boucle bloquée pendant toute la mesure)"
+        p99 = statistics.quantiles(self.lags, n=100, method="inclusive")[98]
+        return f"lag p99 {p99 * 1000:7.1f} ms, max {max(self.lags) * 1000:7.1f} ms"
+
+
+async def legacy_segment(host: str, text: str) -> bytes:
+    """Chemin d'origine : nouveau client synchrone à chaque segment."""
+    client = tts.TextToSpeechClient(
+        transport=TextToSpeechGrpcTransport(channel=grpc.insecure_channel(host))
+    )
+    response = client.synthesize_speech(
+        input=tts.SynthesisInput(text=text),
+        voice=tts.VoiceSelectionParams(language_code="fr-FR", name="fr-FR-Chirp-HD-D"),
+        audio_config=tts.AudioConfig(audio_encoding=tts.AudioEncoding.MP3),
+    )
+    client.transport.close()
+    return response.audio_content
+
+
+async def pooled_segment(host: str, text: str) -> bytes:
+    from shared.lib.tts import synthesize_speech
+
+    return await synthesize_speech(text, use_cache=False)
+
+
+async def measure(name: str, call, host: str, segments: int, concurrency: int):
+    # Préchauffage (création des canaux du pool, import)
+    await call(host, SEGMENT_TEXT)
+    with LoopLagMonitor() as monitor:
+        start = time.perf_counter()
+        for first in range(0, segments, concurrency):
+            batch = range(first, min(first + concurrency, segments))
+            await asyncio.gather(*(call(host, f"{SEGMENT_TEXT} {i}") for i in batch))
+        elapsed = time.perf_counter() - start
+        await asyncio.sleep(LAG_INTERVAL * 2)
+    print(f"{name:<8} {segments / elapsed:8.1f} segments/s  {monitor.summary()}")
+
+
+async def run(args):
+    host = f"127.0.0.1:{args.port}"
+    os.environ["TTS_EMULATOR_HOST"] = host
+    await measure("legacy", legacy_segment, host, args.segments, args.concurrency)
+    await measure("pooled", pooled_segment, host, args.segments, args.concurrency)
+
+    from shared.lib.tts import tts_client_pool
+
+    await tts_client_pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--segments", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--audio-bytes", type=int, default=30_000)
+    parser.add_argument("--port", type=int, default=50551)
+    args = parser.parse_args()
+
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(
+        target=run_fake_server,
+        args=(args.port, args.latency, args.audio_bytes, ready),
+        daemon=True,
+    )
+    server.start()
+    try:
+        if not ready.wait(10):
+            raise RuntimeError("Fake TextToSpeech server did not start")
+        print(
+            f"{args.segments} segments, concurrency {args.concurrency}, "
+            f"server latency {args.latency * 1000:.0f} ms"
+        )
+        asyncio.run(run(args))
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
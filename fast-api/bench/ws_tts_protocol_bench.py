@@ -0,0 +1,78 @@
+"""
+Benchmark du protocole TTS du WebSocket : segment en JSON (audio en base64
+dans audio_data, sérialisé comme Starlette) contre le protocole binaire (en-tête
+JSON puis trame binaire avec les octets MP3).
+
+Pour chaque taille de segment, mesure les octets envoyés et le temps CPU de
+préparation des trames (meilleur de `--repeat` séries de `--number` appels).
+
+Usage, depuis fast-api/ :
+    python -m bench.ws_tts_protocol_bench [--sizes 16000 48000 160000]
+"""
+
+import argparse
+import base64
+import json
+import os
+import timeit
+
+from shared.lib.ws_writer import dumps
+
+
+def segment_header() -> dict:
+    return {
+        "type": "tts_segment",
+        "index": 0,
+        "total_segments": 3,
+        "text": "Voici un segment de réponse d'une longueur typique.",
+        "is_final": False,
+        "mime_type": "audio/mpeg",
+    }
+
+
+def json_frames(audio: bytes) -> list:
+    """Protocole JSON : une trame texte, audio en base64."""
+    message = segment_header()
+    message["audio_data"] = base64.b64encode(audio).decode("utf-8")
+    return [json.dumps(message, separators=(",", ":"), ensure_ascii=False)]
+
+
+def binary_frames(audio: bytes) -> list:
+    """Protocole binaire : en-tête JSON puis octets bruts."""
+    message = segment_header()
+    message["audio_size"] = len(audio)
+    return [dumps(message), audio]
+
+
+def wire_bytes(frames: list) -> int:
+    return sum(
+        len(frame.encode("utf-8")) if isinstance(frame, str) else len(frame)
+        for frame in frames
+    )
+
+
+def cpu_microseconds(build, audio: bytes, number: int, repeat: int) -> float:
+    timer = timeit.Timer(lambda: build(audio))
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16000, 48000, 160000])
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'MP3':>8} {'json':>16} {'binary':>16}")
+    for size in args.sizes:
+        audio = os.urandom(size)
+        columns = []
+        for build in (json_frames, binary_frames):
+            columns.append(
+                f"{wire_bytes(build(audio)):>7} o {cpu_microseconds(build, audio, args.number, args.repeat):>5.0f} us"
+            )
+        print(f"{size:>8} " + " ".join(f"{column:>16}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark des trames WebSocket sortantes : send_json de Starlette (json de la
+bibliothèque standard, une trame par message) contre WebSocketWriter, sans
+regroupement (orjson seul) puis avec regroupement des message_part.
+
+Un serveur uvicorn tourne dans un process à part. `--connections` clients s'y
+connectent, puis chacun reçoit `--tokens` message_part à `--rate` par seconde
+(0 : sans pause), suivis d'un message_part définitif et d'un message_end. On
+mesure la durée, les trames et messages par seconde, et le temps CPU consommé
+par le serveur (lu dans /proc, donc Linux uniquement). Le client vérifie aussi
+que le texte reçu est complet.
+
+Usage, depuis fast-api/ :
+    python -m bench.ws_writer_bench [--connections 500] [--tokens 200] [--rate 50]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+
+import uvicorn
+import websockets
+from fastapi import FastAPI, WebSocket
+
+from shared.lib.ws_writer import WebSocketWriter
+
+MODES = ("legacy", "orjson", "writer")
+TOKENS = [
+    "Bon",
+    "jour",
+    ", ",
+    "voici",
+    " une",
+    " pro",
+    "position",
+    " détaillée",
+    ". ",
+    "**Axe",
+    " 1**",
+]
+
+app = FastAPI()
+
+
+@app.websocket("/ws/{mode}")
+async def stream_tokens(websocket: WebSocket, mode: str):
+    await websocket.accept()
+    tokens = int(websocket.query_params["tokens"])
+    rate = float(websocket.query_params["rate"])
+    if mode == "writer":
+        out = WebSocketWriter(websocket)
+    elif mode == "orjson":
+        out = WebSocketWriter(websocket, coalesce_seconds=0)
+    else:
+        out = websocket
+    await websocket.receive_text()
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for i in range(tokens):
+        await out.send_json(
+            {"type": "message_part", "text": TOKENS[i % len(TOKENS)], "is_final": False}
+        )
+        if rate:
+            # Cadence régulière, indépendante de la durée des envois
+            await asyncio.sleep(max(start + (i + 1) / rate - loop.time(), 0))
+    await out.send_json({"type": "message_part", "text": "", "is_final": True})
+    await out.send_json({"type": "message_end"})
+    await websocket.receive_text()
+
+
+def run_server(port: int):
+    uvicorn.run(app, port=port, log_level="warning", ws="websockets")
+
+
+def cpu_seconds(pid: int) -> float:
+    """Temps CPU (utilisateur + système) du process, lu dans /proc/<pid>/stat."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def client(websocket, expected: str, go: asyncio.Event) -> tuple[int, bool]:
+    await go.wait()
+    await websocket.send("go")
+    text = ""
+    frames = 0
+    while True:
+        message = json.loads(await websocket.recv())
+        frames += 1
+        if message["type"] == "message_part":
+            text += message["text"]
+        elif message["type"] == "message_end":
+            break
+    await websocket.send("bye")
+    return frames, text == expected
+
+
+async def measure(mode: str, args, server_pid: int):
+    url = (
+        f"ws://127.0.0.1:{args.port}/ws/{mode}"
+        f"?tokens={args.tokens}&rate={args.rate}"
+    )
+    expected = "".join(TOKENS[i % len(TOKENS)] for i in range(args.tokens))
+    sockets = [
+        await websockets.connect(url, max_queue=None) for _ in range(args.connections)
+    ]
+    go = asyncio.Event()
+    tasks = [asyncio.create_task(client(ws, expected, go)) for ws in sockets]
+    cpu_start = cpu_seconds(server_pid)
+    start = time.perf_counter()
+    go.set()
+    results = await asyncio.gather(*tasks)
+    wall = time.perf_counter() - start
+    cpu = cpu_seconds(server_pid) - cpu_start
+    for ws in sockets:
+        await ws.close()
+
+    frames = sum(count for count, _ in results)
+    messages = args.connections * (args.tokens + 2)
+    print(
+        f"{mode:<7} {wall:6.2f} s  {frames / wall:>9,.0f} trames/s  "
+        f"{messages / wall:>9,.0f} messages/s  CPU serveur {cpu:5.2f} s "
+        f"({cpu / wall * 100:3.0f} % d'un cœur, {cpu / args.connections * 1000:5.1f} "
+        f"ms/connexion)  complet={all(ok for _, ok in results)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, default=500)
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    args = parser.parse_args()
+
+    print(
+        f"{args.connections} connexions, {args.tokens} message_part à "
+        f"{args.rate:g}/s par connexion"
+    )
+    for mode in args.modes:
+        # Un serveur neuf par mode, pour ne mesurer que son CPU
+        server = multiprocessing.Process(target=run_server, args=(args.port,))
+        server.start()
+        try:
+            time.sleep(2.5)
+            asyncio.run(measure(mode, args, server.pid))
+        finally:
+            server.terminate()
+            server.join()
+
+
+if __name__ == "__main__":
+    main()
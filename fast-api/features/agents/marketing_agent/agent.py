@@ -9,7 +9,11 @@ from google.genai import types
 
 from features.agents.models import Models
 from features.agents.marketing_agent.prompt import get_description, get_instruction
-from shared.orm.entities.synthetic_text import SyntheticText
+from shared.lib.speech_text import (
+    SPECULATIVE_STATE_KEY,
+    publish_speech_text,
+    save_speech_text,
+)
 
 
 class AgentOutput(BaseModel):
@@ -20,6 +24,11 @@ class AgentOutput(BaseModel):
 async def after_model_callback(
     callback_context: CallbackContext, llm_response: LlmResponse
 ):
+    if llm_response.partial:
+        # Morceau en cours de génération : main.py extrait le markdown au fil de
+        # l'eau, la réponse complète repasse ici une fois terminée
+        return None
+
     # --- Inspection ---
     original_text = ""
     if llm_response.content and llm_response.content.parts:
@@ -53,12 +62,13 @@ async def after_model_callback(
         )
         text = json_answer["text_for_tts"]
         markdown = json_answer["markdown"]
-        id = callback_context.invocation_id.replace("-", "")
 
-        synthetic_text = SyntheticText(
-            text=text,
-        )
-        await synthetic_text.save(chosen_id=id)
+        # Permettre au TTS de démarrer avant même la sauvegarde en base
+        publish_speech_text(callback_context.invocation_id, text)
+
+        # Run spéculatif : la sauvegarde attend que la spéculation soit confirmée
+        if not callback_context.state.get(SPECULATIVE_STATE_KEY, False):
+            await save_speech_text(callback_context.invocation_id, text)
         modified_parts = [copy.deepcopy(part) for part in llm_response.content.parts]
         modified_parts[0].text = markdown
         new_response = LlmResponse(
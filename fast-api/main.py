@@ -1,18 +1,28 @@
 import os
+import asyncio
 import logging
 import base64
+import json
+import time
 import uuid  # Ajout pour générer des session_id uniques
 import sqlite3  # Ajout pour l'accès direct à la BDD
-from typing import Any, Optional
+from collections import OrderedDict
+from typing import Any, Literal, Optional
 
 from features.agents.marketing_agent.agent import root_agent  # Votre import
-from shared.lib.transcription import transcript_audio
+from shared.lib.transcription import (
+    speech_client_pool,
+    StreamingTranscription,
+)
+from shared.lib.stt_router import stt_router
 
 from fastapi.middleware.cors import CORSMiddleware
 
 # Imports ADK
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.api_core import exceptions as google_exceptions
 from google.adk.runners import Runner
-from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import DatabaseSessionService, InMemorySessionService
 import google.genai as genai  # Pour genai.types
 
 from dotenv import load_dotenv
@@ -26,6 +36,7 @@ from fastapi import (
 )
 from starlette.responses import (
     FileResponse,
+    StreamingResponse,
 )
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
@@ -34,7 +45,34 @@ from pydantic import BaseModel
 from shared.lib.tts import (
     text_to_audio_bytes,
     process_text_and_generate_segments,
-    generate_audio_for_segment,
+    OrderedSegmentSynthesizer,
+    SpeechPrefetch,
+    SegmentSizing,
+    get_segment_sizing,
+    AudioFormat,
+    DEFAULT_AUDIO_FORMAT,
+    get_audio_format,
+    tts_client_pool,
+)
+from shared.lib.speech_text import set_speech_text_listener
+from shared.lib.audio_concat import OggJoiner, mp3_duration, mp3_frames
+from shared.lib.json_stream import JsonFieldStream
+from shared.lib.speculation import (
+    AGENT_SPECULATION_SILENCE_SECONDS,
+    AGENT_SPECULATIVE_START,
+    SpeculativeRun,
+    resolve_speculation,
+    same_transcript,
+)
+from shared.lib.tts_cache import tts_audio_cache
+from shared.lib.tts_scheduler import tts_scheduler
+from shared.lib.metrics import metrics
+from shared.lib.ws_writer import WebSocketWriter, dumps
+from shared.lib.ws_upload import (
+    WS_UPLOAD_CHUNK_BYTES,
+    Upload,
+    UploadError,
+    upload_registry,
 )
 
 logging.basicConfig(
@@ -49,6 +87,9 @@ APP_NAME = "ChatbotFastAPIServerWithADK"  # Nom mis à jour
 APP_NAME_ADK = "ChatbotLocalADK"  # Nom spécifique pour ADK
 
 agent_runner: Optional[Runner] = None
+# Runs spéculatifs : copies de session en mémoire, seul le tour confirmé est
+# reporté dans la base
+speculation_runner: Optional[Runner] = None
 # Utiliser une constante pour le chemin de la base de données pour éviter les répétitions
 DATABASE_FILE_PATH = "database/sessions.db"
 session_service = DatabaseSessionService(db_url=f"sqlite:///{DATABASE_FILE_PATH}")
@@ -56,6 +97,52 @@ session_service = DatabaseSessionService(db_url=f"sqlite:///{DATABASE_FILE_PATH}
 
 STATIC_DIR = Path(__file__).parent / "static"
 
+# Nombre de segments TTS synthétisés en parallèle, par endpoint
+TTS_WS_CONCURRENCY = int(os.getenv("TTS_WS_CONCURRENCY", "3"))
+TTS_STREAM_CONCURRENCY = int(os.getenv("TTS_STREAM_CONCURRENCY", "3"))
+TTS_MAX_CONCURRENCY = int(os.getenv("TTS_MAX_CONCURRENCY", "8"))
+
+# Politique de taille des segments TTS ("fixed" ou "adaptive"), par endpoint.
+# "adaptive" (premier son plus tôt) ajoute un appel TTS aux réponses de moins de
+# 200 caractères : à activer explicitement.
+TTS_WS_SEGMENT_SIZING = os.getenv("TTS_WS_SEGMENT_SIZING", "fixed")
+TTS_STREAM_SEGMENT_SIZING = os.getenv("TTS_STREAM_SEGMENT_SIZING", "fixed")
+
+# Format audio TTS par défaut du WebSocket (voir AUDIO_FORMATS dans shared.lib.tts)
+TTS_WS_AUDIO_FORMAT = os.getenv("TTS_WS_AUDIO_FORMAT", "mp3")
+
+# Protocoles d'envoi des segments TTS sur le WebSocket :
+# - "json" : audio encodé en base64 dans le message tts_segment (clients existants)
+# - "binary" : en-tête JSON tts_segment suivi d'une trame binaire avec l'audio brut
+TTS_PROTOCOL_JSON = "json"
+TTS_PROTOCOL_BINARY = "binary"
+TTS_PROTOCOLS = (TTS_PROTOCOL_JSON, TTS_PROTOCOL_BINARY)
+
+# Messages WebSocket qui ouvrent un nouveau tour de conversation
+WS_TURN_MESSAGE_TYPES = ("text", "audio", "image", "audio_stream_end")
+# Au-delà de cette taille, un message JSON est décodé hors de la boucle d'événements
+WS_JSON_OFFLOAD_BYTES = int(os.getenv("WS_JSON_OFFLOAD_BYTES", str(64 * 1024)))
+
+# Réponses de l'agent envoyées token par token (événements partiels ADK) : le
+# champ markdown de la sortie JSON est extrait au fil de la génération
+AGENT_STREAM_PARTIALS = os.getenv("AGENT_STREAM_PARTIALS", "true").lower() == "true"
+agent_run_config = RunConfig(
+    streaming_mode=StreamingMode.SSE if AGENT_STREAM_PARTIALS else StreamingMode.NONE
+)
+
+
+def summarize_ws_message(message: dict) -> dict:
+    """Message client pour les logs : les longues chaînes (base64) sont remplacées par leur taille."""
+    return {
+        key: (
+            f"<{len(value)} chars>"
+            if isinstance(value, str) and len(value) > 200
+            else value
+        )
+        for key, value in message.items()
+    }
+
+
 # Commenter/Supprimer l'initialisation de l'agent Vertex AI distant
 # async def initialize_vertex_ai_agent(): ...
 
@@ -75,13 +162,18 @@ app.add_middleware(
 
 @app.on_event("startup")
 async def startup_event():
-    global agent_runner
+    global agent_runner, speculation_runner
     logger.info("FastAPI server starting up for local ADK agent...")
     try:
         # Initialiser le Runner ADK
         agent_runner = Runner(
             agent=root_agent, app_name=APP_NAME_ADK, session_service=session_service
         )
+        speculation_runner = Runner(
+            agent=root_agent,
+            app_name=APP_NAME_ADK,
+            session_service=InMemorySessionService(),
+        )
         if agent_runner:
             logger.info(
                 f"ADK Runner initialized successfully for agent '{root_agent.name}' and app '{APP_NAME_ADK}'."
@@ -94,6 +186,13 @@ async def startup_event():
         # Gérer l'erreur comme il convient (par exemple, ne pas démarrer le serveur)
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    logger.info("FastAPI server shutting down, closing TTS and STT client pools...")
+    await tts_client_pool.close()
+    await speech_client_pool.close()
+
+
 @app.websocket("/ws/create_session/{client_id}")
 async def create_session_adk(websocket: WebSocket, client_id: str):
     await websocket.accept()
@@ -129,12 +228,14 @@ async def websocket_endpoint_adk(websocket: WebSocket, client_id: str, session_i
     logger.info(
         f"ADK WebSocket client connected: User ID '{client_id}' with Session ID '{session_id}'."
     )
+    # Trames sortantes : orjson, message_part regroupés, envois sérialisés
+    writer = WebSocketWriter(websocket)
 
     if not agent_runner:
         logger.error(
             "ADK Runner not initialized. Closing WebSocket for client {client_id}."
         )
-        await websocket.send_json(
+        await writer.send_json(
             {"type": "error", "message": "Chat service (ADK Runner) not available."}
         )
         await websocket.close(
@@ -142,15 +243,159 @@ async def websocket_endpoint_adk(websocket: WebSocket, client_id: str, session_i
         )
         return
 
-    await websocket.send_json(
-        {"type": "status", "message": "ADK Agent service connected"}
+    # Protocole TTS négocié via ?tts_protocol=binary, modifiable par un message "config"
+    tts_protocol = websocket.query_params.get("tts_protocol", TTS_PROTOCOL_JSON)
+    if tts_protocol not in TTS_PROTOCOLS:
+        tts_protocol = TTS_PROTOCOL_JSON
+    segment_sizing = get_segment_sizing(TTS_WS_SEGMENT_SIZING)
+    try:
+        audio_format = get_audio_format(
+            websocket.query_params.get("tts_format", TTS_WS_AUDIO_FORMAT)
+        )
+    except ValueError:
+        audio_format = get_audio_format(TTS_WS_AUDIO_FORMAT)
+
+    await writer.send_json(
+        {
+            "type": "status",
+            "message": "ADK Agent service connected",
+            "tts_protocol": tts_protocol,
+            "tts_format": audio_format.name,
+        }
     )
 
-    try:
-        while True:
-            client_message_json = await websocket.receive_json()
-            logger.info(f"Client {client_id} (ADK) sent JSON: {client_message_json}")
+    # Tour en cours (transcription, agent puis TTS), exécuté à part de la réception
+    # pour pouvoir être annulé par un message "cancel", un nouveau tour ou une
+    # déconnexion
+    current_turn: Optional[asyncio.Task] = None
+
+    async def cancel_current_turn(reason: str):
+        """Annule le tour en cours : run de l'agent, synthèses et nettoyage TTS."""
+        nonlocal current_turn
+        turn, current_turn = current_turn, None
+        if turn is None or turn.done():
+            return
+        turn.cancel()
+        with suppress(asyncio.CancelledError, Exception):
+            await turn
+        metrics.increment("ws.turns_cancelled")
+        metrics.increment(f"ws.turns_cancelled.{reason}")
+        logger.info(f"Cancelled current turn for client {client_id} ({reason})")
+        if reason != "disconnect":
+            await writer.send_json({"type": "turn_cancelled", "reason": reason})
+
+    # Enregistrement vocal en cours, reçu en trames binaires (audio_stream_start)
+    audio_stream: Optional[StreamingTranscription] = None
+    # Envoi binaire en cours (upload_start / upload_resume) : reçoit les trames
+    # binaires en priorité sur l'enregistrement vocal
+    current_upload: Optional[Upload] = None
+    # Mode spéculatif : l'agent démarre sur la transcription définitive partielle
+    # dès que l'utilisateur marque une pause, sans attendre audio_stream_end
+    speculative_stream = False
+    speculation: Optional[SpeculativeRun] = None
+    pending_speculation: Optional[asyncio.Task] = None
+    # Vraie session lue une fois par enregistrement, copiée à chaque spéculation
+    speculation_base: Optional[Any] = None
+
+    def new_speech_prefetch() -> SpeechPrefetch:
+        return SpeechPrefetch(
+            concurrency=min(TTS_WS_CONCURRENCY, TTS_MAX_CONCURRENCY),
+            sizing=segment_sizing,
+            audio_format=audio_format,
+        )
+
+    def cancel_speculation():
+        nonlocal speculation
+        cancel_pending_speculation()
+        if speculation is not None:
+            speculation.cancel()
+            speculation = None
+
+    def cancel_pending_speculation():
+        nonlocal pending_speculation
+        if pending_speculation is not None:
+            pending_speculation.cancel()
+            pending_speculation = None
+
+    async def start_speculation(text: str):
+        nonlocal speculation, speculation_base
+        await asyncio.sleep(AGENT_SPECULATION_SILENCE_SECONDS)
+        if speculation is not None:
+            if same_transcript(speculation.text, text):
+                return
+            speculation.cancel()
+        if speculation_base is None:
+            speculation_base = await session_service.get_session(
+                app_name=APP_NAME_ADK, user_id=client_id, session_id=session_id
+            )
+        logger.info(f"Starting speculative agent run for client {client_id}: '{text}'")
+        speculation = SpeculativeRun(
+            speculation_runner,
+            session_service,
+            app_name=APP_NAME_ADK,
+            user_id=client_id,
+            session_id=session_id,
+            text=text,
+            speech_prefetch=new_speech_prefetch(),
+            run_config=agent_run_config,
+            base_session=speculation_base,
+        )
+        speculation.start()
+
+    async def on_stable_transcription(text: str):
+        # Fin de phrase : spéculer si aucune parole ne suit pendant le délai
+        nonlocal pending_speculation
+        if pending_speculation is not None:
+            pending_speculation.cancel()
+        if text.strip():
+            pending_speculation = asyncio.create_task(start_speculation(text))
+
+    async def send_interim_transcription(text: str, is_final: bool):
+        if speculative_stream and not is_final:
+            # L'utilisateur parle encore : la spéculation en cours serait démentie
+            cancel_speculation()
+        # live : transcription en cours d'enregistrement (hypothèse ou phrase
+        # terminée), distincte de la transcription du tour envoyée à la fin
+        await writer.send_json(
+            {"type": "transcription", "text": text, "is_final": is_final, "live": True}
+        )
+
+    async def handle_turn(
+        client_message_json: dict,
+        stream: Optional[StreamingTranscription] = None,
+        speculation: Optional[SpeculativeRun] = None,
+        speculative: bool = False,
+        payload: Optional[bytes] = None,
+    ):
+        speech_prefetch: Optional[SpeechPrefetch] = None
+        # Lecture de la réponse, lancée dès le premier segment du text_for_tts
+        tts_task: Optional[asyncio.Task] = None
+
+        async def speak(
+            text: str,
+            synthesizer: Optional[OrderedSegmentSynthesizer],
+            started_at: float,
+        ):
+            try:
+                await send_tts_stream_via_websocket(
+                    writer,
+                    text,
+                    synthesizer=synthesizer,
+                    protocol=tts_protocol,
+                    sizing=segment_sizing,
+                    audio_format=audio_format,
+                    started_at=started_at,
+                )
+            except Exception as tts_error:
+                logger.error(f"Error during auto TTS: {tts_error}", exc_info=True)
+                await writer.send_json(
+                    {
+                        "type": "tts_error",
+                        "message": f"Erreur lors de la synthèse vocale automatique: {str(tts_error)}",
+                    }
+                )
 
+        try:
             message_type = client_message_json.get("type")
             message_data = client_message_json.get(
                 "data"
@@ -160,7 +405,7 @@ async def websocket_endpoint_adk(websocket: WebSocket, client_id: str, session_i
             parts_for_content = []
 
             # Tracker si le message original vient d'un audio pour déclencher le TTS automatique
-            is_audio_message = message_type == "audio"
+            is_audio_message = message_type in ("audio", "audio_stream_end")
 
             if message_type == "text":
                 if isinstance(message_data, str):
@@ -169,46 +414,50 @@ async def websocket_endpoint_adk(websocket: WebSocket, client_id: str, session_i
                     logger.warning(
                         f"Received ADK text message with invalid data payload: {message_data}"
                     )
-                    await websocket.send_json(
+                    await writer.send_json(
                         {"type": "error", "message": "Invalid text payload."}
                     )
-                    continue
+                    return
 
             elif message_type == "audio":
                 mime_type = client_message_json.get(
                     "mime_type", "audio/webm;codecs=opus"
                 )
 
-                if not isinstance(message_data, str):
+                if payload is None and not isinstance(message_data, str):
                     logger.warning(
                         f"Received ADK audio message with invalid data (not string): {message_data}"
                     )
-                    await websocket.send_json(
+                    await writer.send_json(
                         {
                             "type": "error",
                             "message": "Invalid audio payload (expected base64 string).",
                         }
                     )
-                    continue
+                    return
 
                 try:
-                    # Décoder l'audio base64
-                    audio_bytes = base64.b64decode(message_data)
-
-                    # Effectuer la transcription directement avec les bytes WebM
-                    if mime_type.startswith("audio/webm"):
-                        # Importer la fonction de transcription WebM
-                        from shared.lib.transcription import transcript_audio_webm
+                    # Contenu d'un envoi binaire, ou base64 décodé hors de la boucle
+                    audio_bytes = (
+                        payload
+                        if payload is not None
+                        else await asyncio.to_thread(base64.b64decode, message_data)
+                    )
 
-                        transcribed_text = transcript_audio_webm(audio_bytes)
-                    else:
-                        # Pour d'autres formats, utiliser la fonction standard
-                        transcribed_text = transcript_audio(audio_bytes)
+                    # Le routeur choisit le moteur selon le format et les latences
+                    # observées, et passe au suivant si un moteur est indisponible
+                    transcribed_text = await stt_router.transcribe(
+                        audio_bytes, mime_type, client_message_json.get("duration")
+                    )
 
                     if transcribed_text and transcribed_text.strip():
                         # Envoyer d'abord la transcription à l'utilisateur
-                        await websocket.send_json(
-                            {"type": "transcription", "text": transcribed_text}
+                        await writer.send_json(
+                            {
+                                "type": "transcription",
+                                "text": transcribed_text,
+                                "is_final": True,
+                            }
                         )
 
                         # Ajouter le texte transcrit comme un message texte normal
@@ -220,53 +469,110 @@ async def websocket_endpoint_adk(websocket: WebSocket, client_id: str, session_i
                         )
                     else:
                         logger.warning("Audio transcription returned empty text")
-                        await websocket.send_json(
+                        await writer.send_json(
                             {
                                 "type": "error",
                                 "message": "Could not transcribe audio - no speech detected.",
                             }
                         )
-                        continue
+                        return
 
                 except base64.binascii.Error as b64_error:
                     logger.error(
                         f"Error decoding base64 audio data for ADK: {b64_error}",
                         exc_info=True,
                     )
-                    await websocket.send_json(
+                    await writer.send_json(
                         {"type": "error", "message": "Invalid base64 audio data."}
                     )
-                    continue
+                    return
+                except (google_exceptions.InvalidArgument, ValueError) as invalid:
+                    # Clip refusé (format, contenu indécodable) : inutile de réessayer
+                    logger.warning(f"Audio rejected for client {client_id}: {invalid}")
+                    await writer.send_json(
+                        {"type": "error", "message": f"Invalid audio: {invalid}"}
+                    )
+                    return
                 except Exception as e:
                     logger.error(f"Error processing ADK audio data: {e}", exc_info=True)
-                    await websocket.send_json(
+                    await writer.send_json(
                         {"type": "error", "message": "Error processing audio data."}
                     )
-                    continue
+                    return
+
+            elif message_type == "audio_stream_end":
+                # La reconnaissance a tourné pendant l'enregistrement : il ne reste
+                # qu'à attendre les derniers résultats
+                try:
+                    transcribed_text = await stream.finish()
+                    # Filet de sécurité : aucune spéculation ne doit naître des
+                    # derniers résultats, ce tour ne la consommerait pas
+                    cancel_pending_speculation()
+                except Exception as e:
+                    logger.error(
+                        f"Streaming transcription failed for client {client_id}: {e}",
+                        exc_info=True,
+                    )
+                    metrics.increment("stt.stream_errors")
+                    if speculation is not None:
+                        speculation.cancel()
+                    await writer.send_json(
+                        {
+                            "type": "error",
+                            "message": "Speech recognition failed, please try again.",
+                        }
+                    )
+                    return
+                if not transcribed_text.strip():
+                    logger.warning("Streaming transcription returned empty text")
+                    if speculation is not None:
+                        speculation.cancel()
+                    await writer.send_json(
+                        {
+                            "type": "error",
+                            "message": "Could not transcribe audio - no speech detected.",
+                        }
+                    )
+                    return
+                await writer.send_json(
+                    {
+                        "type": "transcription",
+                        "text": transcribed_text,
+                        "is_final": True,
+                    }
+                )
+                parts_for_content.append(genai.types.Part(text=transcribed_text))
+                logger.info(f"Audio stream transcribed: '{transcribed_text}'")
+                if speculative:
+                    speculation = resolve_speculation(speculation, transcribed_text)
 
             elif message_type == "image":
                 mime_type = client_message_json.get("mime_type", "image/png")
                 prompt = client_message_json.get("prompt", "")
 
-                if not isinstance(
+                if payload is None and not isinstance(
                     message_data, str
                 ):  # message_data doit être une chaîne base64
                     logger.warning(
                         f"Received ADK image message with invalid data (not string): {message_data}"
                     )
-                    await websocket.send_json(
+                    await writer.send_json(
                         {
                             "type": "error",
                             "message": "Invalid image payload (expected base64 string).",
                         }
                     )
-                    continue
+                    return
 
                 try:
                     if prompt:  # Texte en premier
                         parts_for_content.append(genai.types.Part(text=prompt))
 
-                    image_bytes = base64.b64decode(message_data)
+                    image_bytes = (
+                        payload
+                        if payload is not None
+                        else await asyncio.to_thread(base64.b64decode, message_data)
+                    )
                     image_blob = genai.types.Blob(mime_type=mime_type, data=image_bytes)
                     image_part = genai.types.Part(inline_data=image_blob)
                     parts_for_content.append(image_part)
@@ -279,33 +585,33 @@ async def websocket_endpoint_adk(websocket: WebSocket, client_id: str, session_i
                         f"Error decoding base64 image data for ADK: {b64_error}",
                         exc_info=True,
                     )
-                    await websocket.send_json(
+                    await writer.send_json(
                         {"type": "error", "message": "Invalid base64 image data."}
                     )
-                    continue
+                    return
                 except Exception as e:
                     logger.error(f"Error processing ADK image data: {e}", exc_info=True)
-                    await websocket.send_json(
+                    await writer.send_json(
                         {"type": "error", "message": "Error processing image data."}
                     )
-                    continue
+                    return
 
             else:
                 logger.warning(f"Unknown ADK message type received: {message_type}")
-                await websocket.send_json(
+                await writer.send_json(
                     {
                         "type": "error",
                         "message": f"Unknown message type: {message_type}",
                     }
                 )
-                continue
+                return
 
             if not parts_for_content:
                 logger.info(
                     f"No content parts to send to ADK agent for client {client_id}."
                 )
-                await websocket.send_json({"type": "message_end"})
-                continue
+                await writer.send_json({"type": "message_end"})
+                return
 
             user_content = genai.types.Content(parts=parts_for_content, role="user")
             logger.debug(
@@ -315,28 +621,116 @@ async def websocket_endpoint_adk(websocket: WebSocket, client_id: str, session_i
             # Variables pour collecter la réponse complète de l'agent
             agent_response_text = ""
             event_received_count = 0
+            invocation_id: Optional[str] = None
+            # Sortie JSON de la réponse en cours de génération, et markdown déjà
+            # envoyé au client à partir des événements partiels
+            answer_stream = JsonFieldStream(("markdown", "text_for_tts"))
+            streamed_markdown = ""
+            turn_started_at = time.perf_counter()
+
+            if speculation is not None:
+                # Run spéculatif confirmé : ses événements déjà produits sont
+                # rejoués, la suite arrive au fil de l'eau
+                speech_prefetch = speculation.speech_prefetch
+                agent_events = speculation.events()
+            else:
+                # Pour un message audio, la synthèse du text_for_tts démarre dès que
+                # le callback de l'agent le publie, sans second appel LLM de nettoyage
+                speech_prefetch = new_speech_prefetch() if is_audio_message else None
+                set_speech_text_listener(speech_prefetch)
+                agent_events = agent_runner.run_async(
+                    user_id=client_id,
+                    session_id=session_id,
+                    new_message=user_content,
+                    run_config=agent_run_config,
+                )
 
-            async for event in agent_runner.run_async(
-                user_id=client_id,
-                session_id=session_id,
-                new_message=user_content,
-            ):
+            async for event in agent_events:
                 event_received_count += 1
+                invocation_id = event.invocation_id
                 logger.debug(
                     f"ADK Agent event for {client_id} (session: {session_id}): RAW EVENT: {event}"
                 )
 
+                if event.partial:
+                    # Morceau de la sortie JSON : seul le markdown part vers le client
+                    if not (
+                        event.content
+                        and event.content.parts
+                        and event.content.parts[0].text
+                    ):
+                        continue
+                    deltas = answer_stream.feed(event.content.parts[0].text)
+                    markdown_delta = deltas.get("markdown")
+                    if markdown_delta:
+                        if not streamed_markdown:
+                            metrics.observe(
+                                "agent.first_token_seconds",
+                                time.perf_counter() - turn_started_at,
+                            )
+                        streamed_markdown += markdown_delta
+                        await writer.send_json(
+                            {
+                                "type": "message_part",
+                                "text": markdown_delta,
+                                "is_final": False,
+                            }
+                        )
+                    if speech_prefetch is None:
+                        continue
+                    # Chaque phrase du text_for_tts est synthétisée pendant que le
+                    # modèle écrit la suite
+                    tts_delta = deltas.get("text_for_tts")
+                    if tts_delta:
+                        speech_prefetch.feed(event.invocation_id, tts_delta)
+                    if "text_for_tts" in answer_stream.completed:
+                        speech_prefetch.finish()
+                    synthesizer = speech_prefetch.synthesizer
+                    if tts_task is None and synthesizer and synthesizer.segments:
+                        logger.info(
+                            f"Starting TTS for client {client_id} while the answer is being generated"
+                        )
+                        tts_task = asyncio.create_task(
+                            speak("", synthesizer, turn_started_at)
+                        )
+                    continue
+
                 # Adapter l'extraction du texte selon la structure des événements ADK
                 text_content = None
                 if event.is_final_response() and event.content and event.content.parts:
-                    text_content = event.content.parts[0].text
+                    text_content = event.content.parts[0].text or ""
                     agent_response_text += text_content  # Collecter pour le TTS
                     logger.info(
                         f"ADK Agent FINAL response for {client_id}: {text_content}"
                     )
-                    await websocket.send_json(
-                        {"type": "message_part", "text": text_content, "is_final": True}
-                    )
+                    if not streamed_markdown:
+                        metrics.observe(
+                            "agent.first_token_seconds",
+                            time.perf_counter() - turn_started_at,
+                        )
+                    if text_content.startswith(streamed_markdown):
+                        # Le client a déjà reçu le début : n'envoyer que la suite
+                        await writer.send_json(
+                            {
+                                "type": "message_part",
+                                "text": text_content[len(streamed_markdown) :],
+                                "is_final": True,
+                            }
+                        )
+                    else:
+                        # Réponse finale différente du flux (JSON invalide...) :
+                        # le client remplace ce qu'il a affiché
+                        metrics.increment("agent.stream_mismatches")
+                        await writer.send_json(
+                            {
+                                "type": "message_part",
+                                "text": text_content,
+                                "is_final": True,
+                                "replace": True,
+                            }
+                        )
+                    answer_stream = JsonFieldStream(("markdown", "text_for_tts"))
+                    streamed_markdown = ""
                 elif (
                     event.content and event.content.parts
                 ):  # Pour les parties intermédiaires
@@ -350,7 +744,7 @@ async def websocket_endpoint_adk(websocket: WebSocket, client_id: str, session_i
                         logger.info(
                             f"ADK Agent INTERMEDIATE response for {client_id}: {intermediate_text}"
                         )
-                        await websocket.send_json(
+                        await writer.send_json(
                             {
                                 "type": "message_part",
                                 "text": intermediate_text,
@@ -358,30 +752,283 @@ async def websocket_endpoint_adk(websocket: WebSocket, client_id: str, session_i
                             }
                         )
 
+            if speech_prefetch is not None:
+                # text_for_tts interrompu (réponse hors schéma...) : fermer la liste
+                speech_prefetch.finish()
+
             if event_received_count == 0:
                 logger.info(
                     f"No events received from ADK agent for client {client_id} after run_async with input type '{message_type}'."
                 )
 
-            await websocket.send_json({"type": "message_end"})
+            await writer.send_json({"type": "message_end"})
             logger.info(f"Finished streaming ADK agent response to client {client_id}")
+            if speculation is not None:
+                # Le tour a été joué dans une copie de la session : le reporter
+                await speculation.commit()
 
+            if tts_task is not None:
+                # Lecture déjà commencée pendant la génération
+                await tts_task
             # Si le message original était audio et qu'on a une réponse de l'agent, déclencher TTS automatique
-            if is_audio_message and agent_response_text.strip():
+            elif is_audio_message and agent_response_text.strip():
                 logger.info(
                     f"Auto-triggering TTS for audio message response: {agent_response_text[:50]}..."
                 )
+                # text_for_tts déjà produit par l'agent (callback ou SyntheticText)
+                try:
+                    synthesizer = await speech_prefetch.resolve(invocation_id)
+                except Exception as e:
+                    logger.error(f"Could not load text_for_tts: {e}", exc_info=True)
+                    synthesizer = None
+                if synthesizer is None:
+                    logger.info(
+                        "No text_for_tts available, falling back to markdown cleaning"
+                    )
+                await speak(agent_response_text, synthesizer, turn_started_at)
+            elif speech_prefetch is not None:
+                # Réponse vide : rien à lire, abandonner une éventuelle synthèse lancée
+                speech_prefetch.cancel()
+        except asyncio.CancelledError:
+            # Les synthèses lancées par le callback tournent dans leurs propres tâches
+            if speech_prefetch is not None:
+                speech_prefetch.cancel()
+            if tts_task is not None:
+                tts_task.cancel()
+            if stream is not None:
+                stream.cancel()
+            if speculation is not None:
+                speculation.cancel()
+            raise
+        except WebSocketDisconnect:
+            logger.info(f"ADK WebSocket client {client_id} disconnected during turn.")
+            if tts_task is not None:
+                tts_task.cancel()
+            if speculation is not None:
+                speculation.cancel()
+        except Exception as e:
+            logger.error(
+                f"Error in ADK WebSocket turn for client {client_id}: {e}",
+                exc_info=True,
+            )
+            if tts_task is not None:
+                tts_task.cancel()
+            if speculation is not None:
+                speculation.cancel()
+            with suppress(Exception):
+                await writer.send_json(
+                    {
+                        "type": "error",
+                        "message": "An unexpected error occurred with ADK agent.",
+                    }
+                )
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            if message.get("bytes") is not None:
+                if current_upload is not None:
+                    # Trame binaire : morceau de l'envoi en cours
+                    try:
+                        current_upload.write(message["bytes"])
+                    except UploadError as ue:
+                        upload_registry.discard(current_upload)
+                        current_upload = None
+                        await writer.send_json({"type": "error", "message": str(ue)})
+                    continue
+
+                # Trame binaire : morceau de l'enregistrement vocal en cours
+                if audio_stream is None:
+                    await writer.send_json(
+                        {"type": "error", "message": "No audio stream started."}
+                    )
+                    continue
+                try:
+                    audio_stream.feed(message["bytes"])
+                except ValueError as ve:
+                    audio_stream.cancel()
+                    audio_stream = None
+                    cancel_speculation()
+                    await writer.send_json({"type": "error", "message": str(ve)})
+                continue
+
+            text = message["text"]
+            if len(text) > WS_JSON_OFFLOAD_BYTES:
+                # Ancien format base64 : ne pas bloquer la boucle sur un gros message
+                client_message_json = await asyncio.to_thread(json.loads, text)
+            else:
+                client_message_json = json.loads(text)
+            logger.info(
+                f"Client {client_id} (ADK) sent JSON: {summarize_ws_message(client_message_json)}"
+            )
+
+            message_type = client_message_json.get("type")
+            payload: Optional[bytes] = None
+
+            if message_type in ("upload_start", "upload_resume"):
+                try:
+                    if message_type == "upload_start":
+                        current_upload = upload_registry.start(
+                            owner=client_id,
+                            kind=client_message_json.get("kind"),
+                            mime_type=client_message_json.get("mime_type"),
+                            size=client_message_json.get("size"),
+                            metadata={"prompt": client_message_json.get("prompt", "")},
+                        )
+                    else:
+                        current_upload = upload_registry.get(
+                            client_id, client_message_json.get("upload_id")
+                        )
+                        metrics.increment("ws.uploads.resumed")
+                except UploadError as ue:
+                    await writer.send_json({"type": "error", "message": str(ue)})
+                    continue
+                # Le client envoie (ou reprend) les trames binaires à partir de "received"
+                await writer.send_json(
+                    {
+                        "type": "upload_ready",
+                        "upload_id": current_upload.upload_id,
+                        "received": current_upload.received,
+                        "size": current_upload.size,
+                        "chunk_size": WS_UPLOAD_CHUNK_BYTES,
+                    }
+                )
+                continue
+
+            if message_type == "upload_cancel":
+                if current_upload is not None:
+                    upload_registry.discard(current_upload)
+                    current_upload = None
+                continue
+
+            if message_type == "upload_end":
+                upload = current_upload
+                if upload is None or upload.upload_id != client_message_json.get(
+                    "upload_id", upload.upload_id
+                ):
+                    await writer.send_json(
+                        {"type": "error", "message": "No matching upload in progress."}
+                    )
+                    continue
+                if not upload.complete:
+                    await writer.send_json(
+                        {
+                            "type": "error",
+                            "message": "Upload incomplete.",
+                            "upload_id": upload.upload_id,
+                            "received": upload.received,
+                        }
+                    )
+                    continue
+                current_upload = None
+                payload = upload_registry.finish(upload)
+                # L'envoi devient un message "audio" ou "image" ordinaire
+                client_message_json = {"type": upload.kind, **upload.metadata}
+                if upload.mime_type:
+                    client_message_json["mime_type"] = upload.mime_type
+                message_type = upload.kind
+
+            if message_type == "audio_stream_start":
+                # L'utilisateur reprend la parole : la réponse en cours est abandonnée
+                await cancel_current_turn("new_turn")
+                if audio_stream is not None:
+                    audio_stream.cancel()
+                cancel_speculation()
+                speculation_base = None
+                speculative_stream = bool(
+                    client_message_json.get("speculative", AGENT_SPECULATIVE_START)
+                )
                 try:
-                    await send_tts_stream_via_websocket(websocket, agent_response_text)
-                except Exception as tts_error:
-                    logger.error(f"Error during auto TTS: {tts_error}", exc_info=True)
-                    await websocket.send_json(
+                    audio_stream = StreamingTranscription(
+                        mime_type=client_message_json.get(
+                            "mime_type", "audio/webm;codecs=opus"
+                        ),
+                        on_transcript=send_interim_transcription,
+                        on_stable=(
+                            on_stable_transcription if speculative_stream else None
+                        ),
+                    )
+                except ValueError as ve:
+                    audio_stream = None
+                    await writer.send_json({"type": "error", "message": str(ve)})
+                    continue
+                audio_stream.start()
+                await writer.send_json({"type": "audio_stream_started"})
+                continue
+
+            if message_type == "audio_stream_end" and audio_stream is None:
+                await writer.send_json(
+                    {"type": "error", "message": "No audio stream started."}
+                )
+                continue
+
+            if message_type == "config":
+                requested_protocol = client_message_json.get(
+                    "tts_protocol", tts_protocol
+                )
+                if requested_protocol not in TTS_PROTOCOLS:
+                    await writer.send_json(
                         {
-                            "type": "tts_error",
-                            "message": f"Erreur lors de la synthèse vocale automatique: {str(tts_error)}",
+                            "type": "error",
+                            "message": f"Unknown TTS protocol: {requested_protocol}",
                         }
                     )
+                    continue
+                try:
+                    if "segment_sizing" in client_message_json:
+                        segment_sizing = get_segment_sizing(
+                            client_message_json["segment_sizing"]
+                        )
+                    if "tts_format" in client_message_json:
+                        audio_format = get_audio_format(
+                            client_message_json["tts_format"]
+                        )
+                except ValueError as ve:
+                    await writer.send_json({"type": "error", "message": str(ve)})
+                    continue
+                tts_protocol = requested_protocol
+                await writer.send_json(
+                    {
+                        "type": "config_ack",
+                        "tts_protocol": tts_protocol,
+                        "tts_format": audio_format.name,
+                    }
+                )
+                continue
+
+            if message_type == "cancel":
+                await cancel_current_turn("cancel")
+                continue
+
+            if message_type not in WS_TURN_MESSAGE_TYPES:
+                # Message invalide : répondre l'erreur sans toucher au tour en cours
+                await handle_turn(client_message_json)
+                continue
 
+            # Un nouveau message utilisateur interrompt la réponse en cours
+            await cancel_current_turn("new_turn")
+            stream = None
+            turn_speculation = None
+            if message_type == "audio_stream_end":
+                stream, audio_stream = audio_stream, None
+                # Les résultats reçus pendant finish() ne lancent plus de spéculation
+                stream.detach_stable()
+                cancel_pending_speculation()
+                turn_speculation, speculation = speculation, None
+            else:
+                cancel_speculation()
+            current_turn = asyncio.create_task(
+                handle_turn(
+                    client_message_json,
+                    stream=stream,
+                    speculation=turn_speculation,
+                    speculative=speculative_stream and stream is not None,
+                    payload=payload,
+                )
+            )
     except WebSocketDisconnect:
         logger.info(f"ADK WebSocket client {client_id} disconnected.")
     except Exception as e:
@@ -390,7 +1037,7 @@ async def websocket_endpoint_adk(websocket: WebSocket, client_id: str, session_i
             exc_info=True,
         )
         try:
-            await websocket.send_json(
+            await writer.send_json(
                 {
                     "type": "error",
                     "message": "An unexpected error occurred with ADK agent.",
@@ -401,23 +1048,51 @@ async def websocket_endpoint_adk(websocket: WebSocket, client_id: str, session_i
                 f"Failed to send unexpected ADK error to client {client_id}: {send_err}"
             )
     finally:
+        if audio_stream is not None:
+            audio_stream.cancel()
+        cancel_speculation()
+        await cancel_current_turn("disconnect")
+        writer.close()
         logger.info(f"Closing ADK WebSocket connection for client {client_id}.")
         with suppress(Exception):  # Safely attempt to closewx
             await websocket.close()
 
 
-async def send_tts_stream_via_websocket(websocket: WebSocket, text: str):
+async def send_tts_stream_via_websocket(
+    websocket: WebSocket | WebSocketWriter,
+    text: str,
+    concurrency: int = TTS_WS_CONCURRENCY,
+    synthesizer: Optional[OrderedSegmentSynthesizer] = None,
+    protocol: str = TTS_PROTOCOL_JSON,
+    sizing: Optional[SegmentSizing] = None,
+    audio_format: AudioFormat = DEFAULT_AUDIO_FORMAT,
+    started_at: Optional[float] = None,
+):
     """
     Envoie les segments TTS via WebSocket en streaming.
+    Les segments sont synthétisés en parallèle (jusqu'à `concurrency`) mais envoyés
+    dans l'ordre des index. Si un `synthesizer` déjà démarré est fourni, ses
+    segments sont utilisés tels quels et le texte n'est pas re-nettoyé ; il peut
+    encore recevoir des segments (text_for_tts en streaming), auquel cas
+    total_segments vaut null jusqu'à ce que la liste soit fermée.
+    En protocole "binary", chaque tts_segment est suivi d'une trame binaire
+    contenant l'audio brut au lieu du champ audio_data en base64.
+    L'audio est produit dans `audio_format`, sauf pour un `synthesizer` fourni
+    qui porte déjà le sien.
+    `started_at` (début du tour, perf_counter) sert à mesurer le délai avant le
+    premier segment audio envoyé.
     """
     logger.info(f"Starting TTS streaming via WebSocket for text length: {len(text)}")
 
     try:
-        # Traiter le texte et générer les segments
-        segments = await process_text_and_generate_segments(text)
+        if synthesizer is not None:
+            segments = synthesizer.segments
+        else:
+            # Traiter le texte et générer les segments
+            segments = await process_text_and_generate_segments(text, sizing=sizing)
         logger.info(f"Text divided into {len(segments)} segments for WebSocket TTS")
 
-        if not segments:
+        if not segments and (synthesizer is None or synthesizer.total is not None):
             await websocket.send_json(
                 {
                     "type": "tts_error",
@@ -428,42 +1103,61 @@ async def send_tts_stream_via_websocket(websocket: WebSocket, text: str):
 
         # Signaler le début du streaming TTS
         await websocket.send_json(
-            {"type": "tts_start", "total_segments": len(segments)}
+            {
+                "type": "tts_start",
+                "total_segments": (
+                    synthesizer.total if synthesizer is not None else len(segments)
+                ),
+            }
         )
 
-        # Générer et envoyer chaque segment
-        for i, segment in enumerate(segments):
-            try:
-                logger.info(
-                    f"Generating TTS segment {i+1}/{len(segments)}: {segment[:50]}..."
-                )
-
-                # Générer l'audio pour ce segment
-                audio_bytes = await generate_audio_for_segment(segment)
-
-                # Envoyer le segment via WebSocket
-                segment_data = {
-                    "type": "tts_segment",
-                    "index": i,
-                    "total_segments": len(segments),
-                    "text": segment,
-                    "audio_data": base64.b64encode(audio_bytes).decode("utf-8"),
-                    "is_final": i == len(segments) - 1,
-                }
-
-                await websocket.send_json(segment_data)
-                logger.info(f"TTS segment {i+1}/{len(segments)} sent via WebSocket")
-
-            except Exception as e:
-                logger.error(f"Error generating TTS segment {i+1}: {e}")
+        # Générer les segments en parallèle et les envoyer dans l'ordre
+        if synthesizer is None:
+            synthesizer = OrderedSegmentSynthesizer(
+                segments,
+                concurrency=min(concurrency, TTS_MAX_CONCURRENCY),
+                audio_format=audio_format,
+            )
+        mime_type = synthesizer.audio_format.mime_type
+        async for result in synthesizer.results():
+            i = result.index
+            total = synthesizer.total
+            if result.error is not None:
+                logger.error(f"Error generating TTS segment {i+1}: {result.error}")
                 await websocket.send_json(
                     {
                         "type": "tts_error",
-                        "message": f"Error generating segment {i+1}: {str(e)}",
+                        "message": f"Error generating segment {i+1}: {str(result.error)}",
                         "index": i,
-                        "total_segments": len(segments),
+                        "total_segments": total,
                     }
                 )
+                continue
+
+            # Envoyer le segment via WebSocket
+            segment_data = {
+                "type": "tts_segment",
+                "index": i,
+                "total_segments": total,
+                "text": result.text,
+                "is_final": i == total - 1 if total is not None else False,
+                "mime_type": mime_type,
+            }
+
+            if protocol == TTS_PROTOCOL_BINARY:
+                segment_data["audio_size"] = len(result.audio)
+                await websocket.send_json(segment_data)
+                await websocket.send_bytes(result.audio)
+            else:
+                segment_data["audio_data"] = base64.b64encode(result.audio).decode(
+                    "utf-8"
+                )
+                await websocket.send_json(segment_data)
+            if i == 0 and started_at is not None:
+                metrics.observe(
+                    "agent.first_audio_seconds", time.perf_counter() - started_at
+                )
+            logger.info(f"TTS segment {i+1}/{total or '?'} sent via WebSocket")
 
         # Signaler la fin du streaming TTS
         await websocket.send_json({"type": "tts_end"})
@@ -606,15 +1300,136 @@ async def get_session_history_adk(user_id: str, session_id: str):
         )
 
 
+# --- Endpoint de métriques (compteurs propres à ce worker) ---
+@app.get("/metrics")
+async def get_metrics():
+    return {
+        "tts_cache": tts_audio_cache.stats(),
+        "tts_scheduler": tts_scheduler.stats(),
+        "stt_engines": stt_router.stats(),
+        **metrics.snapshot(),
+    }
+
+
 # --- Endpoint TTS pour synthèse vocale ---
 
 
 class TTSRequest(BaseModel):
     text: str
+    # Format audio (voir AUDIO_FORMATS) : mp3, ogg_opus, ogg_opus_16k, linear16
+    audio_format: str = DEFAULT_AUDIO_FORMAT.name
 
 
 class TTSStreamRequest(BaseModel):
     text: str
+    # Nombre de segments synthétisés en parallèle (borné par TTS_MAX_CONCURRENCY)
+    concurrency: Optional[int] = None
+    # "json" : lignes data: {...} avec l'audio en base64 ; "audio" : flux audio/mpeg brut
+    mode: Literal["json", "audio"] = "json"
+    # Politique de taille des segments, TTS_STREAM_SEGMENT_SIZING par défaut
+    segment_sizing: Optional[Literal["fixed", "adaptive"]] = None
+    audio_format: str = DEFAULT_AUDIO_FORMAT.name
+
+
+def get_stream_audio_format(name: str) -> AudioFormat:
+    """
+    Format audio utilisable en flux continu : les segments WAV ont chacun leur
+    propre en-tête et ne peuvent pas être simplement mis bout à bout.
+    """
+    audio_format = get_audio_format(name)
+    if audio_format.extension == "wav":
+        raise ValueError(f"Audio format {name} cannot be streamed as raw audio")
+    return audio_format
+
+
+# Segments des flux audio bruts récents, consultables via /tts-stream/{id}/segments
+TTS_STREAM_MANIFESTS_MAX = int(os.getenv("TTS_STREAM_MANIFESTS_MAX", "256"))
+tts_stream_manifests: "OrderedDict[str, dict]" = OrderedDict()
+
+
+def create_stream_manifest(segments: list[str]) -> tuple[str, dict]:
+    stream_id = uuid.uuid4().hex
+    manifest = {
+        "total_segments": len(segments),
+        "done": False,
+        "segments": [
+            {"index": i, "text": text, "start": None, "duration": None, "error": None}
+            for i, text in enumerate(segments)
+        ],
+    }
+    tts_stream_manifests[stream_id] = manifest
+    while len(tts_stream_manifests) > TTS_STREAM_MANIFESTS_MAX:
+        tts_stream_manifests.popitem(last=False)
+    return stream_id, manifest
+
+
+def audio_stream_response(
+    segments: list[str],
+    concurrency: int,
+    audio_format: AudioFormat = DEFAULT_AUDIO_FORMAT,
+) -> StreamingResponse:
+    """
+    Réponse audio continue (audio/mpeg, audio/ogg) : les octets de chaque segment sont envoyés dès que
+    lui et les précédents sont synthétisés, ce qui permet une lecture progressive
+    par un simple élément <audio> ou par MediaSource.
+    Le flux forme un seul fichier : les trames MP3 sont envoyées sans tags ID3 ni
+    trame Xing/Info, les flux Ogg/Opus sont réunis en un seul flux logique.
+    Le texte, le début et la durée (secondes) de chaque segment sont fournis à
+    part, via /tts-stream/{X-TTS-Stream-Id}/segments ; un segment en échec est
+    omis du flux et signalé dans cette liste.
+    """
+    stream_id, manifest = create_stream_manifest(segments)
+    ogg_joiner = OggJoiner() if audio_format.extension == "ogg" else None
+
+    async def generate_audio_bytes():
+        synthesizer = OrderedSegmentSynthesizer(
+            segments, concurrency=concurrency, audio_format=audio_format
+        )
+        start = 0.0
+        try:
+            async for result in synthesizer.results():
+                segment = manifest["segments"][result.index]
+                error = result.error
+                if error is None:
+                    try:
+                        if ogg_joiner is not None:
+                            # CRC des pages réécrites en Python pur : hors de la boucle
+                            data = await asyncio.to_thread(ogg_joiner.add, result.audio)
+                            end = ogg_joiner.duration
+                        else:
+                            data = mp3_frames(result.audio)
+                            end = start + mp3_duration(data)
+                    except ValueError as e:
+                        error = e
+                if error is not None:
+                    logger.error(
+                        f"Error generating segment {result.index+1}, skipped in audio stream {stream_id}: {error}"
+                    )
+                    metrics.increment("tts_stream.audio_segment_errors")
+                    segment["error"] = str(error)
+                    continue
+                segment.update(start=start, duration=end - start)
+                start = end
+                yield data
+                logger.info(
+                    f"Segment {result.index+1}/{len(segments)} streamed as raw audio"
+                )
+            if ogg_joiner is not None:
+                with suppress(ValueError):
+                    yield ogg_joiner.finish()
+        finally:
+            manifest["done"] = True
+
+    return StreamingResponse(
+        generate_audio_bytes(),
+        media_type=audio_format.mime_type,
+        headers={
+            "Cache-Control": "no-cache",
+            "X-TTS-Total-Segments": str(len(segments)),
+            "X-TTS-Stream-Id": stream_id,
+            "Access-Control-Expose-Headers": "X-TTS-Total-Segments, X-TTS-Stream-Id",
+        },
+    )
 
 
 @app.post("/tts")
@@ -624,18 +1439,19 @@ async def text_to_speech(request: TTSRequest):
     """
     try:
         logger.info(f"TTS request received for text length: {len(request.text)}")
+        audio_format = get_audio_format(request.audio_format)
 
         # Générer l'audio à partir du texte
-        audio_bytes = await text_to_audio_bytes(request.text)
+        audio_bytes = await text_to_audio_bytes(request.text, audio_format)
 
         logger.info(f"TTS audio generated successfully, size: {len(audio_bytes)} bytes")
 
-        # Retourner l'audio en tant que réponse MP3
+        # Retourner l'audio dans le format demandé
         return Response(
             content=audio_bytes,
-            media_type="audio/mpeg",
+            media_type=audio_format.mime_type,
             headers={
-                "Content-Disposition": "inline; filename=speech.mp3",
+                "Content-Disposition": f"inline; filename=speech.{audio_format.extension}",
                 "Cache-Control": "no-cache",
             },
         )
@@ -657,8 +1473,14 @@ async def text_to_speech_stream(request: TTSStreamRequest):
     try:
         logger.info(f"TTS stream request received for text length: {len(request.text)}")
 
+        if request.mode == "audio":
+            audio_format = get_stream_audio_format(request.audio_format)
+        else:
+            audio_format = get_audio_format(request.audio_format)
+
         # Traiter le texte et générer les segments
-        segments = await process_text_and_generate_segments(request.text)
+        sizing = get_segment_sizing(request.segment_sizing or TTS_STREAM_SEGMENT_SIZING)
+        segments = await process_text_and_generate_segments(request.text, sizing=sizing)
         logger.info(f"Text divided into {len(segments)} segments")
 
         if not segments:
@@ -666,44 +1488,44 @@ async def text_to_speech_stream(request: TTSStreamRequest):
                 status_code=400, detail="No valid segments generated from text"
             )
 
-        async def generate_audio_stream():
-            """Générateur qui yield les segments audio un par un"""
-            for i, segment in enumerate(segments):
-                try:
-                    logger.info(
-                        f"Generating audio for segment {i+1}/{len(segments)}: {segment[:50]}..."
-                    )
-
-                    # Générer l'audio pour ce segment
-                    audio_bytes = await generate_audio_for_segment(segment)
+        concurrency = min(
+            request.concurrency or TTS_STREAM_CONCURRENCY, TTS_MAX_CONCURRENCY
+        )
 
-                    # Créer un envelope JSON avec les métadonnées du segment
-                    import json
-                    import base64
+        if request.mode == "audio":
+            return audio_stream_response(segments, concurrency, audio_format)
 
-                    segment_data = {
+        async def generate_audio_stream():
+            """Générateur qui yield les segments audio dans l'ordre, dès qu'ils sont prêts"""
+            synthesizer = OrderedSegmentSynthesizer(
+                segments, concurrency=concurrency, audio_format=audio_format
+            )
+            async for result in synthesizer.results():
+                i = result.index
+                if result.error is not None:
+                    logger.error(f"Error generating segment {i+1}: {result.error}")
+                    error_data = {
+                        "error": f"Error generating segment {i+1}: {str(result.error)}",
                         "index": i,
                         "total_segments": len(segments),
-                        "text": segment,
-                        "audio_data": base64.b64encode(audio_bytes).decode("utf-8"),
-                        "is_final": i == len(segments) - 1,
                     }
+                    yield f"data: {dumps(error_data)}\n\n"
+                    continue
 
-                    # Yield le segment avec délimiteur pour le parsing côté client
-                    yield f"data: {json.dumps(segment_data)}\n\n"
-
-                    logger.info(f"Segment {i+1}/{len(segments)} generated and sent")
+                # Créer un envelope JSON avec les métadonnées du segment
+                segment_data = {
+                    "index": i,
+                    "total_segments": len(segments),
+                    "text": result.text,
+                    "audio_data": base64.b64encode(result.audio).decode("utf-8"),
+                    "is_final": i == len(segments) - 1,
+                    "mime_type": audio_format.mime_type,
+                }
 
-                except Exception as e:
-                    logger.error(f"Error generating segment {i+1}: {e}")
-                    error_data = {
-                        "error": f"Error generating segment {i+1}: {str(e)}",
-                        "index": i,
-                        "total_segments": len(segments),
-                    }
-                    yield f"data: {json.dumps(error_data)}\n\n"
+                # Yield le segment avec délimiteur pour le parsing côté client
+                yield f"data: {dumps(segment_data)}\n\n"
 
-        from fastapi.responses import StreamingResponse
+                logger.info(f"Segment {i+1}/{len(segments)} generated and sent")
 
         return StreamingResponse(
             generate_audio_stream(),
@@ -722,3 +1544,46 @@ async def text_to_speech_stream(request: TTSStreamRequest):
         raise HTTPException(
             status_code=500, detail="Error generating streaming speech audio"
         )
+
+
+@app.get("/tts-stream/audio")
+async def text_to_speech_audio_stream(
+    text: str,
+    concurrency: Optional[int] = None,
+    segment_sizing: Literal["fixed", "adaptive"] = TTS_STREAM_SEGMENT_SIZING,
+    audio_format: str = DEFAULT_AUDIO_FORMAT.name,
+):
+    """
+    Variante GET du mode "audio" de /tts-stream, utilisable directement comme
+    source d'un élément <audio>.
+    """
+    logger.info(f"TTS audio stream request received for text length: {len(text)}")
+    try:
+        stream_format = get_stream_audio_format(audio_format)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    segments = await process_text_and_generate_segments(
+        text, sizing=get_segment_sizing(segment_sizing)
+    )
+    if not segments:
+        raise HTTPException(
+            status_code=400, detail="No valid segments generated from text"
+        )
+    return audio_stream_response(
+        segments,
+        min(concurrency or TTS_STREAM_CONCURRENCY, TTS_MAX_CONCURRENCY),
+        stream_format,
+    )
+
+
+@app.get("/tts-stream/{stream_id}/segments")
+async def text_to_speech_stream_segments(stream_id: str):
+    """
+    Segments d'un flux audio brut (en-tête X-TTS-Stream-Id) : texte, début et
+    durée dans le flux, erreur éventuelle. `done` passe à true une fois le flux
+    terminé ; les segments pas encore envoyés ont un début nul.
+    """
+    manifest = tts_stream_manifests.get(stream_id)
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="Unknown audio stream")
+    return manifest
@@ -0,0 +1,312 @@
+"""
+Concaténation de fichiers audio sans ré-encodage.
+
+Chaque morceau est un fichier complet renvoyé par le TTS ; le résultat doit être
+un seul fichier valide :
+- MP3 : les trames MPEG sont mises bout à bout, sans les tags ID3 ni les trames
+  d'information Xing/Info/VBRI, qui décriraient la durée d'un seul morceau ;
+- Ogg/Opus : les pages audio des morceaux suivants sont réécrites dans le flux
+  logique du premier (numéro de série, numéros de page, positions, CRC) ;
+- WAV : les données PCM sont réunies derrière l'en-tête du premier morceau.
+"""
+
+import struct
+
+# --- MP3 ---
+
+# Débits (kbit/s) par index, pour MPEG-1 et MPEG-2/2.5 couche III
+_MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG-1
+    2: (22050, 24000, 16000),  # MPEG-2
+    0: (11025, 12000, 8000),  # MPEG-2.5
+}
+
+
+def _strip_id3(data: bytes) -> bytes:
+    if data[:3] == b"ID3" and len(data) >= 10:
+        # Taille "synchsafe" sur 4 octets de 7 bits, plus un pied de page optionnel
+        size = (
+            (data[6] & 0x7F) << 21
+            | (data[7] & 0x7F) << 14
+            | (data[8] & 0x7F) << 7
+            | (data[9] & 0x7F)
+        )
+        footer = 10 if data[5] & 0x10 else 0
+        data = data[10 + size + footer :]
+    if len(data) >= 128 and data[-128:-125] == b"TAG":
+        data = data[:-128]
+    return data
+
+
+def _mp3_frame_length(data: bytes, offset: int) -> int:
+    """Longueur de la trame MPEG couche III à `offset`, 0 si ce n'en est pas une."""
+    if offset + 4 > len(data):
+        return 0
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    if data[offset] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return 0
+    version = (b1 >> 3) & 0x03
+    layer = (b1 >> 1) & 0x03
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return 0
+    bitrate = _MP3_BITRATES[1 if version == 3 else 2][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+    coefficient = 144 if version == 3 else 72
+    return coefficient * bitrate // sample_rate + padding
+
+
+def _is_mp3_info_frame(data: bytes, offset: int) -> bool:
+    b1, b3 = data[offset + 1], data[offset + 3]
+    mpeg1 = (b1 >> 3) & 0x03 == 3
+    mono = b3 >> 6 == 3
+    side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+    tag = data[offset + 4 + side_info : offset + 8 + side_info]
+    return tag in (b"Xing", b"Info") or data[offset + 36 : offset + 40] == b"VBRI"
+
+
+def mp3_frames(data: bytes) -> bytes:
+    """Trames audio d'un fichier MP3, sans tags ni trame d'information."""
+    data = _strip_id3(data)
+    # Se caler sur la première trame dont la suivante est aussi une trame valide
+    offset = 0
+    while offset < len(data):
+        length = _mp3_frame_length(data, offset)
+        if length and (
+            offset + length == len(data) or _mp3_frame_length(data, offset + length)
+        ):
+            break
+        offset += 1
+    else:
+        raise ValueError("No MPEG audio frame found")
+
+    if _is_mp3_info_frame(data, offset):
+        offset += _mp3_frame_length(data, offset)
+    return data[offset:]
+
+
+def mp3_duration(frames: bytes) -> float:
+    """Durée (secondes) d'une suite de trames MPEG couche III (voir mp3_frames)."""
+    duration = 0.0
+    offset = 0
+    while offset < len(frames):
+        length = _mp3_frame_length(frames, offset)
+        if not length:
+            break
+        b1, b2 = frames[offset + 1], frames[offset + 2]
+        version = (b1 >> 3) & 0x03
+        sample_rate = _MP3_SAMPLE_RATES[version][(b2 >> 2) & 0x03]
+        duration += (1152 if version == 3 else 576) / sample_rate
+        offset += length
+    return duration
+
+
+def concat_mp3(chunks: list[bytes]) -> bytes:
+    return b"".join(mp3_frames(chunk) for chunk in chunks)
+
+
+# --- Ogg ---
+
+_OGG_HEADER = struct.Struct("<4sBBqIIIB")
+
+
+def _ogg_crc_table() -> list[int]:
+    table = []
+    for i in range(256):
+        crc = i << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) if crc & 0x80000000 else crc << 1
+        table.append(crc & 0xFFFFFFFF)
+    return table
+
+
+_OGG_CRC_TABLE = _ogg_crc_table()
+
+
+def ogg_crc(data: bytes) -> int:
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _OGG_CRC_TABLE[(crc >> 24) ^ byte]
+    return crc
+
+
+def ogg_pages(data: bytes):
+    """Itère sur (header_type, granule_position, serial, segment_table, body)."""
+    offset = 0
+    while offset < len(data):
+        if (
+            data[offset : offset + 4] != b"OggS"
+            or len(data) - offset < _OGG_HEADER.size
+        ):
+            raise ValueError(f"Invalid Ogg page at offset {offset}")
+        _, _, header_type, granule, serial, _, _, segment_count = (
+            _OGG_HEADER.unpack_from(data, offset)
+        )
+        table_start = offset + _OGG_HEADER.size
+        segment_table = data[table_start : table_start + segment_count]
+        body_start = table_start + segment_count
+        body_end = body_start + sum(segment_table)
+        if body_end > len(data):
+            raise ValueError(f"Truncated Ogg page at offset {offset}")
+        yield header_type, granule, serial, segment_table, data[body_start:body_end]
+        offset = body_end
+
+
+def _ogg_page(
+    header_type: int,
+    granule: int,
+    serial: int,
+    sequence: int,
+    segment_table: bytes,
+    body: bytes,
+) -> bytes:
+    header = _OGG_HEADER.pack(
+        b"OggS", 0, header_type, granule, serial, sequence, 0, len(segment_table)
+    )
+    page = bytearray(header + segment_table + body)
+    struct.pack_into("<I", page, 22, ogg_crc(page))
+    return bytes(page)
+
+
+def _opus_pre_skip(body: bytes) -> int:
+    """Pre-skip (échantillons à 48 kHz) déclaré par un en-tête OpusHead, 0 sinon."""
+    if body[:8] == b"OpusHead" and len(body) >= 12:
+        return struct.unpack_from("<H", body, 10)[0]
+    return 0
+
+
+class OggJoiner:
+    """
+    Réunit au fil de l'eau plusieurs flux Ogg (un seul flux logique chacun, Opus
+    par exemple) en un seul : les pages d'en-tête (position 0) des morceaux
+    suivants sont omises et les positions de ceux-ci sont décalées de la
+    dernière position déjà écrite. Pour Opus, les échantillons d'amorce
+    (pre-skip) des morceaux suivants sont décodés comme le reste : seules les
+    positions comptent tous les échantillons décodés, et seul le pre-skip du
+    premier morceau est retiré à la lecture.
+
+    `add` retourne les pages prêtes à envoyer ; la dernière page reçue est
+    retenue jusqu'au morceau suivant ou à `finish`, qui la marque fin de flux.
+    """
+
+    def __init__(self):
+        self.serial = None
+        self.sequence = 0
+        self.last_granule = 0
+        self.pre_skip = 0
+        self._chunks = 0
+        self._held = None
+
+    def add(self, chunk: bytes) -> bytes:
+        # Lire tout le morceau avant de toucher à l'état : une page invalide
+        # laisse le flux réuni tel quel
+        pages = list(ogg_pages(chunk))
+        output = []
+        granule_offset = self.last_granule
+        in_headers = True
+        for header_type, granule, chunk_serial, segment_table, body in pages:
+            if self.serial is None:
+                self.serial = chunk_serial
+                self.pre_skip = _opus_pre_skip(body)
+            if self._chunks > 0 and in_headers and granule == 0:
+                continue
+            in_headers = False
+            # Drapeaux début/fin de flux : seulement pour le flux réuni
+            header_type &= ~0x06
+            if granule != -1:
+                granule += granule_offset
+                self.last_granule = granule
+            if self._held is not None:
+                output.append(self._page(*self._held))
+            self._held = (header_type, granule, segment_table, body)
+        self._chunks += 1
+        return b"".join(output)
+
+    @property
+    def duration(self) -> float:
+        """Durée (secondes) des pages ajoutées, positions Opus à 48 kHz."""
+        return max(self.last_granule - self.pre_skip, 0) / 48000
+
+    def finish(self) -> bytes:
+        """Dernière page du flux réuni, marquée fin de flux."""
+        if self._held is None:
+            raise ValueError("No Ogg page found")
+        header_type, granule, segment_table, body = self._held
+        self._held = None
+        return self._page(header_type | 0x04, granule, segment_table, body)
+
+    def _page(
+        self, header_type: int, granule: int, segment_table: bytes, body: bytes
+    ) -> bytes:
+        if self.sequence == 0:
+            header_type |= 0x02
+        page = _ogg_page(
+            header_type, granule, self.serial, self.sequence, segment_table, body
+        )
+        self.sequence += 1
+        return page
+
+
+def concat_ogg(chunks: list[bytes]) -> bytes:
+    """Réunit plusieurs flux Ogg en un seul (voir OggJoiner)."""
+    joiner = OggJoiner()
+    pages = [joiner.add(chunk) for chunk in chunks]
+    pages.append(joiner.finish())
+    return b"".join(pages)
+
+
+# --- WAV ---
+
+
+def wav_chunks(data: bytes):
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Not a RIFF/WAVE file")
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id, size = struct.unpack_from("<4sI", data, offset)
+        yield chunk_id, offset, data[offset + 8 : offset + 8 + size]
+        offset += 8 + size + (size & 1)
+
+
+def concat_wav(chunks: list[bytes]) -> bytes:
+    """Concatène des WAV PCM de même format sous l'en-tête du premier."""
+    header = b""
+    pcm = []
+    fmt = None
+    for chunk in chunks:
+        for chunk_id, offset, payload in wav_chunks(chunk):
+            if chunk_id == b"fmt ":
+                if fmt is None:
+                    fmt = payload
+                elif payload != fmt:
+                    raise ValueError("WAV chunks have different formats")
+            if chunk_id == b"data":
+                if not header:
+                    header = chunk[12:offset]
+                pcm.append(payload)
+                break
+    data = b"".join(pcm)
+    body = b"WAVE" + header + struct.pack("<4sI", b"data", len(data)) + data
+    if len(data) & 1:
+        body += b"\x00"
+    return struct.pack("<4sI", b"RIFF", len(body)) + body
+
+
+_CONCATENATORS = {"mp3": concat_mp3, "ogg": concat_ogg, "wav": concat_wav}
+
+
+def concat_audio(chunks: list[bytes], extension: str) -> bytes:
+    """Concatène des fichiers audio du même format ("mp3", "ogg" ou "wav")."""
+    if len(chunks) == 1:
+        return chunks[0]
+    try:
+        concatenate = _CONCATENATORS[extension]
+    except KeyError:
+        raise ValueError(f"Cannot concatenate {extension} audio") from None
+    return concatenate(chunks)
@@ -0,0 +1,202 @@
+"""
+Décodage des enregistrements vocaux en PCM mono 16 kHz pour la reconnaissance.
+
+Le conteneur est identifié par ses premiers octets, pas par le type MIME annoncé
+par le client. Le WAV est décodé directement avec NumPy (mixage en mono et
+rééchantillonnage vectorisés) ; les formats compressés (WebM, Ogg, MP4/AAC,
+MP3, FLAC) sont décodés par ffmpeg, qui mixe et rééchantillonne dans la même
+passe. Les calculs tournent dans un pool de threads dédié, hors de la boucle
+d'événements.
+"""
+
+import asyncio
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+import numpy as np
+
+from shared.lib.audio_concat import _mp3_frame_length, wav_chunks
+
+T = TypeVar("T")
+
+DECODE_SAMPLE_RATE = 16000
+# Délai maximal du décodage ffmpeg d'un enregistrement
+DECODE_TIMEOUT_SECONDS = float(os.getenv("STT_DECODE_TIMEOUT_SECONDS", "30"))
+
+audio_decode_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("STT_DECODE_WORKERS", "4")),
+    thread_name_prefix="audio-decode",
+)
+
+
+async def run_in_decode_pool(func: Callable[..., T], *args) -> T:
+    """Exécute un calcul audio (NumPy libère le GIL) dans le pool de décodage."""
+    return await asyncio.get_running_loop().run_in_executor(
+        audio_decode_executor, func, *args
+    )
+
+
+# --- Identification du conteneur ---
+
+
+def probe_container(content: bytes) -> str:
+    """
+    Conteneur de l'enregistrement d'après ses premiers octets : "webm",
+    "ogg_opus", "ogg", "flac", "wav", "mp4", "mp3", ou "raw" (PCM sans en-tête).
+    """
+    if content[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if content[:4] == b"OggS":
+        # L'en-tête du premier paquet suit la table des segments de la page
+        return "ogg_opus" if content[28:36] == b"OpusHead" else "ogg"
+    if content[:4] == b"fLaC":
+        return "flac"
+    if content[:4] == b"RIFF" and content[8:12] == b"WAVE":
+        return "wav"
+    if content[4:8] == b"ftyp":
+        return "mp4"
+    if content[:3] == b"ID3" or _starts_with_mp3_frames(content):
+        return "mp3"
+    return "raw"
+
+
+def _starts_with_mp3_frames(content: bytes) -> bool:
+    # Un mot de synchro seul ne suffit pas : du PCM commençant par un petit
+    # échantillon négatif (-1 = FF FF) y ressemble. On exige une seconde
+    # trame valide à la longueur annoncée par la première.
+    length = _mp3_frame_length(content, 0)
+    return bool(length) and bool(_mp3_frame_length(content, length))
+
+
+# --- WAV ---
+
+_WAVE_FORMAT_PCM = 1
+_WAVE_FORMAT_IEEE_FLOAT = 3
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def wav_format(content: bytes) -> tuple[int, int, int, int]:
+    """(format, canaux, fréquence, bits par échantillon) d'un fichier WAV."""
+    for chunk_id, _, payload in wav_chunks(content):
+        if chunk_id == b"fmt ":
+            format_tag, channels, sample_rate = struct.unpack_from("<HHI", payload)
+            bits = struct.unpack_from("<H", payload, 14)[0]
+            if format_tag == _WAVE_FORMAT_EXTENSIBLE and len(payload) >= 26:
+                # Le vrai format est dans les deux premiers octets du sous-type GUID
+                format_tag = struct.unpack_from("<H", payload, 24)[0]
+            return format_tag, channels, sample_rate, bits
+    raise ValueError("WAV file without fmt chunk")
+
+
+def decode_wav(content: bytes) -> tuple[np.ndarray, int]:
+    """Échantillons float32 dans [-1, 1], de forme (n, canaux), et fréquence."""
+    format_tag, channels, sample_rate, bits = wav_format(content)
+    data = next(
+        (
+            payload
+            for chunk_id, _, payload in wav_chunks(content)
+            if chunk_id == b"data"
+        ),
+        None,
+    )
+    if data is None:
+        raise ValueError("WAV file without data chunk")
+    width = bits // 8
+    data = data[: len(data) // (width * channels) * width * channels]
+
+    if format_tag == _WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+        samples = np.frombuffer(data, dtype=f"<f{width}").astype(np.float32)
+    elif format_tag == _WAVE_FORMAT_PCM and bits == 8:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif format_tag == _WAVE_FORMAT_PCM and bits in (16, 32):
+        samples = np.frombuffer(data, dtype=f"<i{width}").astype(np.float32)
+        samples /= 2 ** (bits - 1)
+    elif format_tag == _WAVE_FORMAT_PCM and bits == 24:
+        # Trois octets petit-boutistes, étendus en int32 par le signe
+        triplets = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = triplets[:, 0] | triplets[:, 1] << 8 | triplets[:, 2] << 16
+        samples = (np.where(values & 0x800000, values - 0x1000000, values)).astype(
+            np.float32
+        ) / 2**23
+    else:
+        raise ValueError(f"Unsupported WAV encoding (format {format_tag}, {bits} bits)")
+    return samples.reshape(-1, channels), sample_rate
+
+
+def downmix(samples: np.ndarray) -> np.ndarray:
+    """Moyenne des canaux d'un tableau (n, canaux)."""
+    return samples.mean(axis=1) if samples.ndim == 2 else samples
+
+
+def resample(samples: np.ndarray, rate: int, target: int = DECODE_SAMPLE_RATE):
+    """
+    Rééchantillonnage par FFT : le spectre est tronqué (ou complété) à la
+    nouvelle fréquence de Nyquist, ce qui sert aussi de filtre anti-repliement.
+    """
+    if rate == target or len(samples) == 0:
+        return samples
+    length = int(round(len(samples) * target / rate))
+    spectrum = np.fft.rfft(samples)
+    return np.fft.irfft(spectrum, n=length)[:length] * (length / len(samples))
+
+
+def to_int16(samples: np.ndarray) -> np.ndarray:
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+
+
+def wav_to_pcm(content: bytes) -> np.ndarray:
+    """WAV quelconque -> int16 mono 16 kHz."""
+    samples, rate = decode_wav(content)
+    return to_int16(resample(downmix(samples), rate))
+
+
+# --- Formats compressés ---
+
+
+async def ffmpeg_to_pcm(content: bytes) -> np.ndarray:
+    """Décode avec ffmpeg en int16 mono 16 kHz. FileNotFoundError sans ffmpeg."""
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-i",
+        "pipe:0",
+        "-f",
+        "s16le",
+        "-ac",
+        "1",
+        "-ar",
+        str(DECODE_SAMPLE_RATE),
+        "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            process.communicate(content), DECODE_TIMEOUT_SECONDS
+        )
+    except BaseException:
+        if process.returncode is None:
+            process.kill()
+        raise
+    if process.returncode != 0:
+        raise ValueError(f"ffmpeg failed: {stderr.decode(errors='replace').strip()}")
+    return np.frombuffer(stdout, dtype="<i2")
+
+
+async def decode_to_pcm(content: bytes, container: str) -> np.ndarray:
+    """Décode l'enregistrement en échantillons int16 mono à DECODE_SAMPLE_RATE."""
+    if container == "raw":
+        # LINEAR16 sans en-tête, supposé déjà à 16 kHz
+        return np.frombuffer(content[: len(content) // 2 * 2], dtype="<i2")
+    if container == "wav":
+        try:
+            return await run_in_decode_pool(wav_to_pcm, content)
+        except ValueError:
+            # Encodage WAV compressé (ADPCM, mu-law...) : ffmpeg sait le lire
+            pass
+    return await ffmpeg_to_pcm(content)
@@ -0,0 +1,119 @@
+import asyncio
+import itertools
+import logging
+import os
+from contextlib import asynccontextmanager, nullcontext, suppress
+from typing import Any, AsyncIterator, Callable, Generic, Iterator, Optional, TypeVar
+
+import grpc
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Options gRPC communes : le keepalive garde les canaux HTTP/2 ouverts entre deux
+# tours de conversation, ce qui évite de repayer le handshake TLS à chaque segment.
+GRPC_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", int(os.getenv("GRPC_KEEPALIVE_TIME_MS", "30000"))),
+    ("grpc.keepalive_timeout_ms", int(os.getenv("GRPC_KEEPALIVE_TIMEOUT_MS", "10000"))),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+
+def create_grpc_async_transport(transport_cls: Any, emulator_env: str) -> Any:
+    """
+    Construit un transport gRPC asyncio avec les options de keepalive.
+    Si la variable d'environnement `emulator_env` est définie (ex: "localhost:50051"),
+    on se connecte en clair à ce serveur local au lieu de l'API Google.
+    """
+    emulator_host = os.getenv(emulator_env)
+    if emulator_host:
+        channel = grpc.aio.insecure_channel(emulator_host, options=GRPC_CHANNEL_OPTIONS)
+    else:
+        channel = transport_cls.create_channel(options=GRPC_CHANNEL_OPTIONS)
+    return transport_cls(channel=channel)
+
+
+class AsyncClientPool(Generic[T]):
+    """
+    Pool de clients async partagé par tout le process.
+
+    Les clients (et leurs canaux gRPC) sont créés paresseusement au premier appel,
+    dans la boucle d'événements d'uvicorn, puis distribués en round-robin.
+    Un sémaphore plafonne le nombre d'appels simultanés vers le fournisseur ;
+    `max_concurrent_calls=None` le retire quand un ordonnanceur en amont
+    (tts_scheduler) est déjà seul juge de la concurrence.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], T],
+        size: int = 4,
+        max_concurrent_calls: Optional[int] = 16,
+    ):
+        self.name = name
+        self._factory = factory
+        self._size = max(1, size)
+        self._max_concurrent_calls = (
+            max(1, max_concurrent_calls) if max_concurrent_calls is not None else None
+        )
+        self._clients: list[T] = []
+        self._cycle: Optional[Iterator[T]] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = asyncio.Lock()
+        self.in_flight = 0
+
+    @property
+    def started(self) -> bool:
+        return bool(self._clients)
+
+    async def _ensure_started(self):
+        if self._clients:
+            return
+        async with self._lock:
+            if self._clients:
+                return
+            logger.info(
+                f"Starting {self.name} client pool "
+                f"(size={self._size}, max_concurrent_calls={self._max_concurrent_calls})"
+            )
+            if self._max_concurrent_calls is not None:
+                self._semaphore = asyncio.Semaphore(self._max_concurrent_calls)
+            self._clients = [self._factory() for _ in range(self._size)]
+            self._cycle = itertools.cycle(self._clients)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[T]:
+        """Emprunte un client du pool en respectant la limite d'appels simultanés."""
+        await self._ensure_started()
+        async with self._semaphore or nullcontext():
+            client = next(self._cycle)
+            self.in_flight += 1
+            try:
+                yield client
+            finally:
+                self.in_flight -= 1
+
+    async def borrow(self) -> T:
+        """
+        Emprunte un client sans occuper de place d'appel : pour les flux longs
+        (reconnaissance en streaming), qui ont leur propre limite et ne doivent
+        pas bloquer les appels courts.
+        """
+        await self._ensure_started()
+        return next(self._cycle)
+
+    async def close(self):
+        """Ferme les canaux gRPC ; le pool redémarrera au prochain appel."""
+        async with self._lock:
+            clients, self._clients = self._clients, []
+            self._cycle = None
+        for client in clients:
+            transport = getattr(client, "transport", None)
+            if transport is not None:
+                with suppress(Exception):
+                    await transport.close()
+        if clients:
+            logger.info(f"{self.name} client pool closed ({len(clients)} clients)")
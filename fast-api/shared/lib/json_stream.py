@@ -0,0 +1,200 @@
+from typing import Iterable, Optional
+
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+# États de l'analyseur
+_BEFORE_OBJECT = 0
+_BEFORE_KEY = 1
+_KEY = 2
+_BEFORE_COLON = 3
+_BEFORE_VALUE = 4
+_STRING = 5
+_SKIP_VALUE = 6
+_DONE = 7
+
+
+class JsonFieldStream:
+    """
+    Extrait au fil de l'eau les champs texte de premier niveau d'un objet JSON en
+    cours de génération (ex: la sortie `output_schema` d'un agent, reçue token
+    par token).
+
+    `feed` retourne, pour chaque champ suivi, le texte décodé arrivé avec ce
+    morceau : échappements et séquences \\uXXXX (paires de substitution
+    comprises) sont résolus même s'ils sont coupés entre deux morceaux. Tout ce
+    qui précède la première accolade (bloc ```json) est ignoré, de même que les
+    champs non suivis et les valeurs qui ne sont pas des chaînes.
+    """
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields = set(fields)
+        self.values: dict[str, str] = {}
+        self.completed: set[str] = set()
+        self._state = _BEFORE_OBJECT
+        self._key: list[str] = []
+        self._field: Optional[str] = None
+        # Échappement en cours : "" après "\", "uXXXX" partiel ensuite
+        self._escape: Optional[str] = None
+        self._high_surrogate: Optional[int] = None
+        # Valeur ignorée : profondeur d'imbrication, chaîne et échappement en cours
+        self._depth = 0
+        self._skip_in_string = False
+        self._skip_escape = False
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    def feed(self, chunk: str) -> dict[str, str]:
+        deltas: dict[str, list[str]] = {}
+        i = 0
+        length = len(chunk)
+        while i < length:
+            state = self._state
+            if state == _STRING:
+                i = self._read_string(chunk, i, deltas)
+                continue
+
+            char = chunk[i]
+            i += 1
+            if state == _BEFORE_OBJECT:
+                if char == "{":
+                    self._state = _BEFORE_KEY
+            elif state == _BEFORE_KEY:
+                if char == '"':
+                    self._key = []
+                    self._state = _KEY
+                elif char == "}":
+                    self._state = _DONE
+            elif state == _KEY:
+                if self._escape is not None:
+                    self._key.append(_ESCAPES.get(char, char))
+                    self._escape = None
+                elif char == "\\":
+                    self._escape = ""
+                elif char == '"':
+                    self._state = _BEFORE_COLON
+                else:
+                    self._key.append(char)
+            elif state == _BEFORE_COLON:
+                if char == ":":
+                    self._state = _BEFORE_VALUE
+            elif state == _BEFORE_VALUE:
+                if char == '"':
+                    key = "".join(self._key)
+                    self._field = key if key in self.fields else None
+                    if self._field is not None:
+                        self.values.setdefault(self._field, "")
+                    self._state = _STRING
+                elif not char.isspace():
+                    self._depth = 1 if char in "{[" else 0
+                    self._skip_in_string = False
+                    self._state = _SKIP_VALUE
+                    if self._depth == 0:
+                        # Scalaire (nombre, booléen, null) : se termine à , ou }
+                        i -= 1
+            elif state == _SKIP_VALUE:
+                self._skip(char)
+        return {field: "".join(parts) for field, parts in deltas.items() if parts}
+
+    def _emit(self, text: str, deltas: dict[str, list[str]]):
+        if self._field is not None and text:
+            self.values[self._field] += text
+            deltas.setdefault(self._field, []).append(text)
+
+    def _read_string(self, chunk: str, i: int, deltas: dict[str, list[str]]) -> int:
+        if self._escape is not None:
+            return self._read_escape(chunk, i, deltas)
+
+        # Copier d'un bloc jusqu'au prochain guillemet ou antislash
+        end = i
+        length = len(chunk)
+        while end < length and chunk[end] not in '"\\':
+            end += 1
+        if end > i:
+            self._flush_surrogate(deltas)
+            self._emit(chunk[i:end], deltas)
+        if end == length:
+            return end
+        if chunk[end] == '"':
+            self._flush_surrogate(deltas)
+            if self._field is not None:
+                self.completed.add(self._field)
+            self._field = None
+            self._state = _BEFORE_KEY
+        else:
+            self._escape = ""
+        return end + 1
+
+    def _read_escape(self, chunk: str, i: int, deltas: dict[str, list[str]]) -> int:
+        escape = self._escape
+        if escape == "":
+            char = chunk[i]
+            if char == "u":
+                self._escape = "u"
+                return i + 1
+            self._escape = None
+            self._flush_surrogate(deltas)
+            self._emit(_ESCAPES.get(char, char), deltas)
+            return i + 1
+
+        # \uXXXX, éventuellement coupé entre deux morceaux
+        needed = 5 - len(escape)
+        escape += chunk[i : i + needed]
+        i += min(needed, len(chunk) - i)
+        if len(escape) < 5:
+            self._escape = escape
+            return i
+        self._escape = None
+        try:
+            code = int(escape[1:], 16)
+        except ValueError:
+            return i
+        if 0xD800 <= code <= 0xDBFF:
+            self._flush_surrogate(deltas)
+            self._high_surrogate = code
+        elif 0xDC00 <= code <= 0xDFFF and self._high_surrogate is not None:
+            high, self._high_surrogate = self._high_surrogate, None
+            self._emit(chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00)), deltas)
+        else:
+            self._flush_surrogate(deltas)
+            self._emit(chr(code), deltas)
+        return i
+
+    def _flush_surrogate(self, deltas: dict[str, list[str]]):
+        # Moitié de paire isolée : caractère de remplacement
+        if self._high_surrogate is not None:
+            self._high_surrogate = None
+            self._emit("�", deltas)
+
+    def _skip(self, char: str):
+        if self._skip_in_string:
+            if self._skip_escape:
+                self._skip_escape = False
+            elif char == "\\":
+                self._skip_escape = True
+            elif char == '"':
+                self._skip_in_string = False
+            return
+        if char == '"':
+            self._skip_in_string = True
+        elif char in "{[":
+            self._depth += 1
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth < 0:
+                # Fin de l'objet principal après un scalaire
+                self._state = _DONE
+            elif self._depth == 0:
+                self._state = _BEFORE_KEY
+        elif char == "," and self._depth == 0:
+            self._state = _BEFORE_KEY
@@ -0,0 +1,85 @@
+import statistics
+import threading
+from collections import defaultdict, deque
+from typing import Any
+
+
+class Metrics:
+    """
+    Registre de métriques en mémoire, propre à chaque worker uvicorn.
+    Compteurs, jauges et distributions (count/sum/max + percentiles sur une
+    fenêtre glissante), exposés en JSON par l'endpoint /metrics.
+    """
+
+    def __init__(self, window: int = 1000):
+        self._window = window
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = defaultdict(int)
+        self._gauges: dict[str, float] = {}
+        self._samples: dict[str, deque] = {}
+        self._totals: dict[str, dict[str, float]] = {}
+
+    def increment(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float):
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self._window)
+                self._totals[name] = {"count": 0, "sum": 0.0, "max": value}
+            samples.append(value)
+            totals = self._totals[name]
+            totals["count"] += 1
+            totals["sum"] += value
+            totals["max"] = max(totals["max"], value)
+
+    def percentile(self, name: str, q: float) -> float | None:
+        with self._lock:
+            samples = list(self._samples.get(name, ()))
+        if not samples:
+            return None
+        if len(samples) == 1:
+            return samples[0]
+        return statistics.quantiles(samples, n=100, method="inclusive")[
+            min(98, max(0, int(q) - 1))
+        ]
+
+    def count(self, name: str) -> int:
+        """Nombre total d'observations d'une distribution."""
+        with self._lock:
+            totals = self._totals.get(name)
+            return int(totals["count"]) if totals else 0
+
+    def get(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, self._gauges.get(name, 0))
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            names = list(self._samples)
+        distributions = {}
+        for name in names:
+            with self._lock:
+                totals = dict(self._totals[name])
+            distributions[name] = {
+                **totals,
+                "avg": totals["sum"] / totals["count"] if totals["count"] else None,
+                "p50": self.percentile(name, 50),
+                "p95": self.percentile(name, 95),
+            }
+        return {
+            "counters": counters,
+            "gauges": gauges,
+            "distributions": distributions,
+        }
+
+
+metrics = Metrics()
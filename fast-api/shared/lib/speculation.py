@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import os
+import re
+import time
+import uuid
+from contextlib import suppress
+from typing import Any, AsyncIterator, Optional
+
+import google.genai as genai
+
+from shared.lib.metrics import metrics
+from shared.lib.speech_text import (
+    SPECULATIVE_STATE_KEY,
+    save_speech_text,
+    set_speech_text_listener,
+)
+from shared.lib.tts import SpeechPrefetch
+
+logger = logging.getLogger(__name__)
+
+# Démarrage spéculatif de l'agent pendant un enregistrement vocal en streaming
+# (activable aussi par connexion, via audio_stream_start)
+AGENT_SPECULATIVE_START = (
+    os.getenv("AGENT_SPECULATIVE_START", "false").lower() == "true"
+)
+# Silence après un résultat définitif avant de lancer la spéculation
+AGENT_SPECULATION_SILENCE_SECONDS = float(
+    os.getenv("AGENT_SPECULATION_SILENCE_SECONDS", "0.4")
+)
+
+_NOT_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_transcript(text: str) -> str:
+    """Transcription sans casse ni ponctuation, pour comparer deux versions."""
+    return " ".join(_NOT_WORD.sub(" ", text.lower()).split())
+
+
+def same_transcript(a: str, b: str) -> bool:
+    """Vrai si les deux transcriptions ne diffèrent que par la casse ou la ponctuation."""
+    return normalize_transcript(a) == normalize_transcript(b)
+
+
+class SpeculativeRun:
+    """
+    Run de l'agent lancé sur une transcription encore provisoire.
+
+    Le run s'exécute dans une copie de la session ADK, pour que la conversation
+    réelle ne garde aucune trace d'une spéculation abandonnée. La copie vit dans
+    le service de sessions en mémoire du `runner` de spéculation : la copier ne
+    coûte aucune écriture en base, et `base_session` (la vraie session, lue une
+    fois par enregistrement) évite de la relire à chaque pause. Les événements du
+    run sont mis en mémoire jusqu'à ce que la transcription finale le confirme :
+    ils sont alors rejoués au client (`events`), puis seuls les nouveaux sont
+    reportés dans la vraie session (`commit`).
+
+    Le text_for_tts publié par le callback de l'agent est lui aussi retenu : la
+    synthèse et la sauvegarde en SyntheticText ne partent qu'une fois la
+    spéculation confirmée, pour qu'un échec ne coûte ni quota TTS ni écriture.
+    """
+
+    def __init__(
+        self,
+        runner: Any,
+        session_service: Any,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        text: str,
+        speech_prefetch: Optional[SpeechPrefetch] = None,
+        run_config: Optional[Any] = None,
+        base_session: Optional[Any] = None,
+    ):
+        self.runner = runner
+        # Vraie session (base de données) et copies (service du runner, en mémoire)
+        self.session_service = session_service
+        self.scratch_service = runner.session_service
+        self.base_session = base_session
+        self.app_name = app_name
+        self.user_id = user_id
+        self.session_id = session_id
+        self.text = text
+        # Synthèse du text_for_tts, démarrée par le callback de l'agent
+        self.speech_prefetch = speech_prefetch
+        # Même RunConfig que les runs directs (événements partiels compris)
+        self.run_config = run_config
+        self.scratch_session_id = f"{session_id}-speculative-{uuid.uuid4().hex[:8]}"
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        self._copied_events = 0
+        self.confirmed = False
+        # text_for_tts publié pendant le run, en attente de confirmation
+        self._speech_text: Optional[tuple[str, str]] = None
+        self._save_tasks: set[asyncio.Task] = set()
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        metrics.increment("agent.speculation.started")
+        self._task = asyncio.create_task(self._run())
+
+    async def _copy_session(self):
+        session = self.base_session or await self.session_service.get_session(
+            app_name=self.app_name, user_id=self.user_id, session_id=self.session_id
+        )
+        state = dict(session.state) if session else {}
+        state[SPECULATIVE_STATE_KEY] = True
+        scratch = await self.scratch_service.create_session(
+            app_name=self.app_name,
+            user_id=self.user_id,
+            session_id=self.scratch_session_id,
+            state=state,
+        )
+        # L'état est copié une fois ci-dessus : les événements sont ajoutés sans
+        # leur state_delta, qui serait sinon appliqué une seconde fois
+        for event in session.events if session else []:
+            if event.actions and event.actions.state_delta:
+                event = event.model_copy(
+                    update={
+                        "actions": event.actions.model_copy(update={"state_delta": {}})
+                    }
+                )
+            await self.scratch_service.append_event(scratch, event)
+        self._copied_events = len(session.events) if session else 0
+
+    async def _run(self):
+        # Le callback de l'agent publie le text_for_tts dans le contexte de cette tâche
+        set_speech_text_listener(self._on_speech_text)
+        try:
+            await self._copy_session()
+            async for event in self.runner.run_async(
+                user_id=self.user_id,
+                session_id=self.scratch_session_id,
+                new_message=genai.types.Content(
+                    parts=[genai.types.Part(text=self.text)], role="user"
+                ),
+                run_config=self.run_config,
+            ):
+                self._events.put_nowait(event)
+        except Exception as e:
+            self._events.put_nowait(e)
+        finally:
+            self.finished_at = time.perf_counter()
+            self._events.put_nowait(None)
+
+    def confirm(self, final_text: str) -> bool:
+        """
+        Compare la transcription finale au texte spéculé. En cas de succès, mesure
+        l'avance prise par l'agent : le temps écoulé depuis le lancement, borné par
+        la durée du run s'il est déjà terminé.
+        """
+        if not same_transcript(self.text, final_text):
+            metrics.increment("agent.speculation.misses")
+            metrics.observe("agent.speculation.saved_seconds", 0.0)
+            return False
+        ended_at = self.finished_at or time.perf_counter()
+        metrics.increment("agent.speculation.hits")
+        metrics.observe("agent.speculation.saved_seconds", ended_at - self.started_at)
+        self.confirmed = True
+        self._release_speech_text()
+        return True
+
+    def _on_speech_text(self, invocation_id: str, text: str):
+        self._speech_text = (invocation_id, text)
+        if self.confirmed:
+            self._release_speech_text()
+
+    def _release_speech_text(self):
+        """Lance la synthèse et la sauvegarde du text_for_tts retenu."""
+        if self._speech_text is None:
+            return
+        invocation_id, text = self._speech_text
+        self._speech_text = None
+        if self.speech_prefetch is not None:
+            self.speech_prefetch(invocation_id, text)
+        task = asyncio.create_task(self._save_speech_text(invocation_id, text))
+        self._save_tasks.add(task)
+        task.add_done_callback(self._save_tasks.discard)
+
+    async def _save_speech_text(self, invocation_id: str, text: str):
+        try:
+            await save_speech_text(invocation_id, text)
+        except Exception as e:
+            logger.warning(f"Could not save speculative text_for_tts: {e}")
+
+    async def events(self) -> AsyncIterator[Any]:
+        """Événements du run : ceux déjà produits, puis les suivants au fil de l'eau."""
+        while True:
+            event = await self._events.get()
+            if event is None:
+                return
+            if isinstance(event, Exception):
+                raise event
+            yield event
+
+    async def commit(self):
+        """Reporte le tour de la copie dans la vraie session, puis supprime la copie."""
+        scratch = await self.scratch_service.get_session(
+            app_name=self.app_name,
+            user_id=self.user_id,
+            session_id=self.scratch_session_id,
+        )
+        session = await self.session_service.get_session(
+            app_name=self.app_name, user_id=self.user_id, session_id=self.session_id
+        )
+        for event in scratch.events[self._copied_events :]:
+            await self.session_service.append_event(session, event)
+        await self._delete_scratch_session()
+
+    async def _delete_scratch_session(self):
+        try:
+            await self.scratch_service.delete_session(
+                app_name=self.app_name,
+                user_id=self.user_id,
+                session_id=self.scratch_session_id,
+            )
+        except Exception as e:
+            logger.warning(
+                f"Could not delete speculative session {self.scratch_session_id}: {e}"
+            )
+
+    def cancel(self):
+        """Abandonne la spéculation (run, synthèse et copie de session)."""
+        if self.speech_prefetch is not None:
+            self.speech_prefetch.cancel()
+        if self._task is None:
+            return
+        self._task.cancel()
+        self._cleanup_task = asyncio.create_task(self._cleanup())
+
+    async def _cleanup(self):
+        with suppress(asyncio.CancelledError, Exception):
+            await self._task
+        await self._delete_scratch_session()
+
+
+def resolve_speculation(
+    speculation: Optional[SpeculativeRun], final_text: str
+) -> Optional[SpeculativeRun]:
+    """
+    Décide du sort de la spéculation d'un tour vocal une fois la transcription
+    finale connue : la retourne si elle est confirmée, l'annule sinon. Un tour
+    sans spéculation compte comme un gain nul.
+    """
+    if speculation is None:
+        metrics.increment("agent.speculation.none")
+        metrics.observe("agent.speculation.saved_seconds", 0.0)
+        return None
+    if speculation.confirm(final_text):
+        logger.info(f"Speculative agent run confirmed for '{final_text}'")
+        return speculation
+    logger.info(
+        f"Speculative agent run discarded: '{speculation.text}' != '{final_text}'"
+    )
+    speculation.cancel()
+    return None
@@ -0,0 +1,283 @@
+import re
+from dataclasses import dataclass, field
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class SpeechLexicon:
+    """
+    Vocabulaire utilisé pour rendre un texte markdown prononçable.
+    Remplacer ce lexique permet d'adapter la normalisation à une autre langue.
+    """
+
+    # Caractères isolés remplacés par leur forme parlée
+    symbols: dict[str, str]
+    # Abréviations reconnues en début de mot (ex: "etc.")
+    abbreviations: dict[str, str]
+    # Sigles reconnus comme mots entiers (ex: "PS")
+    words: dict[str, str]
+    # Connecteurs des listes numérotées, puis connecteur par défaut au-delà
+    ordinals: tuple[str, ...]
+    ordinal_fallback: str
+    and_word: str
+    link_prefix: str
+    code_prefix: str
+    quote_prefix: str
+    code_block: str
+    # Caractères supprimés : markdown résiduel, émojis, caractères invisibles
+    removed_chars: str = "`~^<>{}[]|\\"
+    removed_ranges: tuple[tuple[int, int], ...] = field(
+        default=(
+            (0x1F600, 0x1F64F),  # Emoticons
+            (0x1F300, 0x1F5FF),  # Symboles et pictogrammes
+            (0x1F680, 0x1F6FF),  # Transport et cartes
+            (0x1F1E0, 0x1F1FF),  # Drapeaux
+            (0x2600, 0x27BF),  # Symboles divers et dingbats
+            (0x1F900, 0x1F9FF),  # Émojis supplémentaires
+            (0x1FA00, 0x1FAFF),  # Nouveaux émojis
+            (0xFE00, 0xFE0F),  # Sélecteurs de variation
+            (0x200B, 0x200D),  # Caractères de largeur zéro
+            (0xFEFF, 0xFEFF),
+            (0x00AD, 0x00AD),  # Autres caractères invisibles
+            (0x061C, 0x061C),
+            (0x180E, 0x180E),
+        )
+    )
+
+
+FRENCH_LEXICON = SpeechLexicon(
+    symbols={
+        "&": " et ",
+        "@": " arobase ",
+        "%": " pour cent ",
+        "$": " dollars ",
+        "€": " euros ",
+    },
+    abbreviations={
+        "etc.": "et cetera",
+        "ex.": "exemple",
+        "cf.": "voir",
+        "p.ex.": "par exemple",
+        "i.e.": "c'est-à-dire",
+        "e.g.": "par exemple",
+    },
+    words={
+        "PS": "Post-scriptum",
+        "NB": "Nota bene",
+    },
+    ordinals=(
+        "premièrement",
+        "deuxièmement",
+        "troisièmement",
+        "quatrièmement",
+        "cinquièmement",
+    ),
+    ordinal_fallback="ensuite",
+    and_word="et",
+    link_prefix="le lien",
+    code_prefix="le code",
+    quote_prefix="Je cite :",
+    code_block="code omis",
+)
+
+
+# --- Motifs de bloc, appliqués ligne par ligne ---
+_FENCE_LINE = re.compile(r"\s*```")
+_HEADING_LINE = re.compile(r"#{1,6}\s+[^#\n]")
+_HEADING = re.compile(r"#{1,6}\s+([^#\n]+)")
+_BULLET_LINE = re.compile(r"[-*+]\s+.")
+_BULLET_MARKER = re.compile(r"^[-*+]\s+")
+_NUMBERED_LINE = re.compile(r"\s*\d+\.\s+.")
+_NUMBERED_MARKER = re.compile(r"^\s*\d+\.\s+")
+_RULE_LINE = re.compile(r"[-_*]{3,}")
+
+# --- Normalisation finale de la ponctuation (texte aux espaces déjà réduits) ---
+_WHITESPACE = re.compile(r"\s+")
+_PUNCTUATION = re.compile(
+    r" ?(?:(?P<dots>\.{2,})|(?P<bangs>!{2,})|(?P<questions>\?{2,})) ?"
+    r"|(?P<strong>[.!?]) ?(?=[A-Z])"
+    r"|(?P<weak>[,;:]) ?"
+)
+
+
+def _replace_punctuation(match: re.Match) -> str:
+    kind = match.lastgroup
+    if kind == "dots":
+        return ". "
+    if kind == "bangs":
+        return " ! "
+    if kind == "questions":
+        return " ? "
+    return match.group(kind) + " "
+
+
+class SpeechNormalizer:
+    """
+    Transforme du markdown/HTML en texte naturel pour la synthèse vocale.
+
+    Le traitement se fait en trois balayages linéaires : les blocs (titres,
+    listes, citations, blocs de code) ligne par ligne, puis un tokenizer unique
+    pour les éléments en ligne, puis la ponctuation. Aucun motif ne peut
+    parcourir le texte plus d'une fois depuis un même délimiteur, ce qui garantit
+    un temps linéaire même sur une sortie d'agent très longue ou malformée.
+    """
+
+    def __init__(self, lexicon: SpeechLexicon = FRENCH_LEXICON):
+        self.lexicon = lexicon
+
+        def alternation(entries) -> str:
+            # Les formes les plus longues d'abord ("p.ex." avant "ex.")
+            return "|".join(
+                re.escape(entry) for entry in sorted(entries, key=len, reverse=True)
+            )
+
+        patterns = [
+            r"(?P<tag><[^<>]+>)",
+            r"(?P<entity>&\#?\w+;)",
+            r"(?P<heading>\#{1,6}\s+(?P<heading_text>[^\#\n]+))",
+            r"(?P<link>\[(?P<link_text>[^\[\]]+)\]\([^()]+\))",
+            r"(?P<code>`(?P<code_text>[^`]+)`)",
+        ]
+        if lexicon.abbreviations:
+            patterns.append(
+                rf"(?P<abbreviation>\b(?:{alternation(lexicon.abbreviations)}))"
+            )
+        if lexicon.words:
+            patterns.append(rf"(?P<word>\b(?:{alternation(lexicon.words)})\b)")
+        if lexicon.symbols:
+            patterns.append(rf"(?P<symbol>{alternation(lexicon.symbols)})")
+        self._inline = re.compile("|".join(patterns))
+
+        removed = [re.escape(char) for char in lexicon.removed_chars]
+        removed += [f"{chr(start)}-{chr(end)}" for start, end in lexicon.removed_ranges]
+        self._removed = re.compile(f"[{''.join(removed)}]+")
+
+        self._handlers: dict[str, Callable[[re.Match], str]] = {
+            "tag": lambda m: "",
+            "entity": lambda m: "",
+            "heading": lambda m: self._inline_pass(m.group("heading_text")) + " ",
+            "link": lambda m: f"{lexicon.link_prefix} "
+            + self._inline_pass(m.group("link_text")),
+            "code": lambda m: f"{lexicon.code_prefix} "
+            + self._inline_pass(m.group("code_text")),
+            "abbreviation": lambda m: lexicon.abbreviations[m.group(0)],
+            "word": lambda m: lexicon.words[m.group(0)],
+            "symbol": lambda m: lexicon.symbols[m.group(0)],
+        }
+
+    # --- Blocs ---
+
+    def _join_items(self, items: list[str]) -> str:
+        and_word = self.lexicon.and_word
+        if len(items) == 1:
+            return items[0]
+        if len(items) == 2:
+            return f"{items[0]} {and_word} {items[1]}"
+        return ", ".join(items[:-1]) + f" {and_word} {items[-1]}"
+
+    def _number_items(self, items: list[str]) -> str:
+        ordinals = self.lexicon.ordinals
+        spoken = [
+            f"{ordinals[i] if i < len(ordinals) else self.lexicon.ordinal_fallback} {item}"
+            for i, item in enumerate(items)
+        ]
+        return ". ".join(spoken) + "."
+
+    @staticmethod
+    def _strip_emphasis(text: str) -> str:
+        # "*" et "_" ne servent qu'à l'emphase : les supprimer d'emblée revient au
+        # même que de retirer les paires **gras**, *italique*, __gras__, _italique_
+        return text.replace("*", "").replace("_", "")
+
+    def _is_numbered(self, line: str) -> bool:
+        # "**1. Titre**" est aussi un élément de liste numérotée
+        if line.lstrip().startswith(("*", "_")):
+            line = self._strip_emphasis(line)
+        return bool(_NUMBERED_LINE.match(line))
+
+    def _block_pass(self, text: str) -> str:
+        lines = text.split("\n")
+        fences = [i for i, line in enumerate(lines) if _FENCE_LINE.match(line)]
+        # Seuls les blocs de code fermés sont omis
+        fence_end = dict(zip(fences[0::2], fences[1::2]))
+
+        output: list[str] = []
+        i = 0
+        while i < len(lines):
+            line = lines[i]
+
+            if i in fence_end:
+                output.append(f" {self.lexicon.code_block} ")
+                i = fence_end[i] + 1
+                continue
+
+            if _HEADING_LINE.match(line):
+                line = _HEADING.sub(r"\1 ", line)
+
+            if _BULLET_LINE.match(line):
+                items = []
+                while True:
+                    item = _BULLET_MARKER.sub("", line.strip(), count=1)
+                    if item:
+                        items.append(item)
+                    if i + 1 < len(lines) and _BULLET_LINE.match(lines[i + 1]):
+                        i += 1
+                        line = lines[i]
+                    else:
+                        break
+                output.append(self._join_items(items))
+                i += 1
+                continue
+
+            if self._is_numbered(line):
+                items = []
+                while True:
+                    item = _NUMBERED_MARKER.sub(
+                        "", self._strip_emphasis(line).strip(), count=1
+                    )
+                    if item:
+                        items.append(item)
+                    # Les lignes vides entre deux éléments font partie de la liste
+                    j = i + 1
+                    while j < len(lines) and not lines[j].strip():
+                        j += 1
+                    if j < len(lines) and self._is_numbered(lines[j]):
+                        i = j
+                        line = lines[i]
+                    else:
+                        break
+                output.append(self._number_items(items))
+                i += 1
+                continue
+
+            if line.startswith(">") and line[1:].strip():
+                line = f"{self.lexicon.quote_prefix} {line[1:].strip()}"
+            elif _RULE_LINE.fullmatch(line):
+                line = ""
+
+            output.append(line)
+            i += 1
+
+        return "\n".join(output)
+
+    # --- Éléments en ligne ---
+
+    def _replace_inline(self, match: re.Match) -> str:
+        return self._handlers[match.lastgroup](match)
+
+    def _inline_pass(self, text: str) -> str:
+        return self._inline.sub(self._replace_inline, text)
+
+    # --- API ---
+
+    def normalize(self, text: str) -> str:
+        text = self._block_pass(text)
+        text = self._strip_emphasis(text)
+        text = self._inline_pass(text)
+        text = self._removed.sub("", text)
+        text = _WHITESPACE.sub(" ", text)
+        text = _PUNCTUATION.sub(_replace_punctuation, text)
+        return _WHITESPACE.sub(" ", text).strip()
+
+
+speech_normalizer = SpeechNormalizer(FRENCH_LEXICON)
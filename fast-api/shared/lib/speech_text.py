@@ -0,0 +1,52 @@
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from shared.orm.entities.synthetic_text import SyntheticText
+from shared.orm.repositories.synthetic_text_repository import (
+    SyntheticTextRepository,
+)
+
+# Clé d'état des sessions copiées pour un run spéculatif : le callback de l'agent
+# n'y sauvegarde pas de SyntheticText, la spéculation le fait une fois confirmée
+SPECULATIVE_STATE_KEY = "speculative_run"
+
+# (invocation_id, text_for_tts)
+SpeechTextListener = Callable[[str, str], None]
+
+# Le callback de l'agent s'exécute dans le contexte de la tâche qui itère
+# `run_async` : une ContextVar suffit pour relier le callback au WebSocket courant.
+_speech_text_listener: ContextVar[Optional[SpeechTextListener]] = ContextVar(
+    "speech_text_listener", default=None
+)
+
+
+def set_speech_text_listener(listener: Optional[SpeechTextListener]):
+    """
+    Définit l'écouteur des textes TTS pour la tâche courante (une connexion
+    WebSocket = une tâche, donc un écouteur par connexion).
+    """
+    _speech_text_listener.set(listener)
+
+
+def publish_speech_text(invocation_id: str, text: str):
+    """Appelé par le callback de l'agent dès que le text_for_tts est connu."""
+    listener = _speech_text_listener.get()
+    if listener is not None:
+        listener(invocation_id, text)
+
+
+def synthetic_text_id(invocation_id: str) -> str:
+    return invocation_id.replace("-", "")
+
+
+async def save_speech_text(invocation_id: str, text: str):
+    """Sauvegarde le text_for_tts de l'invocation en SyntheticText."""
+    await SyntheticText(text=text).save(chosen_id=synthetic_text_id(invocation_id))
+
+
+async def load_speech_text(invocation_id: str) -> Optional[str]:
+    """Relit le text_for_tts sauvegardé en SyntheticText pour cette invocation."""
+    synthetic_text = await SyntheticTextRepository().get_by_id(
+        synthetic_text_id(invocation_id)
+    )
+    return synthetic_text.text if synthetic_text else None
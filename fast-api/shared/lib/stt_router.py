@@ -0,0 +1,252 @@
+import asyncio
+import importlib
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+from shared.lib.metrics import Metrics, metrics as default_metrics
+from shared.lib.transcription import (
+    STT_STREAM_TIMEOUT_SECONDS,
+    StreamingTranscription,
+    transcript_audio,
+    transcript_audio_webm,
+)
+
+logger = logging.getLogger(__name__)
+
+# Un moteur transcrit un enregistrement complet : (contenu, type MIME) -> texte
+Transcriber = Callable[[bytes, str], Awaitable[str]]
+
+# Nombre de mesures avant de se fier au p95 observé d'un moteur
+STT_ROUTER_MIN_SAMPLES = int(os.getenv("STT_ROUTER_MIN_SAMPLES", "5"))
+# Échecs consécutifs avant de mettre un moteur de côté, et durée de la mise à l'écart
+STT_ROUTER_MAX_FAILURES = int(os.getenv("STT_ROUTER_MAX_FAILURES", "3"))
+STT_ROUTER_COOLDOWN_SECONDS = float(os.getenv("STT_ROUTER_COOLDOWN_SECONDS", "30"))
+
+
+# Seules ces erreurs (délai, indisponibilité, transport) font passer au moteur
+# suivant. Un clip invalide (InvalidArgument, audio indécodable) échouerait
+# partout : l'erreur remonte telle quelle et ne pénalise pas le moteur.
+STT_SLOW_ERRORS = (asyncio.TimeoutError, google_exceptions.DeadlineExceeded)
+STT_FAILOVER_ERRORS = STT_SLOW_ERRORS + (
+    google_exceptions.ServiceUnavailable,
+    ConnectionError,
+)
+
+
+class NoEngineAvailable(ValueError):
+    """Aucun moteur enregistré n'accepte ce format ou cette durée."""
+
+
+@dataclass
+class STTEngine:
+    """Moteur de transcription enregistré auprès du routeur."""
+
+    name: str
+    transcribe: Transcriber
+    # Préfixes des types MIME acceptés (ex: "audio/webm")
+    mime_types: tuple[str, ...]
+    # Durée maximale acceptée, en secondes (None : pas de limite)
+    max_duration: Optional[float] = None
+    # Au-delà, l'appel est abandonné et le moteur suivant essayé
+    timeout: float = 30.0
+    # Latence supposée tant que le moteur n'a pas assez de mesures
+    expected_latency: float = 1.0
+
+    def accepts(self, mime_type: str, duration: Optional[float]) -> bool:
+        if not mime_type.startswith(self.mime_types):
+            return False
+        return (
+            duration is None
+            or self.max_duration is None
+            or duration <= self.max_duration
+        )
+
+
+class STTRouter:
+    """
+    Registre des moteurs de transcription et routage de chaque enregistrement.
+
+    Parmi les moteurs qui acceptent le format et la durée du clip, le routeur
+    essaie d'abord celui dont la latence p95 observée est la plus basse. Si un
+    moteur échoue ou dépasse son délai, le suivant prend le relais. Après
+    STT_ROUTER_MAX_FAILURES échecs consécutifs, un moteur passe en fin de liste
+    pendant STT_ROUTER_COOLDOWN_SECONDS. Les erreurs de contenu (clip invalide)
+    remontent directement, sans bascule (voir STT_FAILOVER_ERRORS).
+    """
+
+    def __init__(self, metrics: Metrics = default_metrics):
+        self.metrics = metrics
+        self._engines: dict[str, STTEngine] = {}
+        self._failures: dict[str, int] = {}
+        self._cooldown_until: dict[str, float] = {}
+
+    def register(self, engine: STTEngine):
+        self._engines[engine.name] = engine
+        self._failures[engine.name] = 0
+
+    def unregister(self, name: str):
+        self._engines.pop(name, None)
+        self._failures.pop(name, None)
+        self._cooldown_until.pop(name, None)
+
+    @property
+    def engines(self) -> list[STTEngine]:
+        return list(self._engines.values())
+
+    def latency(self, engine: STTEngine) -> float:
+        """Latence p95 observée, ou latence supposée faute de mesures suffisantes."""
+        name = f"stt.engine.{engine.name}.seconds"
+        if self.metrics.count(name) < STT_ROUTER_MIN_SAMPLES:
+            return engine.expected_latency
+        return self.metrics.percentile(name, 95)
+
+    def _cooling_down(self, engine: STTEngine) -> bool:
+        return self._cooldown_until.get(engine.name, 0) > time.monotonic()
+
+    def candidates(
+        self, mime_type: str, duration: Optional[float] = None
+    ) -> list[STTEngine]:
+        """Moteurs acceptant le clip, dans l'ordre où ils seront essayés."""
+        engines = [
+            engine
+            for engine in self._engines.values()
+            if engine.accepts(mime_type, duration)
+        ]
+        return sorted(
+            engines,
+            key=lambda engine: (self._cooling_down(engine), self.latency(engine)),
+        )
+
+    def _record_failure(self, engine: STTEngine, reason: str):
+        self.metrics.increment(f"stt.engine.{engine.name}.{reason}")
+        self._failures[engine.name] = self._failures.get(engine.name, 0) + 1
+        if self._failures[engine.name] >= STT_ROUTER_MAX_FAILURES:
+            logger.warning(
+                f"STT engine {engine.name} failed {self._failures[engine.name]} "
+                f"times in a row, deprioritized for {STT_ROUTER_COOLDOWN_SECONDS}s"
+            )
+            self._cooldown_until[engine.name] = (
+                time.monotonic() + STT_ROUTER_COOLDOWN_SECONDS
+            )
+            self._failures[engine.name] = 0
+
+    async def transcribe(
+        self, content: bytes, mime_type: str, duration: Optional[float] = None
+    ) -> str:
+        candidates = self.candidates(mime_type, duration)
+        if not candidates:
+            raise NoEngineAvailable(f"No STT engine accepts {mime_type} audio")
+
+        last_error: Optional[BaseException] = None
+        for attempt, engine in enumerate(candidates):
+            if attempt:
+                self.metrics.increment("stt.failovers")
+                logger.warning(f"STT failover to {engine.name}: {last_error!r}")
+            started_at = time.perf_counter()
+            try:
+                transcript = await asyncio.wait_for(
+                    engine.transcribe(content, mime_type), engine.timeout
+                )
+            except STT_SLOW_ERRORS as e:
+                # Un moteur trop lent doit aussi voir monter son p95
+                self.metrics.observe(
+                    f"stt.engine.{engine.name}.seconds",
+                    time.perf_counter() - started_at,
+                )
+                self._record_failure(engine, "timeouts")
+                last_error = e
+                continue
+            except STT_FAILOVER_ERRORS as e:
+                self._record_failure(engine, "errors")
+                last_error = e
+                continue
+            except Exception:
+                # Erreur propre au clip : ni bascule ni pénalité pour le moteur
+                self.metrics.increment("stt.rejected_clips")
+                self._failures[engine.name] = 0
+                raise
+            self.metrics.observe(
+                f"stt.engine.{engine.name}.seconds", time.perf_counter() - started_at
+            )
+            self._failures[engine.name] = 0
+            return transcript
+
+        raise last_error
+
+    def stats(self) -> dict:
+        return {
+            engine.name: {
+                "latency": self.latency(engine),
+                "cooling_down": self._cooling_down(engine),
+            }
+            for engine in self._engines.values()
+        }
+
+
+# --- Moteurs ---
+
+
+async def google_sync_transcribe(content: bytes, mime_type: str) -> str:
+    """Reconnaissance synchrone Google (décodage, VAD et découpage compris)."""
+    if mime_type.startswith("audio/webm"):
+        return await transcript_audio_webm(content)
+    return await transcript_audio(content)
+
+
+async def google_streaming_transcribe(content: bytes, mime_type: str) -> str:
+    """Reconnaissance en streaming Google d'un enregistrement déjà complet."""
+    stream = StreamingTranscription(mime_type=mime_type)
+    try:
+        stream.feed(content)
+        return await stream.finish()
+    finally:
+        stream.cancel()
+
+
+def load_transcriber(path: str) -> Transcriber:
+    """Charge un moteur local depuis "paquet.module:fonction"."""
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+stt_router = STTRouter()
+stt_router.register(
+    STTEngine(
+        name="google",
+        transcribe=google_sync_transcribe,
+        # Le format réel est identifié puis décodé si besoin (audio_decode)
+        mime_types=("audio/",),
+        timeout=float(os.getenv("STT_GOOGLE_TIMEOUT_SECONDS", "60")),
+        expected_latency=1.0,
+    )
+)
+stt_router.register(
+    STTEngine(
+        name="google_streaming",
+        transcribe=google_streaming_transcribe,
+        mime_types=("audio/webm", "audio/ogg"),
+        max_duration=STT_STREAM_TIMEOUT_SECONDS,
+        timeout=float(os.getenv("STT_GOOGLE_STREAMING_TIMEOUT_SECONDS", "60")),
+        expected_latency=1.5,
+    )
+)
+
+# Emplacement pour un moteur hors ligne (ex: Whisper local) : une coroutine
+# (contenu, type MIME) -> texte, désignée par STT_LOCAL_ENGINE="module:fonction"
+if os.getenv("STT_LOCAL_ENGINE"):
+    stt_router.register(
+        STTEngine(
+            name="local",
+            transcribe=load_transcriber(os.environ["STT_LOCAL_ENGINE"]),
+            mime_types=tuple(
+                os.getenv("STT_LOCAL_ENGINE_MIME_TYPES", "audio/").split(",")
+            ),
+            timeout=float(os.getenv("STT_LOCAL_ENGINE_TIMEOUT_SECONDS", "60")),
+            expected_latency=float(os.getenv("STT_LOCAL_ENGINE_LATENCY", "2")),
+        )
+    )
@@ -1,21 +1,318 @@
+import asyncio
+import logging
+import math
+import os
+import struct
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+import numpy as np
 from google.cloud import speech
+from google.cloud.speech_v1.services.speech.transports import (
+    SpeechGrpcAsyncIOTransport,
+)
 
+from shared.lib.audio_decode import (
+    DECODE_SAMPLE_RATE,
+    decode_to_pcm,
+    probe_container,
+    run_in_decode_pool,
+    wav_format,
+)
+from shared.lib.client_pool import AsyncClientPool, create_grpc_async_transport
+from shared.lib.metrics import metrics
 
-def transcript_audio(content: bytes) -> str:
-    # Instantiates a client
-    client = speech.SpeechClient()
+# Délai maximal d'une reconnaissance, au-delà l'appel gRPC est abandonné
+STT_TIMEOUT_SECONDS = float(os.getenv("STT_TIMEOUT_SECONDS", "30"))
+# Reconnaissance en streaming : durée maximale d'un flux (limite API : ~5 min) et
+# volume audio maximal accepté par flux
+STT_STREAM_TIMEOUT_SECONDS = float(os.getenv("STT_STREAM_TIMEOUT_SECONDS", "300"))
+STT_STREAM_MAX_BYTES = int(os.getenv("STT_STREAM_MAX_BYTES", str(10 * 1024**2)))
+# Flux simultanés par worker : limite distincte de STT_MAX_CONCURRENT_CALLS, pour
+# que des enregistrements longs n'occupent pas les places des appels courts
+STT_MAX_CONCURRENT_STREAMS = int(os.getenv("STT_MAX_CONCURRENT_STREAMS", "32"))
+# Taille maximale de l'audio d'une requête de streaming
+_STREAM_REQUEST_MAX_BYTES = 25 * 1024
 
-    audio = speech.RecognitionAudio(content=content)
+# Détection d'activité vocale (VAD) avant la reconnaissance : silences de début et
+# de fin retirés, enregistrements sans parole rejetés sans appeler l'API
+STT_VAD_ENABLED = os.getenv("STT_VAD_ENABLED", "true").lower() == "true"
+# Marge conservée autour de la parole, pour ne couper ni attaques ni fins de mots
+STT_VAD_PADDING_SECONDS = float(os.getenv("STT_VAD_PADDING_SECONDS", "0.3"))
+# Durée minimale d'un passage de parole continu (les clics isolés sont ignorés)
+STT_VAD_MIN_SPEECH_SECONDS = float(os.getenv("STT_VAD_MIN_SPEECH_SECONDS", "0.15"))
+# En deçà de ce gain, l'audio d'origine est envoyé plutôt que le PCM rogné
+STT_VAD_MIN_TRIM_SECONDS = float(os.getenv("STT_VAD_MIN_TRIM_SECONDS", "0.5"))
+# Enregistrements longs : découpés aux silences en morceaux d'environ cette durée
+# (entre la moitié et 1,5 fois, à garder sous la limite d'une minute de l'API),
+# reconnus en parallèle
+STT_CHUNK_SECONDS = float(os.getenv("STT_CHUNK_SECONDS", "20"))
+STT_CHUNK_CONCURRENCY = int(os.getenv("STT_CHUNK_CONCURRENCY", "4"))
 
-    config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-        sample_rate_hertz=16000,
-        language_code="fr-FR",
+logger = logging.getLogger(__name__)
+
+
+def _create_speech_client() -> speech.SpeechAsyncClient:
+    transport = create_grpc_async_transport(
+        SpeechGrpcAsyncIOTransport, emulator_env="STT_EMULATOR_HOST"
     )
+    return speech.SpeechAsyncClient(transport=transport)
+
+
+# Pool partagé par tout le process : la reconnaissance ne bloque plus la boucle
+# d'événements, les autres WebSockets du worker restent servis pendant ce temps.
+speech_client_pool = AsyncClientPool(
+    name="stt",
+    factory=_create_speech_client,
+    size=int(os.getenv("STT_CLIENT_POOL_SIZE", "2")),
+    max_concurrent_calls=int(os.getenv("STT_MAX_CONCURRENT_CALLS", "8")),
+)
+_stream_slots = asyncio.Semaphore(STT_MAX_CONCURRENT_STREAMS)
+
+
+async def recognize(
+    config: speech.RecognitionConfig, audio: speech.RecognitionAudio
+) -> speech.RecognizeResponse:
+    """Reconnaissance synchrone (au sens de l'API) via le pool de clients async."""
+    started_at = time.perf_counter()
+    try:
+        async with speech_client_pool.acquire() as client:
+            return await client.recognize(
+                config=config, audio=audio, timeout=STT_TIMEOUT_SECONDS
+            )
+    except Exception:
+        metrics.increment("stt.errors")
+        raise
+    finally:
+        metrics.observe("stt.recognize_seconds", time.perf_counter() - started_at)
+
+
+# --- Détection d'activité vocale ---
+
+VAD_SAMPLE_RATE = DECODE_SAMPLE_RATE
+_VAD_FRAME_SECONDS = 0.02
+# Seuil de parole : au-dessus du bruit de fond estimé, sans descendre sous un
+# plancher absolu (dBFS)
+_VAD_NOISE_MARGIN_DB = 12.0
+_VAD_PEAK_MARGIN_DB = 30.0
+_VAD_MIN_THRESHOLD_DB = -50.0
+# Écart minimal entre le pic et le bruit de fond : en deçà, l'enregistrement est
+# un bruit stationnaire (souffle, ventilation) et non de la parole
+STT_VAD_MIN_DYNAMIC_RANGE_DB = float(os.getenv("STT_VAD_MIN_DYNAMIC_RANGE_DB", "15"))
+
+# ffmpeg absent de l'image : les formats compressés ne sont plus décodés
+_ffmpeg_available = True
+
+
+@dataclass(frozen=True)
+class TrimmedAudio:
+    """Résultat de la VAD : PCM LINEAR16 mono 16 kHz rogné autour de la parole."""
+
+    samples: np.ndarray
+    duration: float
+    speech_duration: float
+
+    @property
+    def content(self) -> bytes:
+        return self.samples.tobytes()
+
+    @property
+    def has_speech(self) -> bool:
+        return self.speech_duration > 0
+
+    @property
+    def trimmed_duration(self) -> float:
+        return self.duration - self.speech_duration
+
+
+_VAD_FRAME = int(VAD_SAMPLE_RATE * _VAD_FRAME_SECONDS)
+
+
+def _frame_levels(samples: np.ndarray) -> np.ndarray:
+    """Niveau (dBFS) de chaque trame de 20 ms."""
+    frame_count = len(samples) // _VAD_FRAME
+    frames = samples[: frame_count * _VAD_FRAME].astype(np.float32)
+    rms = np.sqrt(np.mean(np.square(frames.reshape(-1, _VAD_FRAME) / 32768.0), axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def detect_speech(samples: np.ndarray) -> Optional[tuple[int, int]]:
+    """
+    Bornes (début, fin), en échantillons, de la parole détectée, marge comprise ;
+    None si l'enregistrement ne contient pas de parole.
+
+    Détection par énergie sur des trames de 20 ms : le seuil est placé au-dessus du
+    bruit de fond (10e centile des trames), mais jamais à plus de
+    _VAD_PEAK_MARGIN_DB sous le pic, pour qu'un enregistrement entièrement parlé
+    ne soit pas pris pour du bruit. Un enregistrement dont le pic dépasse le bruit
+    de fond de moins de STT_VAD_MIN_DYNAMIC_RANGE_DB ne contient pas de parole,
+    quel que soit son niveau.
+    """
+    frame = _VAD_FRAME
+    levels = _frame_levels(samples)
+    frame_count = len(levels)
+    if frame_count == 0:
+        return None
+
+    noise_floor = np.percentile(levels, 10)
+    peak = levels.max()
+    if peak - noise_floor < STT_VAD_MIN_DYNAMIC_RANGE_DB:
+        return None
+    threshold = max(
+        _VAD_MIN_THRESHOLD_DB,
+        min(noise_floor + _VAD_NOISE_MARGIN_DB, peak - _VAD_PEAK_MARGIN_DB),
+    )
+
+    # Trames débutant un passage d'au moins `run` trames au-dessus du seuil
+    run = max(1, math.ceil(STT_VAD_MIN_SPEECH_SECONDS / _VAD_FRAME_SECONDS))
+    if frame_count < run:
+        return None
+    speech = (levels > threshold).astype(np.int32)
+    run_starts = np.flatnonzero(
+        np.convolve(speech, np.ones(run, np.int32), "valid") == run
+    )
+    if run_starts.size == 0:
+        return None
+
+    padding = int(STT_VAD_PADDING_SECONDS * VAD_SAMPLE_RATE)
+    start = max(0, int(run_starts[0]) * frame - padding)
+    end = min(len(samples), (int(run_starts[-1]) + run) * frame + padding)
+    return start, end
+
+
+def split_at_silences(
+    samples: np.ndarray, chunk_seconds: float = STT_CHUNK_SECONDS
+) -> list[tuple[int, int]]:
+    """
+    Découpe un enregistrement en morceaux (début, fin) d'environ `chunk_seconds`.
+    Chaque coupure tombe au point le plus calme (moyenne sur 200 ms) entre la
+    moitié et 1,5 fois la durée visée, donc entre deux mots.
+    """
+    levels = _frame_levels(samples)
+    target = max(1, int(chunk_seconds / _VAD_FRAME_SECONDS))
+    smoothing = 10
+    smoothed = np.convolve(levels, np.ones(smoothing) / smoothing, "same")
+
+    bounds = []
+    start = 0
+    while len(levels) - start > target * 3 // 2:
+        low = start + target // 2
+        high = start + target * 3 // 2
+        cut = low + int(np.argmin(smoothed[low:high]))
+        bounds.append((start * _VAD_FRAME, cut * _VAD_FRAME))
+        start = cut
+    bounds.append((start * _VAD_FRAME, len(samples)))
+    return bounds
+
+
+async def decode_audio(content: bytes, container: str) -> Optional[np.ndarray]:
+    """
+    Décode l'enregistrement en PCM int16 mono 16 kHz. Retourne None s'il ne peut
+    pas l'être (ffmpeg absent, fichier illisible).
+    """
+    global _ffmpeg_available
+    if container not in ("raw", "wav") and not _ffmpeg_available:
+        return None
+
+    started_at = time.perf_counter()
+    try:
+        samples = await decode_to_pcm(content, container)
+    except FileNotFoundError:
+        _ffmpeg_available = False
+        logger.warning("ffmpeg not found, compressed audio will not be decoded")
+        return None
+    except (ValueError, asyncio.TimeoutError) as e:
+        metrics.increment("stt.decode_errors")
+        logger.warning(f"Could not decode {container} audio: {e}")
+        return None
+    metrics.observe(f"stt.decode_seconds.{container}", time.perf_counter() - started_at)
+    return samples
+
+
+async def trim_silence(samples: np.ndarray) -> TrimmedAudio:
+    """Rogne l'enregistrement décodé autour de la parole."""
+    started_at = time.perf_counter()
+    bounds = await run_in_decode_pool(detect_speech, samples)
+    elapsed = time.perf_counter() - started_at
+    duration = len(samples) / VAD_SAMPLE_RATE
+    if bounds is None:
+        trimmed = TrimmedAudio(
+            samples=samples[:0], duration=duration, speech_duration=0.0
+        )
+    else:
+        start, end = bounds
+        trimmed = TrimmedAudio(
+            samples=samples[start:end],
+            duration=duration,
+            speech_duration=(end - start) / VAD_SAMPLE_RATE,
+        )
+
+    metrics.observe("stt.vad.seconds", elapsed)
+    metrics.observe("stt.vad.audio_seconds", trimmed.duration)
+    if not trimmed.has_speech:
+        metrics.increment("stt.vad.no_speech")
+    logger.info(
+        f"VAD: {trimmed.duration:.2f}s of audio, {trimmed.trimmed_duration:.2f}s of "
+        f"silence trimmed, speech={trimmed.has_speech} ({elapsed * 1000:.0f} ms)"
+    )
+    return trimmed
+
+
+def _with_encoding(
+    config: speech.RecognitionConfig,
+    encoding: speech.RecognitionConfig.AudioEncoding,
+    sample_rate_hertz: int = 0,
+) -> speech.RecognitionConfig:
+    """Même configuration (langue, modèle...) pour un autre encodage."""
+    encoded = speech.RecognitionConfig()
+    speech.RecognitionConfig.copy_from(encoded, config)
+    encoded.encoding = encoding
+    # 0 : fréquence et nombre de canaux lus dans l'en-tête du fichier
+    encoded.sample_rate_hertz = sample_rate_hertz
+    encoded.audio_channel_count = 0
+    return encoded
+
+
+def _linear16_config(config: speech.RecognitionConfig) -> speech.RecognitionConfig:
+    """Configuration pour le PCM décodé (et éventuellement rogné)."""
+    encoded = _with_encoding(
+        config, speech.RecognitionConfig.AudioEncoding.LINEAR16, VAD_SAMPLE_RATE
+    )
+    # Le décodage produit toujours du mono
+    encoded.audio_channel_count = 1
+    return encoded
 
-    # Detects speech in the audio file
-    response = client.recognize(config=config, audio=audio)
 
+def _native_config(
+    config: speech.RecognitionConfig, content: bytes, container: str
+) -> Optional[speech.RecognitionConfig]:
+    """
+    Configuration pour envoyer l'enregistrement tel quel, sans le décoder : c'est
+    l'encodage le plus compact que l'API accepte. None si l'API ne lit pas ce
+    format (MP4/AAC, MP3, Ogg/Vorbis, WAV multicanal ou non PCM 16 bits).
+    """
+    encoding = speech.RecognitionConfig.AudioEncoding
+    if container == "webm":
+        return _with_encoding(config, encoding.WEBM_OPUS)
+    if container == "ogg_opus":
+        # Opus est toujours décodé à 48 kHz
+        return _with_encoding(config, encoding.OGG_OPUS, 48000)
+    if container == "flac":
+        return _with_encoding(config, encoding.FLAC)
+    if container == "raw":
+        return _linear16_config(config)
+    if container == "wav":
+        try:
+            format_tag, channels, sample_rate, bits = wav_format(content)
+        except (ValueError, struct.error):
+            return None
+        if format_tag == 1 and channels == 1 and bits == 16:
+            return _with_encoding(config, encoding.LINEAR16, sample_rate)
+    return None
+
+
+def _join_transcripts(response: speech.RecognizeResponse) -> str:
     transcript = ""
 
     for result in response.results:
@@ -24,13 +321,100 @@ def transcript_audio(content: bytes) -> str:
     return transcript
 
 
-def transcript_audio_webm(content: bytes) -> str:
-    """Transcribe WebM/Opus audio content directly"""
-    # Instantiates a client
-    client = speech.SpeechClient()
+async def recognize_chunks(
+    samples: np.ndarray, config: speech.RecognitionConfig
+) -> str:
+    """
+    Reconnaît un long enregistrement PCM morceau par morceau, en parallèle
+    (au plus STT_CHUNK_CONCURRENCY appels), et recolle les transcriptions dans
+    l'ordre : la latence est celle du morceau le plus long.
+    """
+    bounds = await run_in_decode_pool(split_at_silences, samples)
+    semaphore = asyncio.Semaphore(STT_CHUNK_CONCURRENCY)
+
+    async def recognize_chunk(start: int, end: int) -> str:
+        audio = speech.RecognitionAudio(content=samples[start:end].tobytes())
+        async with semaphore:
+            response = await recognize(config, audio)
+        return _join_transcripts(response).strip()
+
+    started_at = time.perf_counter()
+    tasks = [asyncio.ensure_future(recognize_chunk(*bound)) for bound in bounds]
+    try:
+        transcripts = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    metrics.observe("stt.chunks", len(bounds))
+    metrics.observe("stt.chunked_recognize_seconds", time.perf_counter() - started_at)
+    return " ".join(transcript for transcript in transcripts if transcript)
+
+
+async def transcribe(content: bytes, config: speech.RecognitionConfig) -> str:
+    """
+    Reconnaissance d'un enregistrement de format quelconque (identifié par ses
+    premiers octets). Décodé une seule fois en PCM 16 kHz mono, il passe par la
+    VAD : une chaîne vide est retournée sans appeler l'API s'il ne contient pas de
+    parole, et les enregistrements plus longs que 1,5 fois STT_CHUNK_SECONDS sont
+    découpés en morceaux reconnus en parallèle. Sinon l'API reçoit le PCM rogné
+    s'il retire au moins STT_VAD_MIN_TRIM_SECONDS de silence, le fichier
+    d'origine s'il sait le lire. Le PCM peut peser plus lourd qu'un Opus
+    complet, mais l'API facture et reconnaît à la seconde d'audio.
+    """
+    container = probe_container(content)
+    native_config = _native_config(config, content, container)
+    samples = None
+    if STT_VAD_ENABLED or native_config is None:
+        samples = await decode_audio(content, container)
 
-    audio = speech.RecognitionAudio(content=content)
+    if samples is None:
+        if native_config is None:
+            raise ValueError(f"Cannot decode {container} audio")
+        response = await recognize(
+            native_config, speech.RecognitionAudio(content=content)
+        )
+        return _join_transcripts(response)
 
+    if STT_VAD_ENABLED:
+        trimmed = await trim_silence(samples)
+    else:
+        duration = len(samples) / VAD_SAMPLE_RATE
+        trimmed = TrimmedAudio(
+            samples=samples, duration=duration, speech_duration=duration
+        )
+
+    # Secondes d'audio qui ne sont ni envoyées ni facturées
+    if not trimmed.has_speech:
+        metrics.observe("stt.vad.saved_seconds", trimmed.duration)
+        return ""
+    if trimmed.speech_duration > STT_CHUNK_SECONDS * 1.5:
+        metrics.observe("stt.vad.saved_seconds", trimmed.trimmed_duration)
+        return await recognize_chunks(trimmed.samples, _linear16_config(config))
+    if native_config is None or trimmed.trimmed_duration >= STT_VAD_MIN_TRIM_SECONDS:
+        metrics.observe("stt.vad.saved_seconds", trimmed.trimmed_duration)
+        content = trimmed.content
+        config = _linear16_config(config)
+    else:
+        metrics.observe("stt.vad.saved_seconds", 0.0)
+        config = native_config
+    response = await recognize(config, speech.RecognitionAudio(content=content))
+    return _join_transcripts(response)
+
+
+async def transcript_audio(content: bytes) -> str:
+    config = speech.RecognitionConfig(
+        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+        sample_rate_hertz=16000,
+        language_code="fr-FR",
+    )
+
+    # Detects speech in the audio file
+    return await transcribe(content, config)
+
+
+async def transcript_audio_webm(content: bytes) -> str:
+    """Transcribe WebM/Opus audio content directly"""
     config = speech.RecognitionConfig(
         encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
         # sample_rate_hertz is not needed for WEBM_OPUS as it's auto-detected
@@ -40,20 +424,10 @@ def transcript_audio_webm(content: bytes) -> str:
     )
 
     # Detects speech in the audio file
-    response = client.recognize(config=config, audio=audio)
-
-    transcript = ""
+    return await transcribe(content, config)
 
-    for result in response.results:
-        transcript += result.alternatives[0].transcript
-
-    return transcript
-
-
-def transcript_audio_by_uri(uri: str) -> speech.RecognizeResponse:
-    # Instantiates a client
-    client = speech.SpeechClient()
 
+async def transcript_audio_by_uri(uri: str) -> speech.RecognizeResponse:
     audio = speech.RecognitionAudio(uri=uri)
 
     config = speech.RecognitionConfig(
@@ -63,7 +437,167 @@ def transcript_audio_by_uri(uri: str) -> speech.RecognizeResponse:
     )
 
     # Detects speech in the audio file
-    response = client.recognize(config=config, audio=audio)
+    response = await recognize(config, audio)
 
     for result in response.results:
         print(f"Transcript: {result.alternatives[0].transcript}")
+
+    return response
+
+
+# --- Reconnaissance en streaming ---
+
+# Un reconnaisseur reçoit les morceaux audio au fil de l'eau et produit des couples
+# (transcription, is_final). Remplaçable par un faux pour tester sans l'API.
+StreamingRecognizer = Callable[
+    [AsyncIterator[bytes], str], AsyncIterator[tuple[str, bool]]
+]
+
+
+def _streaming_config(mime_type: str) -> speech.StreamingRecognitionConfig:
+    if mime_type.startswith("audio/webm"):
+        config = speech.RecognitionConfig(
+            encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
+            language_code="fr-FR",
+            enable_automatic_punctuation=True,
+            model="latest_long",
+        )
+    elif mime_type.startswith("audio/ogg"):
+        config = speech.RecognitionConfig(
+            encoding=speech.RecognitionConfig.AudioEncoding.OGG_OPUS,
+            sample_rate_hertz=48000,
+            language_code="fr-FR",
+            enable_automatic_punctuation=True,
+            model="latest_long",
+        )
+    else:
+        raise ValueError(f"Unsupported streaming audio type: {mime_type}")
+    return speech.StreamingRecognitionConfig(config=config, interim_results=True)
+
+
+async def google_streaming_recognize(
+    audio_chunks: AsyncIterator[bytes], mime_type: str
+) -> AsyncIterator[tuple[str, bool]]:
+    """Reconnaissance en streaming Google (streaming_recognize) via le pool."""
+    streaming_config = _streaming_config(mime_type)
+
+    async def requests():
+        yield speech.StreamingRecognizeRequest(streaming_config=streaming_config)
+        async for chunk in audio_chunks:
+            for start in range(0, len(chunk), _STREAM_REQUEST_MAX_BYTES):
+                yield speech.StreamingRecognizeRequest(
+                    audio_content=chunk[start : start + _STREAM_REQUEST_MAX_BYTES]
+                )
+
+    async with _stream_slots:
+        client = await speech_client_pool.borrow()
+        responses = await client.streaming_recognize(
+            requests=requests(), timeout=STT_STREAM_TIMEOUT_SECONDS
+        )
+        async for response in responses:
+            for result in response.results:
+                if result.alternatives:
+                    yield result.alternatives[0].transcript, result.is_final
+
+
+class StreamingTranscription:
+    """
+    Transcription d'un enregistrement en cours : les morceaux audio reçus sont
+    transmis au reconnaisseur pendant que l'utilisateur parle, et chaque
+    transcription intermédiaire est remontée par `on_transcript(texte, False)`.
+    Chaque résultat définitif (fin d'une phrase, l'utilisateur marque une pause)
+    est remonté par `on_transcript(texte définitif jusque-là, True)` puis signalé
+    par `on_stable(texte)`. `finish` ferme le flux et retourne la transcription
+    finale, déjà presque terminée à ce moment-là.
+    """
+
+    def __init__(
+        self,
+        mime_type: str = "audio/webm;codecs=opus",
+        on_transcript: Optional[Callable[[str, bool], Awaitable[None]]] = None,
+        recognizer: Optional[StreamingRecognizer] = None,
+        on_stable: Optional[Callable[[str], Awaitable[None]]] = None,
+    ):
+        # Valider le type audio dès l'ouverture du flux
+        if recognizer is None:
+            _streaming_config(mime_type)
+        self.mime_type = mime_type
+        self._on_transcript = on_transcript
+        self._on_stable = on_stable
+        self._recognizer = recognizer or google_streaming_recognize
+        self._chunks: asyncio.Queue[Optional[bytes]] = asyncio.Queue()
+        self._received_bytes = 0
+        self._finals: list[str] = []
+        self._task: Optional[asyncio.Task] = None
+        self._started_at = time.perf_counter()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _audio_chunks(self) -> AsyncIterator[bytes]:
+        while True:
+            chunk = await self._chunks.get()
+            if chunk is None:
+                return
+            yield chunk
+
+    async def _run(self):
+        async for transcript, is_final in self._recognizer(
+            self._audio_chunks(), self.mime_type
+        ):
+            if is_final:
+                self._finals.append(transcript)
+                if self._on_transcript is not None:
+                    await self._on_transcript("".join(self._finals), True)
+                if self._on_stable is not None:
+                    await self._on_stable("".join(self._finals))
+            elif self._on_transcript is not None:
+                # Texte affiché : résultats définitifs puis hypothèse en cours
+                await self._on_transcript("".join(self._finals) + transcript, False)
+
+    def detach_stable(self):
+        """
+        Cesse de signaler les phrases stables : l'enregistrement est terminé, les
+        derniers résultats (reçus pendant `finish`) ne doivent plus lancer de
+        spéculation.
+        """
+        self._on_stable = None
+
+    def feed(self, chunk: bytes):
+        """Ajoute un morceau audio (trame binaire du client)."""
+        self._received_bytes += len(chunk)
+        if self._received_bytes > STT_STREAM_MAX_BYTES:
+            raise ValueError("Audio stream too large")
+        self.start()
+        self._chunks.put_nowait(chunk)
+
+    async def finish(self) -> str:
+        """Termine le flux audio et retourne la transcription finale."""
+        self.start()
+        self._chunks.put_nowait(None)
+        ended_at = time.perf_counter()
+        try:
+            await self._task
+        finally:
+            metrics.observe(
+                "stt.stream_finalize_seconds", time.perf_counter() - ended_at
+            )
+            metrics.observe(
+                "stt.stream_total_seconds", time.perf_counter() - self._started_at
+            )
+        return "".join(self._finals)
+
+    def cancel(self):
+        if self._task is None:
+            return
+        if not self._task.done():
+            self._task.cancel()
+        # Personne n'attendra plus la tâche : son erreur éventuelle (flux déjà en
+        # échec quand le client se déconnecte) est journalisée ici
+        self._task.add_done_callback(self._log_failure)
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Streaming recognition failed: {task.exception()!r}")
@@ -1,36 +1,241 @@
 import google.cloud.texttospeech as tts
+from google.cloud.texttospeech_v1.services.text_to_speech.transports import (
+    TextToSpeechGrpcAsyncIOTransport,
+)
+import logging
+import os
 import re
 import asyncio
+from dataclasses import dataclass
+from functools import partial
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    NamedTuple,
+    Optional,
+    TypeVar,
+)
 from google.adk.agents import LlmAgent
 from pydantic import BaseModel
 
 from features.agents.models import Models
 from shared.lib.agent_runner import run_agent_with_retry
+from shared.lib.client_pool import AsyncClientPool, create_grpc_async_transport
+from shared.lib.tts_cache import make_cache_key, tts_audio_cache
+from shared.lib.speech_text import load_speech_text
+from shared.lib.speech_normalizer import speech_normalizer
+from shared.lib.metrics import metrics
+from shared.lib.tts_scheduler import Priority, tts_scheduler
+from shared.lib.audio_concat import concat_audio
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VOICE_NAME = "fr-FR-Chirp-HD-D"
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    """Format audio demandé au TTS, avec ce qu'il faut pour le servir au client."""
+
+    name: str
+    encoding: tts.AudioEncoding
+    mime_type: str
+    extension: str
+    # None : fréquence native de la voix
+    sample_rate_hertz: Optional[int] = None
+
+
+AUDIO_FORMATS = {
+    audio_format.name: audio_format
+    for audio_format in (
+        AudioFormat("mp3", tts.AudioEncoding.MP3, "audio/mpeg", "mp3"),
+        # Opus est nettement plus compact que le MP3 à qualité vocale égale
+        AudioFormat("ogg_opus", tts.AudioEncoding.OGG_OPUS, "audio/ogg", "ogg"),
+        # Pour les connexions faibles : Opus en bande élargie (16 kHz)
+        AudioFormat(
+            "ogg_opus_16k", tts.AudioEncoding.OGG_OPUS, "audio/ogg", "ogg", 16000
+        ),
+        AudioFormat("linear16", tts.AudioEncoding.LINEAR16, "audio/wav", "wav"),
+    )
+}
+DEFAULT_AUDIO_FORMAT = AUDIO_FORMATS["mp3"]
+
+
+def get_audio_format(name: str) -> AudioFormat:
+    """Retourne le format audio nommé (voir AUDIO_FORMATS)."""
+    try:
+        return AUDIO_FORMATS[name]
+    except KeyError:
+        raise ValueError(f"Unknown audio format: {name}") from None
+
+
+def _create_tts_client() -> tts.TextToSpeechAsyncClient:
+    transport = create_grpc_async_transport(
+        TextToSpeechGrpcAsyncIOTransport, emulator_env="TTS_EMULATOR_HOST"
+    )
+    return tts.TextToSpeechAsyncClient(transport=transport)
+
+
+# Pool partagé par tout le process : les canaux gRPC sont réutilisés d'un segment à
+# l'autre et les appels ne bloquent plus la boucle d'événements d'uvicorn.
+# La concurrence (TTS_MAX_CONCURRENT_CALLS) est réglée par tts_scheduler seul,
+# qui sert les appels par priorité : pas de second sémaphore dans le pool.
+tts_client_pool = AsyncClientPool(
+    name="tts",
+    factory=_create_tts_client,
+    size=int(os.getenv("TTS_CLIENT_POOL_SIZE", "4")),
+    max_concurrent_calls=None,
+)
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
 
 
-def text_to_wav(text: str):
-    voice_name = "fr-FR-Chirp-HD-D"
+class SingleFlight:
+    """
+    Déduplication des appels identiques en cours : tant qu'un appel pour une clé
+    n'est pas terminé, les appels suivants avec la même clé attendent son résultat
+    (ou son exception) au lieu d'en lancer un nouveau.
+
+    L'appel partagé tourne dans sa propre tâche : l'annulation d'un appelant ne
+    l'interrompt pas, sauf s'il était le dernier à l'attendre.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: dict[str, _Flight] = {}
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+            metrics.set_gauge(
+                f"single_flight.{self.name}.in_flight", len(self._flights)
+            )
+
+    async def do(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.create_task(call()))
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self._flights[key] = flight
+            metrics.increment(f"single_flight.{self.name}.calls")
+            metrics.set_gauge(
+                f"single_flight.{self.name}.in_flight", len(self._flights)
+            )
+        else:
+            metrics.increment(f"single_flight.{self.name}.coalesced")
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Plus personne n'attend : abandonner l'appel sous-jacent
+                self._forget(key, flight)
+                flight.task.cancel()
+
+
+synthesis_flights = SingleFlight("tts_synthesis")
+cleaning_flights = SingleFlight("tts_cleaning")
+
+
+async def synthesize_speech(
+    text: str,
+    voice_name: str = DEFAULT_VOICE_NAME,
+    audio_encoding: tts.AudioEncoding = tts.AudioEncoding.MP3,
+    use_cache: bool = True,
+    sample_rate_hertz: Optional[int] = None,
+    priority: Priority = Priority.INTERACTIVE,
+) -> bytes:
+    """
+    Appelle Google TTS via le pool de clients async et retourne les bytes audio.
+    Le résultat est mis en cache (mémoire + disque) par texte, voix, langue,
+    encodage et fréquence d'échantillonnage ; les demandes identiques simultanées
+    de même priorité partagent un seul appel au fournisseur, qui passe par l'ordonnanceur
+    (quota et priorité) avant d'utiliser le pool de clients.
+    """
     language_code = "-".join(voice_name.split("-")[:2])
-    text_input = tts.SynthesisInput(text=text)
-    voice_params = tts.VoiceSelectionParams(
-        language_code=language_code, name=voice_name
+    cache_key = make_cache_key(
+        text,
+        voice_name,
+        language_code,
+        tts.AudioEncoding(audio_encoding).name,
+        sample_rate_hertz,
+    )
+    if use_cache:
+        cached_audio = await tts_audio_cache.get(cache_key)
+        if cached_audio is not None:
+            return cached_audio
+
+    async def call_provider() -> bytes:
+        text_input = tts.SynthesisInput(text=text)
+        voice_params = tts.VoiceSelectionParams(
+            language_code=language_code, name=voice_name
+        )
+        audio_config = tts.AudioConfig(audio_encoding=audio_encoding)
+        if sample_rate_hertz:
+            audio_config.sample_rate_hertz = sample_rate_hertz
+
+        async with tts_scheduler.slot(len(text), priority):
+            async with tts_client_pool.acquire() as client:
+                response = await client.synthesize_speech(
+                    input=text_input,
+                    voice=voice_params,
+                    audio_config=audio_config,
+                )
+
+        if use_cache:
+            await tts_audio_cache.set(cache_key, response.audio_content)
+        return response.audio_content
+
+    # Une demande prioritaire ne doit pas rejoindre un appel identique encore en
+    # file derrière des appels moins urgents : une voie de priorité par appel
+    return await synthesis_flights.do(f"{cache_key}:{priority.name}", call_provider)
+
+
+async def synthesize_audio_format(
+    text: str,
+    audio_format: AudioFormat = DEFAULT_AUDIO_FORMAT,
+    priority: Priority = Priority.INTERACTIVE,
+) -> bytes:
+    """Synthétise `text` dans le format audio donné."""
+    return await synthesize_speech(
+        text,
+        audio_encoding=audio_format.encoding,
+        sample_rate_hertz=audio_format.sample_rate_hertz,
+        priority=priority,
     )
-    audio_config = tts.AudioConfig(audio_encoding=tts.AudioEncoding.LINEAR16)
 
-    client = tts.TextToSpeechClient()
-    response = client.synthesize_speech(
-        input=text_input,
-        voice=voice_params,
-        audio_config=audio_config,
+
+async def text_to_wav(text: str, filename: Optional[str] = None):
+    voice_name = DEFAULT_VOICE_NAME
+    audio_content = await synthesize_audio_format(
+        text, AUDIO_FORMATS["linear16"], priority=Priority.BATCH
     )
 
-    filename = f"{voice_name}.wav"
-    with open(filename, "wb") as out:
-        out.write(response.audio_content)
-        print(f'Generated speech saved to "{filename}"')
+    filename = filename or f"{voice_name}.wav"
+
+    def write_file():
+        with open(filename, "wb") as out:
+            out.write(audio_content)
+
+    await asyncio.to_thread(write_file)
+    print(f'Generated speech saved to "{filename}"')
 
 
-async def text_to_audio_bytes(text: str) -> bytes:
+async def text_to_audio_bytes(
+    text: str,
+    audio_format: AudioFormat = DEFAULT_AUDIO_FORMAT,
+    priority: Priority = Priority.BATCH,
+) -> bytes:
     """
     Convertit du texte en audio et retourne les bytes audio.
     Nettoie d'abord le markdown du texte.
@@ -39,30 +244,52 @@ async def text_to_audio_bytes(text: str) -> bytes:
     # clean_text = clean_markdown_for_speech(text)
     clean_text = await clean_markdown_for_speech_ai(text)
 
-    voice_name = "fr-FR-Chirp-HD-D"
-    language_code = "-".join(voice_name.split("-")[:2])
-    text_input = tts.SynthesisInput(text=clean_text)
-    voice_params = tts.VoiceSelectionParams(
-        language_code=language_code, name=voice_name
-    )
-    # Utiliser MP3 pour une meilleure compression sur le web
-    audio_config = tts.AudioConfig(audio_encoding=tts.AudioEncoding.MP3)
-
-    client = tts.TextToSpeechClient()
-    response = client.synthesize_speech(
-        input=text_input,
-        voice=voice_params,
-        audio_config=audio_config,
-    )
+    return await synthesize_long_text(clean_text, audio_format, priority)
+
 
-    return response.audio_content
+async def synthesize_long_text(
+    text: str,
+    audio_format: AudioFormat = DEFAULT_AUDIO_FORMAT,
+    priority: Priority = Priority.BATCH,
+) -> bytes:
+    """
+    Synthétise un texte de longueur quelconque en un seul fichier audio.
+    Au-delà de TTS_MAX_SEGMENT_LENGTH, le texte est découpé en morceaux synthétisés
+    en parallèle puis concaténés sans ré-encodage : la latence suit le morceau le
+    plus long et non la longueur totale.
+    """
+    chunks = [
+        piece
+        for chunk in split_text_into_segments(text, max_length=TTS_MAX_SEGMENT_LENGTH)
+        for piece in _hard_split(chunk, TTS_MAX_SEGMENT_LENGTH)
+    ]
+    if len(chunks) <= 1:
+        return await synthesize_audio_format(text, audio_format, priority)
+
+    synthesizer = OrderedSegmentSynthesizer(
+        chunks,
+        concurrency=TTS_LONG_TEXT_CONCURRENCY,
+        audio_format=audio_format,
+        priority=priority,
+    )
+    audio_chunks = []
+    async for result in synthesizer.results():
+        if result.error is not None:
+            raise result.error
+        audio_chunks.append(result.audio)
+    # Concaténation (CRC Ogg en Python pur) hors de la boucle d'événements
+    return await asyncio.to_thread(concat_audio, audio_chunks, audio_format.extension)
 
 
 async def clean_markdown_for_speech_ai(text: str) -> str:
     """
     Nettoie le texte markdown pour une synthèse vocale naturelle.
+    Un même texte en cours de nettoyage n'est envoyé qu'une fois au LLM.
     """
+    return await cleaning_flights.do(text, partial(_clean_markdown_for_speech_ai, text))
 
+
+async def _clean_markdown_for_speech_ai(text: str) -> str:
     class MdOutput(BaseModel):
         text: str
 
@@ -85,209 +312,252 @@ async def clean_markdown_for_speech_ai(text: str) -> str:
     return result["text"]
 
 
-async def text_to_audio_bytes_async(text: str) -> bytes:
+async def text_to_audio_bytes_async(
+    text: str, audio_format: AudioFormat = DEFAULT_AUDIO_FORMAT
+) -> bytes:
     """
     Convertit du texte en audio et retourne les bytes audio.
     Nettoie d'abord le markdown du texte.
     """
-    clean_text = await clean_markdown_for_speech(text)
-    return await asyncio.to_thread(text_to_audio_bytes, clean_text)
+    clean_text = clean_markdown_for_speech(text)
+    return await synthesize_long_text(clean_text, audio_format)
 
 
 def clean_markdown_for_speech(text: str) -> str:
     """
     Transforme le texte markdown et HTML pour une synthèse vocale naturelle.
+    Voir `SpeechNormalizer` (temps linéaire, lexique français configurable).
     """
+    return speech_normalizer.normalize(text)
 
-    print("BEFORE", text)
-    # Supprimer les balises HTML mais garder le contenu
-    text = re.sub(r"<[^>]+>", "", text)
-
-    # Supprimer les entités HTML
-    text = re.sub(r"&[a-zA-Z]+;", "", text)
-    text = re.sub(r"&#?\w+;", "", text)
-
-    # Transformer les titres en phrases d'introduction
-    text = re.sub(
-        r"#{1,6}\s+([^#\n]+)", r"\1 ", text
-    )  # Capturer tous les titres sans ajouter de ponctuation
-
-    # Transformer les liens markdown en mentions naturelles
-    text = re.sub(r"\[([^\]]+)\]\([^\)]+\)", r"le lien \1", text)
-
-    # Supprimer le formatage gras/italique mais garder le contenu avec emphase
-    text = re.sub(r"\*\*([^\*]+?)\*\*", r"\1", text)  # **gras**
-    text = re.sub(r"\*([^\*]+?)\*", r"\1", text)  # *italique*
-    text = re.sub(r"__([^_]+?)__", r"\1", text)  # __gras__
-    text = re.sub(r"_([^_]+?)_", r"\1", text)  # _italique_
-
-    # Transformer les codes inline en description
-    text = re.sub(r"`([^`]+?)`", r"le code \1", text)
-
-    # Supprimer complètement les blocs de code
-    text = re.sub(r"```[\s\S]*?```", " code omis ", text)
-
-    # Transformer les listes à puces en énumération fluide
-    # D'abord, identifier les groupes de listes
-    def transform_bullet_list(match):
-        lines = match.group(0).strip().split("\n")
-        items = []
-        for line in lines:
-            # Nettoyer chaque élément de liste
-            item = re.sub(r"^[-\*+]\s+", "", line.strip())
-            if item:
-                items.append(item)
-
-        if len(items) == 1:
-            return items[0]
-        elif len(items) == 2:
-            return f"{items[0]} et {items[1]}"
-        else:
-            # Pour 3+ éléments : "A, B, C et D"
-            return ", ".join(items[:-1]) + f" et {items[-1]}"
-
-    # Appliquer la transformation des listes à puces
-    text = re.sub(
-        r"(?:^[-\*+]\s+.+(?:\n|$))+", transform_bullet_list, text, flags=re.MULTILINE
-    )
-
-    # Transformer les listes numérotées en énumération avec connecteurs
-    def transform_numbered_list(match):
-        lines = match.group(0).strip().split("\n")
-        items = []
-        connectors = [
-            "premièrement",
-            "deuxièmement",
-            "troisièmement",
-            "quatrièmement",
-            "cinquièmement",
-        ]
 
-        for i, line in enumerate(lines):
-            item = re.sub(r"^\s*\d+\.\s+", "", line.strip())
-            if item and i < len(connectors):
-                items.append(f"{connectors[i]} {item}")
-            elif item:
-                items.append(f"ensuite {item}")
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+_COMMA_BOUNDARY = re.compile(r"(?<=,)\s+")
 
-        return ". ".join(items) + "."
+# Limite de taille d'un segment envoyé au TTS (l'API accepte 5000 octets par requête)
+TTS_MAX_SEGMENT_LENGTH = int(os.getenv("TTS_MAX_SEGMENT_LENGTH", "1000"))
+_TTS_MAX_REQUEST_BYTES = 5000
+# Morceaux synthétisés en parallèle pour un texte long envoyé à /tts
+TTS_LONG_TEXT_CONCURRENCY = int(os.getenv("TTS_LONG_TEXT_CONCURRENCY", "8"))
 
-    # Appliquer la transformation des listes numérotées
-    text = re.sub(
-        r"(?:^\s*\d+\.\s+.+(?:\n|$))+",
-        transform_numbered_list,
-        text,
-        flags=re.MULTILINE,
-    )
 
-    # Transformer les citations en attribution
-    text = re.sub(r"^>\s*(.+)$", r"Je cite : \1", text, flags=re.MULTILINE)
-
-    # Supprimer les lignes horizontales
-    text = re.sub(r"^[-_*]{3,}$", "", text, flags=re.MULTILINE)
-
-    # Remplacer les caractères spéciaux par des équivalents prononcables
-    text = re.sub(r"&", " et ", text)
-    text = re.sub(r"@", " arobase ", text)
-    text = re.sub(r"%", " pour cent ", text)
-    text = re.sub(r"\$", " dollars ", text)
-    text = re.sub(r"€", " euros ", text)
-
-    # Améliorer la prononciation des abréviations courantes
-    text = re.sub(r"\betc\.", "et cetera", text)
-    text = re.sub(r"\bex\.", "exemple", text)
-    text = re.sub(r"\bcf\.", "voir", text)
-    text = re.sub(r"\bp\.ex\.", "par exemple", text)
-    text = re.sub(r"\bi\.e\.", "c'est-à-dire", text)
-    text = re.sub(r"\be\.g\.", "par exemple", text)
-
-    # Améliorer les connecteurs logiques
-    text = re.sub(r"\bPS\b", "Post-scriptum", text)
-    text = re.sub(r"\bNB\b", "Nota bene", text)
-
-    # Supprimer les caractères markdown restants
-    text = re.sub(r"[*_`~^]", "", text)  # caractères markdown isolés
-    text = re.sub(r"[<>{}]", "", text)  # chevrons et accolades
-    text = re.sub(r"[\[\]]", "", text)  # crochets
-    text = re.sub(r"[|\\]", "", text)  # pipes et backslashes
-
-    # Supprimer les émojis (nettoyage étendu pour éviter les mots fantômes)
-    # Émojis de base
-    text = re.sub(r"[\U0001F600-\U0001F64F]", "", text)  # Emoticons
-    text = re.sub(r"[\U0001F300-\U0001F5FF]", "", text)  # Symboles et pictogrammes
-    text = re.sub(r"[\U0001F680-\U0001F6FF]", "", text)  # Transport et cartes
-    text = re.sub(r"[\U0001F1E0-\U0001F1FF]", "", text)  # Drapeaux
-    text = re.sub(r"[\U00002600-\U000027BF]", "", text)  # Symboles divers
-    text = re.sub(r"[\U0001F900-\U0001F9FF]", "", text)  # Émojis supplémentaires
-    text = re.sub(r"[\U0001FA00-\U0001FAFF]", "", text)  # Nouveaux émojis
-    text = re.sub(r"[\U00002700-\U000027BF]", "", text)  # Dingbats
-    text = re.sub(r"[\U0000FE00-\U0000FE0F]", "", text)  # Sélecteurs de variation
-
-    # Supprimer les caractères de contrôle et invisibles
-    text = re.sub(r"[\u200B-\u200D\uFEFF]", "", text)  # Caractères de largeur zéro
-    text = re.sub(r"[\u00AD\u061C\u180E]", "", text)  # Autres caractères invisibles
-
-    # Améliorer la ponctuation pour des pauses naturelles
-    text = re.sub(r"\s*[.]{2,}\s*", ". ", text)  # points multiples
-    text = re.sub(r"\s*[!]{2,}\s*", " ! ", text)  # exclamations multiples
-    text = re.sub(r"\s*[?]{2,}\s*", " ? ", text)  # interrogations multiples
-
-    # Ajouter des pauses appropriées
-    text = re.sub(r"([.!?])\s*([A-Z])", r"\1 \2", text)  # pause après ponctuation forte
-    text = re.sub(r"([,;:])\s*", r"\1 ", text)  # petite pause après ponctuation faible
-    text = re.sub(r":\s*([a-z])", r": \1", text)  # espace après deux-points
-
-    # Nettoyer les espaces multiples
-    text = re.sub(r"\n+", " ", text)  # remplacer sauts de ligne par espaces
-    text = re.sub(r"\s+", " ", text)  # réduire espaces multiples
-
-    print("AFTER", text)
-    return text.strip()
-
-
-def split_text_into_segments(text: str, max_length: int = 200) -> list[str]:
+@dataclass(frozen=True)
+class SegmentSizing:
     """
-    Découpe le texte en segments intelligents pour la synthèse vocale.
-    Reprend la logique du frontend splitTextIntoSegments.
+    Politique de taille des segments : le segment d'index i vise au plus
+    min(first_length * growth**i, max_length) caractères.
+    Un premier segment court réduit le délai avant le premier son ; les suivants,
+    synthétisés pendant la lecture des précédents, peuvent grandir et réduire le
+    nombre d'appels TTS.
     """
-    segments = []
-    current_segment = ""
 
-    # Découper d'abord par phrases (points, points d'exclamation, points d'interrogation)
-    sentences = re.split(r"(?<=[.!?])\s+", text)
+    first_length: int
+    max_length: int
+    growth: float = 1.0
 
-    for sentence in sentences:
-        # Si la phrase seule dépasse la limite, la découper par virgules
-        if len(sentence) > max_length:
-            parts = re.split(r"(?<=,)\s+", sentence)
-            for part in parts:
-                if (
-                    len(current_segment) + len(part) > max_length
-                    and len(current_segment) > 0
-                ):
-                    segments.append(current_segment.strip())
-                    current_segment = part
-                else:
-                    current_segment += (" " + part) if current_segment else part
-        else:
-            # Si ajouter cette phrase dépasse la limite, finaliser le segment actuel
-            if (
-                len(current_segment) + len(sentence) > max_length
-                and len(current_segment) > 0
-            ):
-                segments.append(current_segment.strip())
-                current_segment = sentence
-            else:
-                current_segment += (" " + sentence) if current_segment else sentence
+    def max_length_for(self, index: int) -> int:
+        if self.growth <= 1 or self.first_length >= self.max_length:
+            return min(self.first_length, self.max_length)
+        # Plafonner l'exposant évite un débordement sur les textes très longs
+        length = self.first_length * self.growth ** min(index, 64)
+        return int(min(length, self.max_length))
+
+    @classmethod
+    def fixed(cls, max_length: int) -> "SegmentSizing":
+        return cls(first_length=max_length, max_length=max_length)
+
+
+SEGMENT_SIZING_POLICIES = {
+    # Comportement historique : 200 caractères pour chaque segment
+    "fixed": SegmentSizing.fixed(200),
+    # Première proposition ou phrase courte, puis segments quadruplés jusqu'à la
+    # limite : la lecture du premier segment couvre la synthèse du suivant
+    "adaptive": SegmentSizing(
+        first_length=int(os.getenv("TTS_FIRST_SEGMENT_LENGTH", "80")),
+        max_length=TTS_MAX_SEGMENT_LENGTH,
+        growth=float(os.getenv("TTS_SEGMENT_GROWTH", "4")),
+    ),
+}
+
+
+def get_segment_sizing(name: str) -> SegmentSizing:
+    """Retourne la politique de découpage nommée ("fixed" ou "adaptive")."""
+    try:
+        return SEGMENT_SIZING_POLICIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown segment sizing policy: {name}") from None
+
+
+class IncrementalSegmenter:
+    """
+    Découpage incrémental du texte en segments pour la synthèse vocale.
 
-    # Ajouter le dernier segment s'il n'est pas vide
-    if current_segment.strip():
-        segments.append(current_segment.strip())
+    Reçoit le texte par morceaux (`feed`) et renvoie chaque segment dès qu'il est
+    définitivement fermé, avec exactement les règles de `split_text_into_segments`.
+    Une frontière de phrase (ou de virgule, pour une phrase trop longue) n'est
+    confirmée que lorsqu'un caractère non blanc la suit. `flush` termine le flux.
 
-    return [segment for segment in segments if len(segment) > 0]
+    Avec une politique `sizing`, la limite dépend de l'index du segment en cours.
+    """
 
+    def __init__(self, max_length: int = 200, sizing: Optional[SegmentSizing] = None):
+        self.sizing = sizing or SegmentSizing.fixed(max_length)
+        self._emitted = 0  # nombre de segments déjà produits
+        self._buffer = ""  # phrase en cours, pas encore terminée
+        self._scan_pos = 0  # position à partir de laquelle chercher une frontière
+        self._consumed = 0  # partie de la phrase en cours déjà découpée par virgules
+        self._current_segment = ""
+        self._segments: list[str] = []
+
+    @property
+    def max_length(self) -> int:
+        return self.sizing.max_length_for(self._emitted)
+
+    def _add_unit(self, unit: str):
+        # Même règle pour une phrase entière ou une partie de phrase trop longue
+        max_length = self.max_length
+        if (
+            len(self._current_segment) + len(unit) > max_length
+            and self._current_segment
+        ):
+            self._emit(self._current_segment)
+            self._current_segment = unit
+        else:
+            self._current_segment += (" " + unit) if self._current_segment else unit
 
-async def process_text_and_generate_segments(text: str) -> list[str]:
+    def _emit(self, segment: str):
+        segment = segment.strip()
+        if segment:
+            self._segments.append(segment)
+            self._emitted += 1
+
+    def _add_sentence(self, sentence: str):
+        # Si la phrase seule dépasse la limite, la découper par virgules
+        # (décision déjà prise si une partie a été ajoutée avant la fin de phrase)
+        if self._consumed or len(sentence) > self.max_length:
+            rest = sentence[self._consumed :]
+            for part in _COMMA_BOUNDARY.split(rest):
+                self._add_unit(part)
+        else:
+            self._add_unit(sentence)
+        self._consumed = 0
+
+    def _add_confirmed_parts(self, sentence_length: int):
+        # Phrase en cours déjà trop longue : ses parties fermées par une virgule
+        # sont définitives et peuvent être ajoutées sans attendre la fin de phrase
+        if sentence_length <= self.max_length:
+            return
+        position = self._consumed
+        for match in _COMMA_BOUNDARY.finditer(self._buffer, position, sentence_length):
+            if match.end() >= sentence_length:
+                break
+            self._add_unit(self._buffer[position : match.start()])
+            position = match.end()
+        self._consumed = position
+
+    def _take_segments(self) -> list[str]:
+        segments, self._segments = self._segments, []
+        return segments
+
+    def feed(self, chunk: str) -> list[str]:
+        """Ajoute un morceau de texte et retourne les segments terminés."""
+        self._buffer += chunk
+        position = 0
+        # Longueur minimale connue de la phrase en cours
+        sentence_end = len(self._buffer)
+        for match in _SENTENCE_BOUNDARY.finditer(self._buffer, self._scan_pos):
+            if match.end() >= len(self._buffer):
+                # Les blancs peuvent encore continuer dans le prochain morceau
+                sentence_end = match.start()
+                break
+            self._add_sentence(self._buffer[position : match.start()])
+            position = match.end()
+        if position:
+            self._buffer = self._buffer[position:]
+            sentence_end -= position
+        self._scan_pos = len(self._buffer.rstrip())
+        self._add_confirmed_parts(sentence_end)
+        return self._take_segments()
+
+    def flush(self) -> list[str]:
+        """Termine le flux et retourne les derniers segments."""
+        for sentence in _SENTENCE_BOUNDARY.split(self._buffer):
+            self._add_sentence(sentence)
+        self._buffer = ""
+        self._scan_pos = 0
+        self._emit(self._current_segment)
+        self._current_segment = ""
+        return self._take_segments()
+
+
+def _hard_split(segment: str, max_length: int) -> list[str]:
+    """
+    Coupe un segment encore trop long (phrase sans point ni virgule) aux espaces,
+    et un mot trop long au caractère près : chaque morceau fait au plus
+    `max_length` caractères et _TTS_MAX_REQUEST_BYTES octets UTF-8.
+    """
+    if len(segment) <= max_length and len(segment.encode()) <= _TTS_MAX_REQUEST_BYTES:
+        return [segment]
+
+    pieces = []
+    words: list[str] = []
+    length = size = 0
+    for word in segment.split():
+        word_size = len(word.encode())
+        if words and (
+            length + 1 + len(word) > max_length
+            or size + 1 + word_size > _TTS_MAX_REQUEST_BYTES
+        ):
+            pieces.append(" ".join(words))
+            words, length, size = [], 0, 0
+        while len(word) > max_length or word_size > _TTS_MAX_REQUEST_BYTES:
+            # Dernier recours : jamais au milieu d'un caractère multi-octets
+            head = word.encode()[:_TTS_MAX_REQUEST_BYTES].decode("utf-8", "ignore")
+            head = head[:max_length]
+            pieces.append(head)
+            word = word[len(head) :]
+            word_size = len(word.encode())
+        if not word:
+            continue
+        if words:
+            length += 1
+            size += 1
+        words.append(word)
+        length += len(word)
+        size += word_size
+    if words:
+        pieces.append(" ".join(words))
+    return pieces
+
+
+def split_text_into_segments(
+    text: str, max_length: int = 200, sizing: Optional[SegmentSizing] = None
+) -> list[str]:
+    """
+    Découpe le texte en segments intelligents pour la synthèse vocale.
+    Reprend la logique du frontend splitTextIntoSegments.
+    """
+    segmenter = IncrementalSegmenter(max_length=max_length, sizing=sizing)
+    return segmenter.feed(text) + segmenter.flush()
+
+
+async def stream_segments(
+    chunks: AsyncIterable[str],
+    max_length: int = 200,
+    sizing: Optional[SegmentSizing] = None,
+) -> AsyncIterator[str]:
+    """Découpe un flux de texte et yield chaque segment dès qu'il est terminé."""
+    segmenter = IncrementalSegmenter(max_length=max_length, sizing=sizing)
+    async for chunk in chunks:
+        for segment in segmenter.feed(chunk):
+            yield segment
+    for segment in segmenter.flush():
+        yield segment
+
+
+async def process_text_and_generate_segments(
+    text: str, sizing: Optional[SegmentSizing] = None
+) -> list[str]:
     """
     Nettoie le texte avec l'IA et le découpe en segments intelligents.
     """
@@ -295,29 +565,239 @@ async def process_text_and_generate_segments(text: str) -> list[str]:
     clean_text = await clean_markdown_for_speech_ai(text)
 
     # Découper en segments
-    segments = split_text_into_segments(clean_text)
+    segments = split_text_into_segments(clean_text, sizing=sizing)
 
     return segments
 
 
-async def generate_audio_for_segment(segment: str) -> bytes:
+async def generate_audio_for_segment(
+    segment: str,
+    audio_format: AudioFormat = DEFAULT_AUDIO_FORMAT,
+    priority: Priority = Priority.INTERACTIVE,
+) -> bytes:
     """
     Génère l'audio pour un segment de texte donné.
     """
-    voice_name = "fr-FR-Chirp-HD-D"
-    language_code = "-".join(voice_name.split("-")[:2])
-    text_input = tts.SynthesisInput(text=segment)
-    voice_params = tts.VoiceSelectionParams(
-        language_code=language_code, name=voice_name
-    )
-    # Utiliser MP3 pour une meilleure compression sur le web
-    audio_config = tts.AudioConfig(audio_encoding=tts.AudioEncoding.MP3)
-
-    client = tts.TextToSpeechClient()
-    response = client.synthesize_speech(
-        input=text_input,
-        voice=voice_params,
-        audio_config=audio_config,
-    )
+    # MP3 par défaut pour une meilleure compatibilité web
+    return await synthesize_audio_format(segment, audio_format, priority)
+
+
+class SegmentAudio(NamedTuple):
+    index: int
+    text: str
+    audio: Optional[bytes]
+    error: Optional[Exception]
+
+
+class OrderedSegmentSynthesizer:
+    """
+    Synthétise jusqu'à `concurrency` segments en parallèle et restitue les résultats
+    dans l'ordre des index : chaque segment est rendu dès que lui et tous les
+    précédents sont prêts. Une erreur sur un segment n'interrompt pas les suivants.
+
+    Sans liste initiale, les segments sont ajoutés au fil de l'eau avec `add()`
+    (par exemple depuis `stream_segments`) puis `close()` signale la fin.
+
+    En priorité INTERACTIVE, le premier segment passe dans la voie prioritaire
+    de l'ordonnanceur TTS.
+    """
+
+    def __init__(
+        self,
+        segments: Optional[list[str]] = None,
+        concurrency: int = 3,
+        synthesize: Optional[Callable[[str], Awaitable[bytes]]] = None,
+        audio_format: AudioFormat = DEFAULT_AUDIO_FORMAT,
+        priority: Priority = Priority.INTERACTIVE,
+    ):
+        self.segments: list[str] = []
+        self.concurrency = max(1, concurrency)
+        self.audio_format = audio_format
+        self.priority = priority
+        self._synthesize = synthesize
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: list[asyncio.Task] = []
+        self._started = False
+        self._closed = False
+        self._changed: Optional[asyncio.Event] = None
+        if segments is not None:
+            self.segments = list(segments)
+            self._closed = True
+
+    @property
+    def total(self) -> Optional[int]:
+        """Nombre total de segments, connu seulement une fois la liste fermée."""
+        return len(self.segments) if self._closed else None
+
+    def start(self):
+        """Lance la synthèse en tâche de fond (idempotent)."""
+        if self._started:
+            return
+        self._started = True
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._changed = asyncio.Event()
+        # Le sémaphore est FIFO : les segments démarrent dans l'ordre des index
+        self._tasks = [
+            asyncio.create_task(self._run(index, segment))
+            for index, segment in enumerate(self.segments)
+        ]
+
+    def add(self, segment: str):
+        """Ajoute un segment en fin de file et lance sa synthèse."""
+        if self._closed:
+            raise RuntimeError("OrderedSegmentSynthesizer is closed")
+        self.segments.append(segment)
+        if self._started:
+            index = len(self.segments) - 1
+            self._tasks.append(asyncio.create_task(self._run(index, segment)))
+            self._changed.set()
+
+    def close(self):
+        """Signale qu'aucun segment ne sera plus ajouté."""
+        self._closed = True
+        if self._started:
+            self._changed.set()
+
+    async def _run(self, index: int, segment: str) -> bytes:
+        async with self._semaphore:
+            if self._synthesize is not None:
+                return await self._synthesize(segment)
+            priority = self.priority
+            if index == 0 and priority == Priority.INTERACTIVE:
+                priority = Priority.INTERACTIVE_FIRST
+            return await generate_audio_for_segment(
+                segment, self.audio_format, priority
+            )
+
+    async def results(self) -> AsyncIterator[SegmentAudio]:
+        """Itère sur les segments synthétisés, dans l'ordre."""
+        self.start()
+        index = 0
+        try:
+            while True:
+                if index >= len(self._tasks):
+                    if self._closed:
+                        return
+                    self._changed.clear()
+                    await self._changed.wait()
+                    continue
+                task = self._tasks[index]
+                # asyncio.wait n'annule pas la tâche si c'est le consommateur
+                # qui est annulé ; une tâche annulée par `cancel` termine
+                # l'itération au lieu de propager CancelledError
+                await asyncio.wait([task])
+                if task.cancelled():
+                    return
+                try:
+                    audio = task.result()
+                except Exception as e:
+                    yield SegmentAudio(index, self.segments[index], None, e)
+                else:
+                    yield SegmentAudio(index, self.segments[index], audio, None)
+                index += 1
+        finally:
+            self.cancel()
+
+    def cancel(self):
+        """Annule les synthèses encore en cours et termine `results`."""
+        self._closed = True
+        for task in self._tasks:
+            if not task.done():
+                task.cancel()
+        if self._started:
+            # Réveille un consommateur qui attend de nouveaux segments
+            self._changed.set()
+
+
+class SpeechPrefetch:
+    """
+    Écouteur de `publish_speech_text` : dès que l'agent a produit son text_for_tts,
+    le découpe et lance la synthèse en tâche de fond, sans repasser par le
+    nettoyage LLM. L'audio est ainsi prêt (ou en cours) quand la réponse texte
+    a fini d'être envoyée.
+
+    Quand la réponse est générée en streaming, le text_for_tts peut aussi arriver
+    par morceaux (`feed`) : chaque segment est synthétisé dès que sa phrase est
+    fermée, pendant que le modèle écrit la suite, puis `finish` ferme la liste.
+    """
 
-    return response.audio_content
+    def __init__(
+        self,
+        concurrency: int = 3,
+        sizing: Optional[SegmentSizing] = None,
+        audio_format: AudioFormat = DEFAULT_AUDIO_FORMAT,
+    ):
+        self.concurrency = concurrency
+        self.sizing = sizing
+        self.audio_format = audio_format
+        self.synthesizer: Optional[OrderedSegmentSynthesizer] = None
+        # Découpage incrémental en cours (text_for_tts reçu par morceaux)
+        self._segmenter: Optional[IncrementalSegmenter] = None
+        self._fed_text = ""
+
+    def __call__(self, invocation_id: str, text: str):
+        if self._segmenter is not None:
+            # Texte complet publié par le callback après un flux : il ne reste
+            # qu'à compléter et fermer la liste de segments
+            if text.startswith(self._fed_text):
+                self.feed(invocation_id, text[len(self._fed_text) :])
+            self.finish()
+            return
+        if self.synthesizer is not None:
+            return
+        segments = split_text_into_segments(" ".join(text.split()), sizing=self.sizing)
+        if not segments:
+            return
+        logger.info(
+            f"Starting TTS for invocation {invocation_id}: {len(segments)} segments"
+        )
+        self.synthesizer = OrderedSegmentSynthesizer(
+            segments, concurrency=self.concurrency, audio_format=self.audio_format
+        )
+        self.synthesizer.start()
+
+    def feed(self, invocation_id: str, chunk: str):
+        """Ajoute un morceau du text_for_tts et synthétise les segments fermés."""
+        if self.synthesizer is None:
+            logger.info(f"Streaming TTS for invocation {invocation_id}")
+            self._segmenter = IncrementalSegmenter(sizing=self.sizing)
+            self.synthesizer = OrderedSegmentSynthesizer(
+                concurrency=self.concurrency, audio_format=self.audio_format
+            )
+            self.synthesizer.start()
+        elif self._segmenter is None or self.synthesizer.total is not None:
+            # Synthèse lancée sur le texte complet, flux terminé ou lecture annulée
+            return
+        self._fed_text += chunk
+        for segment in self._segmenter.feed(chunk):
+            self.synthesizer.add(segment)
+
+    def finish(self):
+        """Termine un text_for_tts reçu par morceaux (sans effet sinon)."""
+        if self._segmenter is None:
+            return
+        if self.synthesizer.total is None:
+            for segment in self._segmenter.flush():
+                self.synthesizer.add(segment)
+        self._segmenter = None
+        self.synthesizer.close()
+        if not self.synthesizer.segments:
+            # text_for_tts vide : `resolve` se rabattra sur le markdown
+            self.synthesizer = None
+
+    async def resolve(
+        self, invocation_id: Optional[str]
+    ) -> Optional[OrderedSegmentSynthesizer]:
+        """
+        Retourne le synthétiseur démarré par le callback, ou à défaut en crée un à
+        partir du SyntheticText sauvegardé. None si aucun text_for_tts n'existe.
+        """
+        if self.synthesizer is None and invocation_id:
+            text = await load_speech_text(invocation_id)
+            if text:
+                self(invocation_id, text)
+        return self.synthesizer
+
+    def cancel(self):
+        if self.synthesizer is not None:
+            self.synthesizer.cancel()
@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from shared.lib.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(
+    text: str,
+    voice_name: str,
+    language_code: str,
+    audio_encoding: str,
+    sample_rate_hertz: Optional[int] = None,
+) -> str:
+    """
+    Clé de cache adressée par contenu : sha256(texte, voix, langue, encodage et
+    fréquence d'échantillonnage si elle est imposée).
+    """
+    fields = [text, voice_name, language_code, audio_encoding]
+    if sample_rate_hertz:
+        fields.append(str(sample_rate_hertz))
+    payload = "\x1f".join(fields)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSAudioCache:
+    """
+    Cache audio TTS à deux niveaux :
+    - une LRU en mémoire bornée en octets ;
+    - un répertoire sur disque borné en octets, évincé du moins récemment utilisé.
+
+    Le niveau disque est partagé entre les workers uvicorn ; chaque worker garde son
+    propre index (reconstruit au démarrage à partir des mtime), les fichiers
+    disparus sous ses pieds sont simplement traités comme des misses.
+    """
+
+    def __init__(
+        self,
+        memory_max_bytes: int,
+        disk_dir: Optional[str],
+        disk_max_bytes: int,
+    ):
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self._disk_dir = Path(disk_dir) if disk_dir and disk_max_bytes > 0 else None
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_index: Optional[OrderedDict[str, int]] = None
+        self._disk_bytes = 0
+        self._disk_lock = asyncio.Lock()
+
+    # --- Niveau mémoire ---
+
+    def _memory_get(self, key: str) -> Optional[bytes]:
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+        return audio
+
+    def _memory_set(self, key: str, audio: bytes):
+        if len(audio) > self.memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            metrics.increment("tts_cache.memory_evictions")
+        metrics.set_gauge("tts_cache.memory_bytes", self._memory_bytes)
+        metrics.set_gauge("tts_cache.memory_entries", len(self._memory))
+
+    # --- Niveau disque ---
+
+    def _disk_path(self, key: str) -> Path:
+        return self._disk_dir / key[:2] / f"{key}.audio"
+
+    def _scan_disk(self) -> OrderedDict[str, int]:
+        entries = []
+        self._disk_dir.mkdir(parents=True, exist_ok=True)
+        for path in self._disk_dir.glob("*/*.audio"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        entries.sort()
+        return OrderedDict((key, size) for _, key, size in entries)
+
+    async def _ensure_disk_index(self):
+        if self._disk_index is not None:
+            return
+        async with self._disk_lock:
+            if self._disk_index is None:
+                index = await asyncio.to_thread(self._scan_disk)
+                self._disk_bytes = sum(index.values())
+                self._disk_index = index
+                logger.info(
+                    f"TTS disk cache loaded: {len(index)} entries, {self._disk_bytes} bytes"
+                )
+
+    def _read_file(self, key: str) -> Optional[bytes]:
+        path = self._disk_path(key)
+        try:
+            audio = path.read_bytes()
+            # Rafraîchir le mtime pour conserver l'ordre LRU après redémarrage
+            os.utime(path)
+            return audio
+        except FileNotFoundError:
+            return None
+
+    def _write_file(self, key: str, audio: bytes):
+        path = self._disk_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(audio)
+        os.replace(tmp_path, path)
+
+    def _delete_files(self, keys: list[str]):
+        for key in keys:
+            try:
+                self._disk_path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _forget_disk_entry(self, key: str):
+        size = self._disk_index.pop(key, None)
+        if size is not None:
+            self._disk_bytes -= size
+
+    async def _disk_get(self, key: str) -> Optional[bytes]:
+        await self._ensure_disk_index()
+        if key not in self._disk_index:
+            return None
+        audio = await asyncio.to_thread(self._read_file, key)
+        if audio is None:
+            self._forget_disk_entry(key)
+            return None
+        if key in self._disk_index:
+            self._disk_index.move_to_end(key)
+        return audio
+
+    async def _disk_set(self, key: str, audio: bytes):
+        if len(audio) > self.disk_max_bytes:
+            return
+        await self._ensure_disk_index()
+        await asyncio.to_thread(self._write_file, key, audio)
+        self._forget_disk_entry(key)
+        self._disk_index[key] = len(audio)
+        self._disk_bytes += len(audio)
+
+        evicted = []
+        while self._disk_bytes > self.disk_max_bytes and self._disk_index:
+            evicted_key, size = self._disk_index.popitem(last=False)
+            self._disk_bytes -= size
+            evicted.append(evicted_key)
+        if evicted:
+            metrics.increment("tts_cache.disk_evictions", len(evicted))
+            await asyncio.to_thread(self._delete_files, evicted)
+        metrics.set_gauge("tts_cache.disk_bytes", self._disk_bytes)
+        metrics.set_gauge("tts_cache.disk_entries", len(self._disk_index))
+
+    # --- API publique ---
+
+    async def get(self, key: str) -> Optional[bytes]:
+        audio = self._memory_get(key)
+        if audio is not None:
+            metrics.increment("tts_cache.memory_hits")
+            return audio
+
+        if self._disk_dir is not None:
+            try:
+                audio = await self._disk_get(key)
+            except OSError as e:
+                logger.warning(f"TTS disk cache read failed for {key}: {e}")
+                audio = None
+            if audio is not None:
+                metrics.increment("tts_cache.disk_hits")
+                self._memory_set(key, audio)
+                return audio
+
+        metrics.increment("tts_cache.misses")
+        return None
+
+    async def set(self, key: str, audio: bytes):
+        self._memory_set(key, audio)
+        if self._disk_dir is not None:
+            try:
+                await self._disk_set(key, audio)
+            except OSError as e:
+                logger.warning(f"TTS disk cache write failed for {key}: {e}")
+
+    def stats(self) -> dict:
+        snapshot = metrics.snapshot()["counters"]
+        hits = snapshot.get("tts_cache.memory_hits", 0) + snapshot.get(
+            "tts_cache.disk_hits", 0
+        )
+        misses = snapshot.get("tts_cache.misses", 0)
+        return {
+            "memory_hits": snapshot.get("tts_cache.memory_hits", 0),
+            "disk_hits": snapshot.get("tts_cache.disk_hits", 0),
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else None,
+            "memory_evictions": snapshot.get("tts_cache.memory_evictions", 0),
+            "disk_evictions": snapshot.get("tts_cache.disk_evictions", 0),
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "memory_max_bytes": self.memory_max_bytes,
+            "disk_entries": (
+                len(self._disk_index) if self._disk_index is not None else None
+            ),
+            "disk_bytes": self._disk_bytes if self._disk_index is not None else None,
+            "disk_max_bytes": self.disk_max_bytes if self._disk_dir else 0,
+        }
+
+
+tts_audio_cache = TTSAudioCache(
+    memory_max_bytes=int(os.getenv("TTS_CACHE_MEMORY_MAX_BYTES", str(64 * 1024**2))),
+    disk_dir=os.getenv("TTS_CACHE_DIR", "database/tts_cache"),
+    disk_max_bytes=int(os.getenv("TTS_CACHE_DISK_MAX_BYTES", str(1024**3))),
+)
@@ -0,0 +1,189 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, Optional
+
+from shared.lib.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Voies de priorité des requêtes TTS (la plus petite valeur passe en premier)."""
+
+    # Premier segment d'une réponse vocale : c'est lui que l'utilisateur attend
+    INTERACTIVE_FIRST = 0
+    # Segments suivants d'une réponse vocale
+    INTERACTIVE = 1
+    # Synthèses sans utilisateur en attente immédiate (/tts)
+    BATCH = 2
+
+
+class TTSScheduler:
+    """
+    Ordonnanceur des appels au fournisseur TTS.
+
+    - Un seau à jetons, rempli au rythme du quota en caractères par minute, évite
+      de dépasser le quota : chaque appel consomme autant de jetons que son texte
+      a de caractères. Un appel plus gros que le seau attend que le seau soit
+      plein puis le met en dette.
+    - Au plus `max_concurrent` appels sont en cours.
+    - Les demandes en attente sont servies par priorité, puis par ordre d'arrivée.
+      La priorité est stricte : une voie inférieure attend que les voies
+      supérieures soient vides.
+
+    Un quota à 0 désactive le seau à jetons ; la limite de concurrence et les
+    priorités restent appliquées.
+    """
+
+    def __init__(
+        self,
+        chars_per_minute: int,
+        max_concurrent: int,
+        burst_chars: Optional[int] = None,
+    ):
+        self.chars_per_minute = chars_per_minute
+        self.max_concurrent = max(1, max_concurrent)
+        self._rate = chars_per_minute / 60
+        self.capacity = burst_chars or chars_per_minute
+        self._tokens = float(self.capacity)
+        self._refilled_at = time.monotonic()
+        self._running = 0
+        self._queue: list[tuple[int, int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._depths = {priority: 0 for priority in Priority}
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    # --- Seau à jetons ---
+
+    def _refill(self):
+        if self._rate <= 0:
+            return
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._refilled_at) * self._rate
+        )
+        self._refilled_at = now
+
+    def _wait_for_tokens(self, cost: int) -> float:
+        """Secondes avant de pouvoir payer `cost` (0 si possible maintenant)."""
+        if self._rate <= 0:
+            return 0.0
+        self._refill()
+        needed = min(cost, self.capacity)
+        if self._tokens >= needed:
+            return 0.0
+        return (needed - self._tokens) / self._rate
+
+    # --- File d'attente ---
+
+    def _update_depth_gauges(self):
+        metrics.set_gauge("tts_scheduler.queue_depth", sum(self._depths.values()))
+        for priority, depth in self._depths.items():
+            metrics.set_gauge(
+                f"tts_scheduler.queue_depth.{priority.name.lower()}", depth
+            )
+        metrics.set_gauge("tts_scheduler.running", self._running)
+
+    def _dispatch(self):
+        """Démarre les demandes en tête de file tant que quota et concurrence le permettent."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        while self._queue and self._running < self.max_concurrent:
+            priority, _, cost, future = self._queue[0]
+            if future.done():
+                # Demandeur annulé entre-temps
+                heapq.heappop(self._queue)
+                continue
+            delay = self._wait_for_tokens(cost)
+            if delay > 0:
+                self._wakeup = asyncio.get_running_loop().call_later(
+                    delay, self._dispatch
+                )
+                break
+            heapq.heappop(self._queue)
+            self._depths[Priority(priority)] -= 1
+            self._take(cost)
+            future.set_result(None)
+
+        self._update_depth_gauges()
+
+    def _take(self, cost: int):
+        if self._rate > 0:
+            self._tokens -= cost
+        self._running += 1
+
+    def _release(self):
+        self._running -= 1
+        self._dispatch()
+
+    # --- API ---
+
+    @asynccontextmanager
+    async def slot(
+        self, cost: int, priority: Priority = Priority.INTERACTIVE
+    ) -> AsyncIterator[None]:
+        """Attend son tour (quota, concurrence, priorité) pour un appel de `cost` caractères."""
+        lane = priority.name.lower()
+        started_at = time.monotonic()
+        if (
+            not self._queue
+            and self._running < self.max_concurrent
+            and self._wait_for_tokens(cost) == 0
+        ):
+            self._take(cost)
+            self._update_depth_gauges()
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(
+                self._queue, (int(priority), next(self._sequence), cost, future)
+            )
+            self._depths[priority] += 1
+            self._dispatch()
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Le créneau venait d'être accordé : le rendre
+                    self._release()
+                else:
+                    future.cancel()
+                    self._depths[priority] -= 1
+                    self._dispatch()
+                raise
+
+        wait = time.monotonic() - started_at
+        metrics.observe(f"tts_scheduler.wait_seconds.{lane}", wait)
+        if wait > 1:
+            logger.info(f"TTS {lane} request waited {wait:.2f}s for quota")
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        self._refill()
+        return {
+            "chars_per_minute": self.chars_per_minute,
+            "tokens": self._tokens if self._rate > 0 else None,
+            "running": self._running,
+            "max_concurrent": self.max_concurrent,
+            "queue_depth": {
+                priority.name.lower(): depth for priority, depth in self._depths.items()
+            },
+        }
+
+
+tts_scheduler = TTSScheduler(
+    # Quota TTS du projet en caractères par minute (0 : pas de limite de débit)
+    chars_per_minute=int(os.getenv("TTS_QUOTA_CHARS_PER_MINUTE", "0")),
+    max_concurrent=int(os.getenv("TTS_MAX_CONCURRENT_CALLS", "16")),
+    burst_chars=int(os.getenv("TTS_QUOTA_BURST_CHARS", "0")) or None,
+)
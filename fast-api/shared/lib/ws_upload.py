@@ -0,0 +1,159 @@
+import logging
+import os
+import time
+import uuid
+from typing import Any, Optional
+
+from shared.lib.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Taille maximale d'un envoi par type de contenu
+WS_UPLOAD_MAX_BYTES = {
+    "audio": int(os.getenv("WS_UPLOAD_MAX_AUDIO_BYTES", str(25 * 1024**2))),
+    "image": int(os.getenv("WS_UPLOAD_MAX_IMAGE_BYTES", str(20 * 1024**2))),
+}
+# Volume total des envois en cours dans le worker (protège la mémoire)
+WS_UPLOAD_MAX_PENDING_BYTES = int(
+    os.getenv("WS_UPLOAD_MAX_PENDING_BYTES", str(200 * 1024**2))
+)
+# Durée de vie d'un envoi inachevé, pendant laquelle il peut être repris
+WS_UPLOAD_TTL_SECONDS = float(os.getenv("WS_UPLOAD_TTL_SECONDS", "600"))
+# Taille de trame binaire conseillée au client
+WS_UPLOAD_CHUNK_BYTES = int(os.getenv("WS_UPLOAD_CHUNK_BYTES", str(256 * 1024)))
+
+
+class UploadError(ValueError):
+    """Envoi refusé : taille, type, identifiant inconnu ou expiré."""
+
+
+class Upload:
+    """
+    Envoi binaire en cours. Les trames reçues sont écrites à la suite dans un
+    tampon alloué une fois pour toutes à la taille annoncée : l'envoi n'occupe
+    qu'une copie du contenu, quel que soit le nombre de trames.
+    """
+
+    def __init__(
+        self,
+        upload_id: str,
+        owner: str,
+        kind: str,
+        mime_type: Optional[str],
+        size: int,
+        metadata: Optional[dict[str, Any]] = None,
+    ):
+        self.upload_id = upload_id
+        self.owner = owner
+        self.kind = kind
+        self.mime_type = mime_type
+        self.size = size
+        self.metadata = metadata or {}
+        self.received = 0
+        self.updated_at = time.monotonic()
+        self._buffer = bytearray(size)
+
+    @property
+    def complete(self) -> bool:
+        return self.received == self.size
+
+    def write(self, chunk: bytes):
+        end = self.received + len(chunk)
+        if end > self.size:
+            raise UploadError(
+                f"Upload {self.upload_id} exceeds its announced size ({self.size} bytes)"
+            )
+        self._buffer[self.received : end] = chunk
+        self.received = end
+        self.updated_at = time.monotonic()
+
+    def take(self) -> bytes:
+        """Contenu complet ; le tampon est libéré."""
+        if not self.complete:
+            raise UploadError(
+                f"Upload {self.upload_id} incomplete ({self.received}/{self.size} bytes)"
+            )
+        data = bytes(self._buffer)
+        self._buffer = bytearray()
+        return data
+
+
+class UploadRegistry:
+    """
+    Envois en cours du worker. Un envoi interrompu (déconnexion) peut être repris
+    par le même client pendant WS_UPLOAD_TTL_SECONDS, à condition de retomber sur
+    le même worker ; sinon le client recommence l'envoi.
+    """
+
+    def __init__(
+        self,
+        max_bytes: dict[str, int],
+        max_pending_bytes: int,
+        ttl: float,
+    ):
+        self.max_bytes = max_bytes
+        self.max_pending_bytes = max_pending_bytes
+        self.ttl = ttl
+        self._uploads: dict[tuple[str, str], Upload] = {}
+
+    @property
+    def pending_bytes(self) -> int:
+        return sum(upload.size for upload in self._uploads.values())
+
+    def _expire(self):
+        deadline = time.monotonic() - self.ttl
+        for key, upload in list(self._uploads.items()):
+            if upload.updated_at < deadline:
+                del self._uploads[key]
+                metrics.increment("ws.uploads.expired")
+                logger.info(f"Upload {upload.upload_id} expired")
+
+    def start(
+        self,
+        owner: str,
+        kind: str,
+        mime_type: Optional[str],
+        size: Any,
+        metadata: Optional[dict[str, Any]] = None,
+    ) -> Upload:
+        self._expire()
+        if kind not in self.max_bytes:
+            raise UploadError(f"Unsupported upload kind: {kind}")
+        if not isinstance(size, int) or size <= 0:
+            raise UploadError("Upload size must be a positive integer")
+        if size > self.max_bytes[kind]:
+            raise UploadError(
+                f"{kind} upload too large ({size} > {self.max_bytes[kind]} bytes)"
+            )
+        if self.pending_bytes + size > self.max_pending_bytes:
+            raise UploadError("Too many uploads in progress, retry later")
+
+        upload = Upload(uuid.uuid4().hex, owner, kind, mime_type, size, metadata)
+        self._uploads[(owner, upload.upload_id)] = upload
+        metrics.increment("ws.uploads.started")
+        return upload
+
+    def get(self, owner: str, upload_id: Any) -> Upload:
+        self._expire()
+        upload = self._uploads.get((owner, upload_id))
+        if upload is None:
+            raise UploadError(f"Unknown or expired upload: {upload_id}")
+        return upload
+
+    def finish(self, upload: Upload) -> bytes:
+        """Retire l'envoi terminé du registre et retourne son contenu."""
+        data = upload.take()
+        self._uploads.pop((upload.owner, upload.upload_id), None)
+        metrics.increment("ws.uploads.completed")
+        metrics.observe(f"ws.upload_bytes.{upload.kind}", upload.size)
+        return data
+
+    def discard(self, upload: Upload):
+        self._uploads.pop((upload.owner, upload.upload_id), None)
+
+
+upload_registry = UploadRegistry(
+    max_bytes=WS_UPLOAD_MAX_BYTES,
+    max_pending_bytes=WS_UPLOAD_MAX_PENDING_BYTES,
+    ttl=WS_UPLOAD_TTL_SECONDS,
+)
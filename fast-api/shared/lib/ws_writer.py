@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import os
+from typing import Any, Optional
+
+import orjson
+from fastapi import WebSocket
+
+from shared.lib.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Fenêtre de regroupement des message_part non définitifs (tokens de la réponse)
+WS_COALESCE_SECONDS = float(os.getenv("WS_COALESCE_SECONDS", "0.015"))
+# Texte en attente au-delà duquel le regroupement part sans attendre la fenêtre
+WS_COALESCE_MAX_CHARS = int(os.getenv("WS_COALESCE_MAX_CHARS", "2048"))
+
+
+def dumps(message: Any) -> str:
+    """Sérialisation JSON (orjson) d'un message sortant."""
+    return orjson.dumps(message).decode()
+
+
+class WebSocketWriter:
+    """
+    Envoi des trames sortantes d'une connexion WebSocket.
+
+    Les messages sont sérialisés avec orjson. Les message_part non définitifs
+    sont regroupés : leur texte est accumulé pendant WS_COALESCE_SECONDS (ou
+    jusqu'à WS_COALESCE_MAX_CHARS caractères) puis envoyé en une seule trame.
+    Les autres trames, JSON ou binaires, partent immédiatement, précédées du
+    texte en attente pour conserver l'ordre ; un message_part définitif absorbe
+    ce texte. Un verrou sérialise les envois des tâches de la connexion (tour
+    en cours, lecture TTS, réception).
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        coalesce_seconds: float = WS_COALESCE_SECONDS,
+        max_chars: int = WS_COALESCE_MAX_CHARS,
+    ):
+        self.websocket = websocket
+        self.coalesce_seconds = coalesce_seconds
+        self.max_chars = max_chars
+        self._lock = asyncio.Lock()
+        self._pending: list[str] = []
+        self._pending_chars = 0
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _coalescable(message: dict) -> bool:
+        return (
+            message.get("type") == "message_part"
+            and message.get("is_final") is False
+            and isinstance(message.get("text"), str)
+            and len(message) == 3
+        )
+
+    def _take_pending(self) -> str:
+        if not self._pending:
+            return ""
+        if len(self._pending) > 1:
+            metrics.increment("ws.message_parts.coalesced", len(self._pending) - 1)
+        text = "".join(self._pending)
+        self._pending = []
+        self._pending_chars = 0
+        return text
+
+    async def _send_text(self, data: str):
+        await self.websocket.send_text(data)
+        metrics.increment("ws.frames_sent")
+
+    async def _send_pending(self):
+        text = self._take_pending()
+        if text:
+            await self._send_text(
+                dumps({"type": "message_part", "text": text, "is_final": False})
+            )
+
+    async def send_json(self, message: dict):
+        if self.coalesce_seconds > 0 and self._coalescable(message):
+            self._pending.append(message["text"])
+            self._pending_chars += len(message["text"])
+            if self._pending_chars >= self.max_chars:
+                await self.flush()
+            elif self._flush_task is None:
+                self._flush_task = asyncio.create_task(self._flush_later())
+            return
+
+        async with self._lock:
+            if (
+                self._pending
+                and message.get("type") == "message_part"
+                and not message.get("replace")
+            ):
+                # Fin de réponse : le texte en attente part dans la même trame
+                message = {**message, "text": self._take_pending() + message["text"]}
+            else:
+                await self._send_pending()
+            await self._send_text(dumps(message))
+
+    async def send_bytes(self, data: bytes):
+        async with self._lock:
+            await self._send_pending()
+            await self.websocket.send_bytes(data)
+            metrics.increment("ws.frames_sent")
+
+    async def flush(self):
+        """Envoie le texte en attente."""
+        async with self._lock:
+            await self._send_pending()
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(self.coalesce_seconds)
+            self._flush_task = None
+            await self.flush()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Connexion fermée : l'envoi suivant du tour lèvera l'erreur
+            logger.debug(f"Deferred message_part flush failed: {e}")
+
+    def close(self):
+        """Abandonne le texte en attente (connexion terminée)."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self._pending = []
+        self._pending_chars = 0
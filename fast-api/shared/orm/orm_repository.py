@@ -1,6 +1,7 @@
 from typing import Any, Optional, List
 from surrealdb import RecordID
 import importlib
+import re
 import logging
 import random
 import os
@@ -119,9 +120,9 @@ class OrmRepository:
             )
 
         try:
-            module = importlib.import_module(
-                f"shared.orm.entities.{self.entity_name.lower()}"
-            )
+            # SyntheticText -> shared.orm.entities.synthetic_text
+            module_name = re.sub(r"(?<!^)(?=[A-Z])", "_", self.entity_name).lower()
+            module = importlib.import_module(f"shared.orm.entities.{module_name}")
             class_ = getattr(module, self.entity_name)
 
             # Convert any RecordID fields to string format 'table:id'
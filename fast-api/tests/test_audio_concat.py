@@ -0,0 +1,58 @@
+import struct
+import unittest
+
+from shared.lib.audio_concat import OggJoiner, _ogg_page, concat_ogg, ogg_pages
+
+PACKET_SAMPLES = 960
+
+
+def opus_stream(serial: int, packets: int, pre_skip: int = 312) -> bytes:
+    """Flux Ogg/Opus factice : OpusHead, OpusTags puis un paquet par page."""
+    head = b"OpusHead" + bytes([1, 1]) + struct.pack("<HIhB", pre_skip, 48000, 0, 0)
+    pages = [
+        _ogg_page(0x02, 0, serial, 0, bytes([len(head)]), head),
+        _ogg_page(0, 0, serial, 1, bytes([12]), b"OpusTags" + bytes(4)),
+    ]
+    for i in range(packets):
+        # Les positions comptent tous les échantillons décodés, amorce comprise
+        pages.append(
+            _ogg_page(
+                0x04 if i == packets - 1 else 0,
+                PACKET_SAMPLES * (i + 1),
+                serial,
+                2 + i,
+                bytes([10]),
+                bytes(10),
+            )
+        )
+    return b"".join(pages)
+
+
+class OggJoinTest(unittest.TestCase):
+    def test_final_granule_counts_every_decoded_sample(self):
+        packets = [3, 2, 5]
+        joined = concat_ogg(
+            [opus_stream(serial, n) for serial, n in zip((1, 2, 3), packets)]
+        )
+        pages = list(ogg_pages(joined))
+        self.assertEqual(pages[-1][1], PACKET_SAMPLES * sum(packets))
+        self.assertEqual({page[2] for page in pages}, {1})
+        self.assertEqual(pages[0][0], 0x02)
+        self.assertEqual(pages[-1][0], 0x04)
+        granules = [page[1] for page in pages]
+        self.assertEqual(granules, sorted(granules))
+
+    def test_invalid_chunk_leaves_joiner_unchanged(self):
+        joiner = OggJoiner()
+        first = joiner.add(opus_stream(1, 3))
+        state = (joiner.serial, joiner.sequence, joiner.last_granule)
+        broken = opus_stream(2, 4)
+        with self.assertRaises(ValueError):
+            joiner.add(broken[:-5])
+        self.assertEqual((joiner.serial, joiner.sequence, joiner.last_granule), state)
+        joined = first + joiner.add(opus_stream(2, 4)) + joiner.finish()
+        self.assertEqual(list(ogg_pages(joined))[-1][1], PACKET_SAMPLES * 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+import numpy as np
+
+from shared.lib.audio_decode import probe_container
+
+# Trame MPEG-1 couche III, 128 kbit/s, 44,1 kHz : 417 octets
+MP3_FRAME = b"\xff\xfb\x90\x00" + bytes(413)
+
+
+class ProbeContainerTest(unittest.TestCase):
+    def test_pcm_starting_with_negative_sample_is_raw(self):
+        pcm = np.array([-1, 3, -2, 0] * 4000, dtype="<i2").tobytes()
+        self.assertEqual(pcm[:2], b"\xff\xff")
+        self.assertEqual(probe_container(pcm), "raw")
+
+    def test_near_silent_pcm_is_raw(self):
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            pcm = rng.integers(-40, 40, 16000).astype("<i2")
+            pcm[0] = rng.integers(-40, 0)
+            self.assertEqual(probe_container(pcm.tobytes()), "raw")
+
+    def test_mp3_needs_two_consecutive_frames(self):
+        self.assertEqual(probe_container(MP3_FRAME * 3), "mp3")
+        self.assertEqual(probe_container(MP3_FRAME[:4] + bytes(1000)), "raw")
+
+    def test_id3_tag_is_mp3(self):
+        self.assertEqual(probe_container(b"ID3\x03\x00" + bytes(100)), "mp3")
+
+
+if __name__ == "__main__":
+    unittest.main()
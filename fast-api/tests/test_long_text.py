@@ -0,0 +1,54 @@
+import unittest
+from unittest import mock
+
+from shared.lib import tts
+
+
+class HardSplitTest(unittest.TestCase):
+    def assertFits(self, pieces: list[str], max_length: int):
+        for piece in pieces:
+            self.assertLessEqual(len(piece), max_length)
+            self.assertLessEqual(len(piece.encode()), tts._TTS_MAX_REQUEST_BYTES)
+
+    def test_short_segment_unchanged(self):
+        self.assertEqual(tts._hard_split("Bonjour à tous", 100), ["Bonjour à tous"])
+
+    def test_split_on_whitespace(self):
+        segment = " ".join(f"mot{i}" for i in range(500))
+        pieces = tts._hard_split(segment, 100)
+        self.assertFits(pieces, 100)
+        self.assertEqual(" ".join(pieces), segment)
+
+    def test_long_word_split_by_characters(self):
+        pieces = tts._hard_split("a" * 250, 100)
+        self.assertEqual(pieces, ["a" * 100, "a" * 100, "a" * 50])
+
+    def test_byte_limit_without_splitting_characters(self):
+        # 4 octets par caractère : la limite en octets passe avant celle en caractères
+        segment = "😀" * 3000
+        pieces = tts._hard_split(segment, 10_000)
+        self.assertFits(pieces, 10_000)
+        self.assertEqual("".join(pieces), segment)
+
+
+class SynthesizeLongTextTest(unittest.IsolatedAsyncioTestCase):
+    async def test_sentence_without_punctuation_stays_under_limits(self):
+        texts = []
+
+        async def generate_audio_for_segment(segment, audio_format, priority):
+            texts.append(segment)
+            return segment.encode()
+
+        text = "une très longue phrase sans ponctuation " * 200
+        with mock.patch.multiple(
+            tts,
+            generate_audio_for_segment=generate_audio_for_segment,
+            concat_audio=lambda chunks, extension: b" ".join(chunks),
+        ):
+            audio = await tts.synthesize_long_text(text)
+
+        self.assertGreater(len(texts), 1)
+        for segment in texts:
+            self.assertLessEqual(len(segment), tts.TTS_MAX_SEGMENT_LENGTH)
+            self.assertLessEqual(len(segment.encode()), tts._TTS_MAX_REQUEST_BYTES)
+        self.assertEqual(audio.decode(), text.strip())
@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+
+from shared.lib.tts import OrderedSegmentSynthesizer
+
+
+async def fake_synthesize(text: str) -> bytes:
+    if text == "lent":
+        await asyncio.sleep(60)
+    if text == "erreur":
+        raise RuntimeError("boom")
+    return text.encode()
+
+
+async def consume(synthesizer: OrderedSegmentSynthesizer, received: list):
+    async for result in synthesizer.results():
+        received.append(result)
+
+
+class OrderedSegmentSynthesizerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_results_in_order_with_errors(self):
+        synthesizer = OrderedSegmentSynthesizer(
+            ["a", "erreur", "b"], synthesize=fake_synthesize
+        )
+        received = []
+        await consume(synthesizer, received)
+        self.assertEqual([r.audio for r in received], [b"a", None, b"b"])
+        self.assertIsInstance(received[1].error, RuntimeError)
+
+    async def test_cancel_wakes_consumer_waiting_for_segments(self):
+        synthesizer = OrderedSegmentSynthesizer(synthesize=fake_synthesize)
+        synthesizer.start()
+        synthesizer.add("a")
+        received = []
+        consumer = asyncio.create_task(consume(synthesizer, received))
+        await asyncio.sleep(0.01)
+        self.assertEqual(len(received), 1)
+        self.assertFalse(consumer.done())
+
+        synthesizer.cancel()
+        await asyncio.wait_for(consumer, 1)
+        self.assertEqual(len(received), 1)
+
+    async def test_cancel_during_synthesis_ends_iteration(self):
+        synthesizer = OrderedSegmentSynthesizer(synthesize=fake_synthesize)
+        synthesizer.start()
+        synthesizer.add("a")
+        synthesizer.add("lent")
+        received = []
+        consumer = asyncio.create_task(consume(synthesizer, received))
+        await asyncio.sleep(0.01)
+
+        synthesizer.cancel()
+        # Pas de CancelledError côté consommateur : l'itération se termine
+        await asyncio.wait_for(consumer, 1)
+        self.assertFalse(consumer.cancelled())
+        self.assertEqual([r.audio for r in received], [b"a"])
+
+    async def test_consumer_cancellation_propagates(self):
+        synthesizer = OrderedSegmentSynthesizer(["lent"], synthesize=fake_synthesize)
+        consumer = asyncio.create_task(consume(synthesizer, []))
+        await asyncio.sleep(0.01)
+        consumer.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await consumer
+        self.assertTrue(all(task.done() for task in synthesizer._tasks))
+
+
+if __name__ == "__main__":
+    unittest.main()
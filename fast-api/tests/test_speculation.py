@@ -0,0 +1,105 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import InMemorySessionService
+
+from shared.lib import speculation
+from shared.lib.speculation import SpeculativeRun
+from shared.lib.speech_text import SPECULATIVE_STATE_KEY, publish_speech_text
+
+APP, USER, SESSION = "app", "user", "session"
+
+
+class FakePrefetch:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, invocation_id, text):
+        self.calls.append((invocation_id, text))
+
+    def cancel(self):
+        pass
+
+
+class SpeculativeRunTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.sessions = InMemorySessionService()
+        session = await self.sessions.create_session(
+            app_name=APP, user_id=USER, session_id=SESSION
+        )
+        for value in ("first", "second"):
+            await self.sessions.append_event(
+                session,
+                Event(author="user", actions=EventActions(state_delta={"step": value})),
+            )
+        self.session = await self.sessions.get_session(
+            app_name=APP, user_id=USER, session_id=SESSION
+        )
+        self.scratch = InMemorySessionService()
+        self.prefetch = FakePrefetch()
+        self.saved = []
+
+        async def save(invocation_id, text):
+            self.saved.append((invocation_id, text))
+
+        patcher = mock.patch.object(speculation, "save_speech_text", save)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def speculative_run(self, run_async) -> SpeculativeRun:
+        runner = SimpleNamespace(session_service=self.scratch, run_async=run_async)
+        return SpeculativeRun(
+            runner,
+            self.sessions,
+            APP,
+            USER,
+            SESSION,
+            "bonjour",
+            speech_prefetch=self.prefetch,
+            base_session=self.session,
+        )
+
+    async def test_copy_keeps_state_and_flags_scratch_session(self):
+        run = self.speculative_run(None)
+        await run._copy_session()
+        scratch = await self.scratch.get_session(
+            app_name=APP, user_id=USER, session_id=run.scratch_session_id
+        )
+        self.assertEqual(scratch.state["step"], "second")
+        self.assertTrue(scratch.state[SPECULATIVE_STATE_KEY])
+        self.assertEqual(len(scratch.events), 2)
+        self.assertTrue(all(not e.actions.state_delta for e in scratch.events))
+        self.assertNotIn(SPECULATIVE_STATE_KEY, self.session.state)
+
+    async def _publishing_run(self, **kwargs):
+        publish_speech_text("inv-1", "Bonjour à vous.")
+        yield SimpleNamespace(partial=False)
+
+    async def test_speech_text_held_until_confirmed(self):
+        run = self.speculative_run(self._publishing_run)
+        run.start()
+        events = [event async for event in run.events()]
+        self.assertEqual(len(events), 1)
+        self.assertEqual(self.prefetch.calls, [])
+
+        self.assertTrue(run.confirm("Bonjour !"))
+        await asyncio.sleep(0)
+        self.assertEqual(self.prefetch.calls, [("inv-1", "Bonjour à vous.")])
+        self.assertEqual(self.saved, [("inv-1", "Bonjour à vous.")])
+
+    async def test_discarded_speculation_leaves_no_speech_text(self):
+        run = self.speculative_run(self._publishing_run)
+        run.start()
+        [event async for event in run.events()]
+        self.assertFalse(run.confirm("Au revoir"))
+        run.cancel()
+        await asyncio.sleep(0)
+        self.assertEqual(self.prefetch.calls, [])
+        self.assertEqual(self.saved, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
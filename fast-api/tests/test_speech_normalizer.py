@@ -0,0 +1,47 @@
+import json
+import unittest
+from pathlib import Path
+
+from shared.lib.speech_normalizer import speech_normalizer
+
+# Réponses types de l'agent et sorties figées de l'ancien nettoyage par regex.
+# Les cas portant "baseline" changent volontairement : "expected" est la
+# nouvelle sortie, "baseline" celle de l'ancienne fonction, "note" la raison.
+GOLDEN_CASES = json.loads(
+    (Path(__file__).parent / "golden" / "speech_normalizer.json").read_text(
+        encoding="utf-8"
+    )
+)
+
+
+class SpeechNormalizerGoldenTest(unittest.TestCase):
+    def test_matches_frozen_outputs(self):
+        for case in GOLDEN_CASES:
+            with self.subTest(case["name"]):
+                self.assertEqual(
+                    speech_normalizer.normalize(case["input"]), case["expected"]
+                )
+
+    def test_intentional_differences_are_documented(self):
+        changed = {case["name"] for case in GOLDEN_CASES if "baseline" in case}
+        self.assertTrue({"bloc_de_code", "puces_etoile"} <= changed)
+        for case in GOLDEN_CASES:
+            if "baseline" in case:
+                with self.subTest(case["name"]):
+                    self.assertTrue(case.get("note"))
+                    self.assertNotEqual(case["baseline"], case["expected"])
+
+    def test_code_fence_is_omitted(self):
+        self.assertEqual(
+            speech_normalizer.normalize("```python\nprint('hello')\n```\nFin."),
+            "code omis Fin.",
+        )
+
+    def test_star_bullets_are_joined(self):
+        self.assertEqual(
+            speech_normalizer.normalize("* un\n* deux\n* trois"), "un, deux et trois"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import asyncio
+import unittest
+
+from shared.lib.transcription import StreamingTranscription
+
+
+async def fake_recognizer(audio_chunks, mime_type):
+    """Chaque morceau audio est une consigne : "partial:texte", "final:texte", "error"."""
+    async for chunk in audio_chunks:
+        kind, _, text = chunk.decode().partition(":")
+        if kind == "error":
+            raise RuntimeError("recognition failed")
+        yield text, kind == "final"
+
+
+class StreamingTranscriptionTest(unittest.IsolatedAsyncioTestCase):
+    def make_stream(self):
+        self.transcripts = []
+        self.stable = []
+
+        async def on_transcript(text, is_final):
+            self.transcripts.append((text, is_final))
+
+        async def on_stable(text):
+            self.stable.append(text)
+
+        return StreamingTranscription(
+            on_transcript=on_transcript,
+            recognizer=fake_recognizer,
+            on_stable=on_stable,
+        )
+
+    async def test_partials_and_finals(self):
+        stream = self.make_stream()
+        for chunk in (
+            b"partial:Bon",
+            b"final:Bonjour. ",
+            "partial:Ça".encode(),
+            "final:Ça va ?".encode(),
+        ):
+            stream.feed(chunk)
+
+        self.assertEqual(await stream.finish(), "Bonjour. Ça va ?")
+        self.assertEqual(
+            self.transcripts,
+            [
+                ("Bon", False),
+                ("Bonjour. ", True),
+                ("Bonjour. Ça", False),
+                ("Bonjour. Ça va ?", True),
+            ],
+        )
+        self.assertEqual(self.stable, ["Bonjour. ", "Bonjour. Ça va ?"])
+
+    async def test_detach_stable(self):
+        stream = self.make_stream()
+        stream.feed(b"final:Bonjour. ")
+        await asyncio.sleep(0.01)
+        stream.detach_stable()
+        stream.feed("final:Ça va ?".encode())
+
+        self.assertEqual(await stream.finish(), "Bonjour. Ça va ?")
+        self.assertEqual(self.stable, ["Bonjour. "])
+
+    async def test_error_raised_by_finish(self):
+        stream = self.make_stream()
+        stream.feed(b"partial:Bon")
+        stream.feed(b"error")
+
+        with self.assertRaises(RuntimeError):
+            await stream.finish()
+        self.assertEqual(self.transcripts, [("Bon", False)])
+
+    async def test_error_logged_on_cancel(self):
+        stream = self.make_stream()
+        stream.feed(b"error")
+        await asyncio.sleep(0.01)
+
+        with self.assertLogs("shared.lib.transcription", "WARNING") as logs:
+            stream.cancel()
+            await asyncio.sleep(0)
+        self.assertIn("recognition failed", logs.output[0])
+
+    async def test_cancel_while_streaming(self):
+        stream = self.make_stream()
+        stream.feed(b"partial:Bon")
+        await asyncio.sleep(0.01)
+
+        stream.cancel()
+        await asyncio.sleep(0)
+        self.assertTrue(stream._task.cancelled())
@@ -0,0 +1,144 @@
+import asyncio
+import unittest
+
+from google.api_core import exceptions as google_exceptions
+
+from shared.lib.metrics import Metrics
+from shared.lib.stt_router import (
+    STT_ROUTER_MAX_FAILURES,
+    STT_ROUTER_MIN_SAMPLES,
+    NoEngineAvailable,
+    STTEngine,
+    STTRouter,
+)
+
+
+class FakeEngine:
+    """Moteur qui retourne son nom, ou lève l'erreur qu'on lui donne."""
+
+    def __init__(self, name: str, error: BaseException = None, delay: float = 0):
+        self.name = name
+        self.error = error
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self, content: bytes, mime_type: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.name
+
+
+class STTRouterTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.metrics = Metrics()
+        self.router = STTRouter(metrics=self.metrics)
+
+    def register(self, engine: FakeEngine, **kwargs) -> FakeEngine:
+        self.router.register(
+            STTEngine(
+                name=engine.name,
+                transcribe=engine,
+                mime_types=kwargs.pop("mime_types", ("audio/",)),
+                **kwargs,
+            )
+        )
+        return engine
+
+    def names(self, mime_type: str = "audio/webm", duration: float = None):
+        return [e.name for e in self.router.candidates(mime_type, duration)]
+
+    def test_expected_latency_until_enough_samples(self):
+        self.register(FakeEngine("a"), expected_latency=1.0)
+        self.register(FakeEngine("b"), expected_latency=2.0)
+        for _ in range(STT_ROUTER_MIN_SAMPLES - 1):
+            self.metrics.observe("stt.engine.a.seconds", 10.0)
+        self.assertEqual(self.names(), ["a", "b"])
+
+    def test_lowest_p95_first(self):
+        self.register(FakeEngine("a"), expected_latency=1.0)
+        self.register(FakeEngine("b"), expected_latency=2.0)
+        # Médiane basse mais queue lente : c'est le p95 qui compte
+        for latency in [0.2] * 18 + [8.0] * 2:
+            self.metrics.observe("stt.engine.a.seconds", latency)
+        for _ in range(20):
+            self.metrics.observe("stt.engine.b.seconds", 1.5)
+        self.assertEqual(self.names(), ["b", "a"])
+
+    def test_format_and_duration_filter(self):
+        self.register(FakeEngine("all"), expected_latency=2.0)
+        self.register(
+            FakeEngine("webm"),
+            mime_types=("audio/webm",),
+            max_duration=60,
+            expected_latency=1.0,
+        )
+        self.assertEqual(self.names("audio/webm", 30), ["webm", "all"])
+        self.assertEqual(self.names("audio/webm", 120), ["all"])
+        self.assertEqual(self.names("audio/wav"), ["all"])
+
+    async def test_no_engine(self):
+        self.register(FakeEngine("webm"), mime_types=("audio/webm",))
+        with self.assertRaises(NoEngineAvailable):
+            await self.router.transcribe(b"", "audio/wav")
+
+    async def test_success_records_latency(self):
+        self.register(FakeEngine("a"))
+        self.assertEqual(await self.router.transcribe(b"", "audio/webm"), "a")
+        self.assertEqual(self.metrics.count("stt.engine.a.seconds"), 1)
+
+    async def test_failover_errors(self):
+        errors = [
+            google_exceptions.DeadlineExceeded("slow"),
+            google_exceptions.ServiceUnavailable("down"),
+            ConnectionError("reset"),
+        ]
+        for error in errors:
+            with self.subTest(error=type(error).__name__):
+                self.setUp()
+                first = self.register(FakeEngine("a", error), expected_latency=1.0)
+                second = self.register(FakeEngine("b"), expected_latency=2.0)
+                self.assertEqual(await self.router.transcribe(b"", "audio/webm"), "b")
+                self.assertEqual((first.calls, second.calls), (1, 1))
+                self.assertEqual(self.metrics.get("stt.failovers"), 1)
+
+    async def test_engine_timeout_fails_over(self):
+        self.register(FakeEngine("a", delay=1), timeout=0.01, expected_latency=1.0)
+        self.register(FakeEngine("b"), expected_latency=2.0)
+        self.assertEqual(await self.router.transcribe(b"", "audio/webm"), "b")
+        self.assertEqual(self.metrics.get("stt.engine.a.timeouts"), 1)
+        # Le délai dépassé compte dans la latence du moteur
+        self.assertEqual(self.metrics.count("stt.engine.a.seconds"), 1)
+
+    async def test_clip_errors_do_not_fail_over(self):
+        errors = [
+            google_exceptions.InvalidArgument("bad audio"),
+            ValueError("Cannot decode mp4 audio"),
+        ]
+        for error in errors:
+            with self.subTest(error=type(error).__name__):
+                self.setUp()
+                first = self.register(FakeEngine("a", error), expected_latency=1.0)
+                second = self.register(FakeEngine("b"), expected_latency=2.0)
+                with self.assertRaises(type(error)):
+                    await self.router.transcribe(b"", "audio/webm")
+                self.assertEqual((first.calls, second.calls), (1, 0))
+                self.assertEqual(self.metrics.get("stt.failovers"), 0)
+                self.assertEqual(self.metrics.get("stt.rejected_clips"), 1)
+
+    async def test_last_failover_error_raised(self):
+        self.register(FakeEngine("a", ConnectionError("a")), expected_latency=1.0)
+        self.register(FakeEngine("b", ConnectionError("b")), expected_latency=2.0)
+        with self.assertRaisesRegex(ConnectionError, "b"):
+            await self.router.transcribe(b"", "audio/webm")
+
+    async def test_cooldown_after_consecutive_failures(self):
+        self.register(FakeEngine("a", ConnectionError()), expected_latency=1.0)
+        self.register(FakeEngine("b"), expected_latency=2.0)
+        for _ in range(STT_ROUTER_MAX_FAILURES - 1):
+            await self.router.transcribe(b"", "audio/webm")
+        self.assertEqual(self.names(), ["a", "b"])
+
+        await self.router.transcribe(b"", "audio/webm")
+        self.assertEqual(self.names(), ["b", "a"])
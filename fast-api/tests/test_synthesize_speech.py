@@ -0,0 +1,52 @@
+import asyncio
+import unittest
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest import mock
+
+from shared.lib import tts
+from shared.lib.tts_scheduler import Priority
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def synthesize_speech(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return SimpleNamespace(audio_content=b"audio")
+
+
+class SynthesizeSpeechFlightTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = FakeClient()
+
+        @asynccontextmanager
+        async def acquire():
+            yield self.client
+
+        patcher = mock.patch.object(tts.tts_client_pool, "acquire", acquire)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_identical_requests_share_one_call(self):
+        results = await asyncio.gather(
+            tts.synthesize_speech("bonjour", use_cache=False),
+            tts.synthesize_speech("bonjour", use_cache=False),
+        )
+        self.assertEqual(results, [b"audio", b"audio"])
+        self.assertEqual(self.client.calls, 1)
+
+    async def test_interactive_request_does_not_join_batch_call(self):
+        await asyncio.gather(
+            tts.synthesize_speech("bonjour", use_cache=False, priority=Priority.BATCH),
+            tts.synthesize_speech(
+                "bonjour", use_cache=False, priority=Priority.INTERACTIVE_FIRST
+            ),
+        )
+        self.assertEqual(self.client.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
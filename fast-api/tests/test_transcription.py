@@ -0,0 +1,84 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+from google.cloud import speech
+
+from shared.lib import transcription
+
+RATE = transcription.VAD_SAMPLE_RATE
+WEBM_CONFIG = speech.RecognitionConfig(
+    encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
+    language_code="fr-FR",
+)
+
+
+def clip(silence_seconds: float, speech_seconds: float) -> np.ndarray:
+    """Parole (sinusoïde) entourée de silence (bruit faible)."""
+    rng = np.random.default_rng(0)
+    silence = int(silence_seconds * RATE)
+    samples = rng.normal(0, 10, silence * 2 + int(speech_seconds * RATE))
+    t = np.arange(int(speech_seconds * RATE)) / RATE
+    samples[silence : silence + len(t)] += 8000 * np.sin(2 * np.pi * 220 * t)
+    return samples.astype(np.int16)
+
+
+class EncodingConfigTest(unittest.TestCase):
+    def test_native_opus_channels_read_from_stream(self):
+        for container in ("ogg_opus", "webm"):
+            with self.subTest(container=container):
+                config = transcription._native_config(WEBM_CONFIG, b"", container)
+                self.assertEqual(config.audio_channel_count, 0)
+                self.assertEqual(config.language_code, "fr-FR")
+
+    def test_decoded_pcm_is_mono(self):
+        config = transcription._linear16_config(WEBM_CONFIG)
+        self.assertEqual(
+            config.encoding, speech.RecognitionConfig.AudioEncoding.LINEAR16
+        )
+        self.assertEqual(config.sample_rate_hertz, RATE)
+        self.assertEqual(config.audio_channel_count, 1)
+
+
+class TranscribeTest(unittest.IsolatedAsyncioTestCase):
+    async def transcribe(self, samples: np.ndarray, content: bytes = b"webm"):
+        """Transcrit un WebM dont le décodage donne `samples`, sans appeler l'API."""
+        self.requests = []
+
+        async def recognize(config, audio):
+            self.requests.append((config, audio.content))
+            alternative = speech.SpeechRecognitionAlternative(transcript="bonjour")
+            return speech.RecognizeResponse(
+                results=[speech.SpeechRecognitionResult(alternatives=[alternative])]
+            )
+
+        async def decode_audio(content, container):
+            return samples
+
+        with mock.patch.multiple(
+            transcription,
+            probe_container=lambda content: "webm",
+            decode_audio=decode_audio,
+            recognize=recognize,
+        ):
+            return await transcription.transcribe(content, WEBM_CONFIG)
+
+    async def test_silence_not_sent(self):
+        self.assertEqual(await self.transcribe(clip(1.5, 0)), "")
+        self.assertEqual(self.requests, [])
+
+    async def test_trimmed_pcm_sent_even_if_larger(self):
+        samples = clip(2, 1)
+        self.assertEqual(await self.transcribe(samples), "bonjour")
+        [(config, content)] = self.requests
+        self.assertEqual(config.audio_channel_count, 1)
+        self.assertLess(len(content), samples.nbytes)
+        self.assertGreater(len(content), len(b"webm"))
+
+    async def test_native_audio_sent_when_little_to_trim(self):
+        self.assertEqual(await self.transcribe(clip(0.2, 2)), "bonjour")
+        [(config, content)] = self.requests
+        self.assertEqual(
+            config.encoding, speech.RecognitionConfig.AudioEncoding.WEBM_OPUS
+        )
+        self.assertEqual(content, b"webm")
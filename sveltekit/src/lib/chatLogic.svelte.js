@@ -44,6 +44,12 @@ class ChatState {
     _autoTTSIsPlayingStarted = $state(false);
     /** @type {HTMLAudioElement | null} */
     _autoTTSPlayer = null;
+    /** En-tête tts_segment en attente de sa trame binaire audio */
+    _pendingTTSSegment = null;
+    /** tts_end reçu : plus aucun segment n'arrivera */
+    _autoTTSStreamEnded = false;
+    /** Lecture en pause en attendant le segment suivant (synthèse en cours côté serveur) */
+    _autoTTSWaiting = false;
 
     constructor() {
         // Initialisation si nécessaire, ou laisser vide si $state gère l'initialisation
@@ -106,12 +112,13 @@ class ChatState {
     /**
      * @param {string} text
      */
-    updateLastMessagePart(text) {
+    updateLastMessagePart(text, replace = false) {
         this._isThinking = false;
         if (this._messages.length > 0) {
             let lastMessage = this._messages[this._messages.length - 1];
             if (lastMessage && lastMessage.type === "agent-message" && !lastMessage.completed) {
-                const updatedText = lastMessage.text + text;
+                // replace : le serveur renvoie la réponse entière à la place du flux
+                const updatedText = replace ? text : lastMessage.text + text;
                 this._messages = [
                     ...this._messages.slice(0, -1),
                     { ...lastMessage, text: updatedText }
@@ -257,8 +264,10 @@ class ChatState {
             this.setConnected(false);
             return;
         }
-        const chatWsUrl = `${PUBLIC_FAST_API_WS_URL}/ws/${userId}/${sessionId}`;
+        // Audio TTS reçu en trames binaires plutôt qu'en base64 dans le JSON
+        const chatWsUrl = `${PUBLIC_FAST_API_WS_URL}/ws/${userId}/${sessionId}?tts_protocol=binary`;
         this._ws = new WebSocket(chatWsUrl);
+        this._ws.binaryType = "arraybuffer";
 
         this._ws.onopen = () => {
             console.log("Connected to WebSocket server with User ID:", userId, "and Session ID:", sessionId);
@@ -268,19 +277,39 @@ class ChatState {
         };
 
         this._ws.onmessage = (event) => {
+            if (event.data instanceof ArrayBuffer) {
+                // Trame audio du dernier en-tête tts_segment reçu
+                if (this._pendingTTSSegment) {
+                    const segment = this._pendingTTSSegment;
+                    this._pendingTTSSegment = null;
+                    this.handleAutoTTSSegment({ ...segment, audio: new Uint8Array(event.data) });
+                }
+                return;
+            }
             const data = JSON.parse(event.data);
             console.log("Received:", data);
             if (data.type === "status" && data.message === "Agent service connected") {
                 this._isThinking = false;
             }
             if (data.type === "message_part" && data.text) {
-                this.updateLastMessagePart(data.text);
+                this.updateLastMessagePart(data.text, data.replace === true);
             } else if (data.type === "message_end") {
                 this.completeLastMessage();
-            } else if (data.type === "transcription" && data.text) {
-                // Afficher la transcription comme un message utilisateur
-                const transcriptionId = `transcription_${this._generateUniqueId()}`;
-                this.addMessage(data.text, "user-message", transcriptionId);
+            } else if (data.type === "turn_cancelled") {
+                // Tour interrompu (annulation, nouveau message) : la réponse partielle
+                // est close et l'audio en attente abandonné
+                console.log(`[Chat] Tour annulé (${data.reason})`);
+                this.completeLastMessage();
+                this._pendingTTSSegment = null;
+                this.stopAutoTTS();
+            } else if (data.type === "transcription") {
+                // Les trames live (hypothèses et phrases terminées pendant l'enregistrement)
+                // ne deviennent pas des messages : seule la transcription du tour en est un
+                if (data.text && !data.live && data.is_final !== false) {
+                    // Afficher la transcription comme un message utilisateur
+                    const transcriptionId = `transcription_${this._generateUniqueId()}`;
+                    this.addMessage(data.text, "user-message", transcriptionId);
+                }
             } else if (data.type === "tts_start") {
                 // Signal du début du streaming TTS automatique
                 console.log(`[Auto TTS] Début streaming TTS: ${data.total_segments} segments`);
@@ -288,14 +317,27 @@ class ChatState {
                 this._autoTTSQueue = [];
                 this._autoTTSCurrentIndex = 0;
                 this._autoTTSIsPlayingStarted = false;
+                this._autoTTSStreamEnded = false;
+                this._autoTTSWaiting = false;
             } else if (data.type === "tts_segment") {
                 // Réception d'un segment TTS automatique
                 console.log(`[Auto TTS] Segment ${data.index + 1}/${data.total_segments} reçu`);
-                this.handleAutoTTSSegment(data);
+                if (data.audio_data) {
+                    this.handleAutoTTSSegment(data);
+                } else {
+                    // Protocole binaire : l'audio arrive dans la trame suivante
+                    this._pendingTTSSegment = data;
+                }
             } else if (data.type === "tts_end") {
                 // Fin du streaming TTS automatique
                 console.log("[Auto TTS] Streaming TTS terminé");
-                // Pas besoin d'action spéciale, la lecture continue jusqu'au dernier segment
+                // La lecture continue jusqu'au dernier segment ; si elle attendait
+                // un segment suivant, elle se termine
+                this._autoTTSStreamEnded = true;
+                if (this._autoTTSWaiting) {
+                    this._autoTTSWaiting = false;
+                    this.playNextAutoTTSSegment();
+                }
             } else if (data.type === "tts_error") {
                 // Erreur TTS automatique
                 console.error("[Auto TTS] Erreur:", data.message);
@@ -650,7 +692,9 @@ class ChatState {
      * @param {number} data.index - Index du segment
      * @param {number} data.total_segments - Nombre total de segments
      * @param {string} data.text - Texte du segment
-     * @param {string} data.audio_data - Données audio en base64
+     * @param {string} [data.audio_data] - Données audio en base64 (protocole JSON)
+     * @param {Uint8Array} [data.audio] - Données audio brutes (protocole binaire)
+     * @param {string} [data.mime_type] - Type MIME de l'audio
      * @param {boolean} data.is_final - Si c'est le dernier segment
      */
     async handleAutoTTSSegment(data) {
@@ -658,8 +702,8 @@ class ChatState {
             console.log(`[Auto TTS] Traitement segment ${data.index + 1}/${data.total_segments}: "${data.text.substring(0, 30)}..."`);
 
             // Décoder l'audio et créer l'URL
-            const audioBytes = Uint8Array.from(atob(data.audio_data), c => c.charCodeAt(0));
-            const audioBlob = new Blob([audioBytes], { type: 'audio/mpeg' });
+            const audioBytes = data.audio ?? Uint8Array.from(atob(data.audio_data), c => c.charCodeAt(0));
+            const audioBlob = new Blob([audioBytes], { type: data.mime_type || 'audio/mpeg' });
             const audioUrl = URL.createObjectURL(audioBlob);
 
             // Ajouter à la queue
@@ -673,6 +717,10 @@ class ChatState {
             if (data.index === 0 && !this._autoTTSIsPlayingStarted) {
                 this._autoTTSIsPlayingStarted = true;
                 await this.playNextAutoTTSSegment();
+            } else if (this._autoTTSWaiting && data.index === this._autoTTSCurrentIndex) {
+                // La lecture avait rattrapé la synthèse : reprendre
+                this._autoTTSWaiting = false;
+                await this.playNextAutoTTSSegment();
             }
 
         } catch (error) {
@@ -716,6 +764,10 @@ class ChatState {
                 console.error("[Auto TTS] Erreur démarrage lecture:", playError);
                 this._autoTTSPlaying = false;
             }
+        } else if (!this._autoTTSStreamEnded) {
+            // Segment suivant encore en cours de synthèse (la réponse peut être
+            // encore en génération) : il relancera la lecture à son arrivée
+            this._autoTTSWaiting = true;
         } else {
             // Plus de segments à jouer
             console.log("[Auto TTS] Lecture automatique terminée");
@@ -744,6 +796,7 @@ class ChatState {
 
         this._autoTTSPlaying = false;
         this._autoTTSIsPlayingStarted = false;
+        this._autoTTSWaiting = false;
         this._autoTTSCurrentIndex = 0;
         this._autoTTSQueue = [];
         this._autoTTSPlayer = null;